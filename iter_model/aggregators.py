@@ -0,0 +1,233 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable, Mapping
+from typing import Any, Generic, TypeVar
+
+_T = TypeVar('_T')
+_R = TypeVar('_R')
+
+
+class Aggregator(ABC, Generic[_T, _R]):
+    """Incremental aggregation of a window of items.
+
+    Items are added to the end of the window and removed from its start,
+    so `remove` is always called with the oldest item that is still in the window.
+    Windows that never remove items (e.g. tumbling windows) create a new aggregator instead.
+    """
+
+    __slots__: tuple = ()
+
+    @abstractmethod
+    def add(self, item: _T) -> None:
+        """Add item to the end of the window
+
+        :param item: new item
+        """
+
+    def remove(self, item: _T) -> None:
+        """Remove the oldest item of the window
+
+        :param item: the oldest item
+
+        :raise TypeError: if the aggregator does not support removing items
+        """
+        raise TypeError(f'{type(self).__name__} does not support removing items')
+
+    @abstractmethod
+    def result(self) -> _R:
+        """Return aggregated value of the window
+
+        :return: aggregated value
+        """
+
+
+class Count(Aggregator[Any, int]):
+    """Number of items"""
+
+    __slots__ = ('_count',)
+
+    def __init__(self) -> None:
+        self._count = 0
+
+    def add(self, item: Any) -> None:
+        self._count += 1
+
+    def remove(self, item: Any) -> None:
+        self._count -= 1
+
+    def result(self) -> int:
+        return self._count
+
+
+class Sum(Aggregator[Any, Any]):
+    """Sum of items
+
+    :param start: value of the empty window
+    """
+
+    __slots__ = ('_sum',)
+
+    def __init__(self, start: Any = 0) -> None:
+        self._sum = start
+
+    def add(self, item: Any) -> None:
+        self._sum += item
+
+    def remove(self, item: Any) -> None:
+        self._sum -= item
+
+    def result(self) -> Any:
+        return self._sum
+
+
+class Mean(Aggregator[Any, float]):
+    """Arithmetic mean of items"""
+
+    __slots__ = ('_sum', '_count')
+
+    def __init__(self) -> None:
+        self._sum: Any = 0
+        self._count = 0
+
+    def add(self, item: Any) -> None:
+        self._sum += item
+        self._count += 1
+
+    def remove(self, item: Any) -> None:
+        self._sum -= item
+        self._count -= 1
+
+    def result(self) -> float:
+        """Return mean of the window
+
+        :return: mean value
+
+        :raise ZeroDivisionError: if the window is empty
+        """
+        return self._sum / self._count
+
+
+class _Extremum(Aggregator[_T, _T]):
+    """Monotonic deque of items, the extremum is always at the start.
+    Each item is pushed and popped once, so add and remove are amortized O(1).
+    """
+
+    __slots__ = ('_key', '_items', '_added', '_removed')
+
+    def __init__(self, key: Callable[[_T], Any] | None = None) -> None:
+        self._key = key
+        self._items: deque[tuple[int, Any, _T]] = deque()
+        self._added = 0
+        self._removed = 0
+
+    @staticmethod
+    @abstractmethod
+    def _replaces(value: Any, other: Any) -> bool:
+        """Check whether the new value makes an older one useless"""
+
+    def add(self, item: _T) -> None:
+        value = item if self._key is None else self._key(item)
+        items = self._items
+        while items and self._replaces(value, items[-1][1]):
+            items.pop()
+        items.append((self._added, value, item))
+        self._added += 1
+
+    def remove(self, item: _T) -> None:
+        if self._items[0][0] == self._removed:
+            self._items.popleft()
+        self._removed += 1
+
+    def result(self) -> _T:
+        """Return extremum of the window
+
+        :return: the first extreme item
+
+        :raise ValueError: if the window is empty
+        """
+        if not self._items:
+            raise ValueError(f'{type(self).__name__}() of empty window')
+        return self._items[0][2]
+
+
+class Min(_Extremum[_T]):
+    """Minimum item
+
+    :param key: function to extract comparison key from an item
+    """
+
+    __slots__: tuple = ()
+
+    @staticmethod
+    def _replaces(value: Any, other: Any) -> bool:
+        return bool(value < other)
+
+
+class Max(_Extremum[_T]):
+    """Maximum item
+
+    :param key: function to extract comparison key from an item
+    """
+
+    __slots__: tuple = ()
+
+    @staticmethod
+    def _replaces(value: Any, other: Any) -> bool:
+        return bool(value > other)
+
+
+class Fold(Aggregator[_T, _R]):
+    """Custom aggregation, like `reduce` with initial value
+
+    :param func: function that adds an item to the accumulated value
+    :param initial: value of the empty window
+    :param inverse: function that removes an item from the accumulated value,
+        without it the aggregator can not be used in overlapping windows
+    """
+
+    __slots__ = ('_func', '_inverse', '_value')
+
+    def __init__(
+        self,
+        func: Callable[[_R, _T], _R],
+        initial: _R,
+        inverse: Callable[[_R, _T], _R] | None = None,
+    ) -> None:
+        self._func = func
+        self._inverse = inverse
+        self._value = initial
+
+    def add(self, item: _T) -> None:
+        self._value = self._func(self._value, item)
+
+    def remove(self, item: _T) -> None:
+        if self._inverse is None:
+            super().remove(item)
+        else:
+            self._value = self._inverse(self._value, item)
+
+    def result(self) -> _R:
+        return self._value
+
+
+class Combine(Aggregator[_T, dict[str, Any]]):
+    """Several aggregations of the same items, e.g. `Combine({'min': Min, 'max': Max})`
+
+    :param aggs: aggregator factories by name, the result is a dict of aggregated values by the same names
+    """
+
+    __slots__ = ('_aggregators',)
+
+    def __init__(self, aggs: Mapping[str, Callable[[], Aggregator[_T, Any]]]) -> None:
+        self._aggregators = {name: agg() for name, agg in aggs.items()}
+
+    def add(self, item: _T) -> None:
+        for aggregator in self._aggregators.values():
+            aggregator.add(item)
+
+    def remove(self, item: _T) -> None:
+        for aggregator in self._aggregators.values():
+            aggregator.remove(item)
+
+    def result(self) -> dict[str, Any]:
+        return {name: aggregator.result() for name, aggregator in self._aggregators.items()}
@@ -1,15 +1,43 @@
+import asyncio
+import heapq
+import itertools
 import operator
-from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
-from functools import wraps
+from collections import defaultdict, deque
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Mapping, Sequence
+from concurrent.futures import Executor
+from contextlib import aclosing
+from functools import partial, wraps
 from typing import (
+    Any,
     Generic,
     ParamSpec,
     TypeVar,
     cast,
 )
 
-from .async_utils import asyncify
+from .aggregators import Aggregator, Combine
+from .async_utils import (
+    NextPoller,
+    async_chunks,
+    async_iterate,
+    asyncify,
+    concurrent_filter,
+    concurrent_map,
+    merge,
+    merge_sorted,
+    offload,
+    sync_chunks,
+    sync_iterate,
+    thread_chunks,
+    unchunk,
+)
+from .cache import AsyncCache
 from .empty_iterator import EmptyAsyncIterator
+from .fusion import compile_stages
+from .sketches import BloomFilter, HyperLogLog, QuantileSketch, RecentSet, ReservoirSample
+from .spill import SpillFile, read_run, spill_sorted_run
+from .sync_iter import SyncIter
+from .tee import AsyncTee
 
 _T = TypeVar('_T')
 _R = TypeVar('_R')
@@ -39,16 +67,20 @@ def async_iter(func: Callable[_P, AsyncIterator[_T]]) -> Callable[_P, 'AsyncIter
 
     @wraps(func)
     def wrapper(*args: _P.args, **kwargs: _P.kwargs) -> 'AsyncIter[_T]':
-        return AsyncIter[_T](func(*args, **kwargs))
+        it = AsyncIter[_T](func(*args, **kwargs))
+        if args and isinstance(args[0], AsyncIter):
+            it._executor = args[0]._executor
+        return it
 
     return wrapper
 
 
 class AsyncIter(Generic[_T]):
-    __slots__ = ('_it',)
+    __slots__ = ('_it', '_executor')
 
     def __init__(self, it: AsyncIterator[_T] | AsyncIterable[_T]):
         self._it = aiter(it)
+        self._executor: Executor | None = it._executor if isinstance(it, AsyncIter) else None
 
     def __aiter__(self):
         return self._it
@@ -57,15 +89,35 @@ class AsyncIter(Generic[_T]):
         return await anext(self._it)
 
     @classmethod
-    @async_iter
-    async def from_sync(cls, it: Iterable[_T]) -> 'AsyncIter[_T]':
+    def from_sync(
+        cls,
+        it: Iterable[_T],
+        chunk_size: int | None = None,
+        thread: bool = False,
+        prefetch: int = 1,
+    ) -> 'AsyncIter[_T]':
         """Create from sync iterable
 
         :param it: Iterable[_T], iterable
+        :param chunk_size: if provided, items are passed to the following element-wise methods
+            in chunks of this size, see `chunked_mode()`
+        :param thread: advance the iterable in a dedicated thread, so a blocking iterable
+            (file, DB cursor, paginated HTTP client) does not block the event loop.
+            Items are handed over from the thread in chunks of `chunk_size` items, 256 by default,
+            so an item is available only when its chunk is read or the iterable is exhausted.
+        :param prefetch: max number of chunks read ahead in the thread
         :return: async iterable
+
+        :raise ValueError: if chunk_size or prefetch is less than 1
         """
-        for item in it:
-            yield item
+        if thread:
+            chunks = thread_chunks(it, 256 if chunk_size is None else chunk_size, prefetch)
+            if chunk_size is None:
+                return AsyncIter(unchunk(chunks, [False]))
+            return ChunkedAsyncIter(chunks)
+        if chunk_size is None:
+            return AsyncIter(async_iterate(it))
+        return ChunkedAsyncIter(sync_chunks(it, chunk_size))
 
     @classmethod
     def empty(cls) -> 'AsyncIter[_T]':
@@ -75,6 +127,85 @@ class AsyncIter(Generic[_T]):
         """
         return cls(EmptyAsyncIterator())
 
+    def fuse(self) -> 'AsyncIter[_T]':
+        """Fuse the following element-wise methods
+        (`map`, `where`, `skip_where`, `skip`, `take`, `take_while`, `enumerate`)
+        into a single async generator instead of a chain of async generators,
+        sync functions are called directly inside of it.
+
+        Only methods called before the iteration starts are fused,
+        intermediate iterators of a fused chain should not be consumed.
+
+        Usage:
+        ```python
+        await AsyncIter(source).fuse().map(parse).where(is_valid).map(transform).take(100).to_list()
+        ```
+
+        :return: iterable
+        """
+        it = FusedAsyncIter(self._it)
+        it._executor = self._executor
+        return it
+
+    def chunked_mode(self, chunk_size: int = 256) -> 'AsyncIter[_T]':
+        """Pass items to the following element-wise methods
+        (`map`, `where`, `skip_where`, `take_while`, `enumerate`) in chunks,
+        so every such method awaits once per chunk instead of once per item.
+        Items are split back only when they are consumed.
+
+        Only methods called before the iteration starts are chunked.
+        Functions passed to the chunked methods are called item by item inside of a chunk.
+
+        Usage:
+        ```python
+        await AsyncIter(source).chunked_mode(1024).map(parse).where(is_valid).map(transform).to_list()
+        ```
+
+        :param chunk_size: max number of items in a chunk
+        :return: iterable
+
+        :raise ValueError: if chunk_size is less than 1
+        """
+        it = ChunkedAsyncIter(async_chunks(self, chunk_size))
+        it._executor = self._executor
+        return it
+
+    def with_executor(self, executor: Executor | None) -> 'AsyncIter[_T]':
+        """Call sync functions passed to this and following methods in the executor,
+        so CPU-heavy or blocking functions do not block the event loop.
+
+        Coroutine functions are still awaited in the event loop,
+        so a small sync function can be kept inline by wrapping it with `asyncify`.
+
+        Usage:
+        ```python
+        with ProcessPoolExecutor() as executor:
+            await AsyncIter(source).with_executor(executor).map(parse).max(key=score)
+        ```
+
+        :param executor: thread or process executor, None to call sync functions inline
+        :return: iterable
+        """
+        it = AsyncIter(self)
+        it._executor = executor
+        return it
+
+    def to_sync(self, prefetch: int = 256) -> SyncIter[_T]:
+        """Convert to SyncIter that can be consumed from sync code, e.g. in a WSGI or Celery worker.
+
+        The iterator is driven by a shared event loop that runs in a background thread,
+        so it must not use objects bound to another event loop, e.g. a client session created in another loop.
+        Items are read ahead and handed over to the sync code in batches.
+        Do not call it from a coroutine that runs on the background loop, it would block forever.
+
+        :param prefetch: max number of items read ahead
+
+        :return: sync iterator
+
+        :raise ValueError: if prefetch is less than 1
+        """
+        return SyncIter(sync_iterate(self, prefetch))
+
     async def to_list(self) -> list[_T]:
         """Convert to list
 
@@ -128,15 +259,39 @@ class AsyncIter(Generic[_T]):
                 count += 1
 
     @async_iter
-    async def map(self, func: Callable[[_T], _R | Awaitable[_R]]) -> AsyncIterator[_R]:
+    async def map(
+        self,
+        func: Callable[[_T], _R | Awaitable[_R]],
+        concurrency: int = 1,
+        ordered: bool = True,
+    ) -> AsyncIterator[_R]:
         """Return an iterator that applies function to every item of iterable,
         yielding the results
 
+        :param func: function to apply
+        :param concurrency: max number of func calls in flight.
+            Items are read from the iterable only when there is a free slot.
+        :param ordered: yield results in the order of the items,
+            otherwise yield results as soon as they are ready. Used only when concurrency > 1.
+
         :return: iterable
+
+        :raise ValueError: if concurrency is less than 1
         """
-        func = asyncify(func)
-        async for item in self:
-            yield await func(item)
+        if concurrency != 1:
+            func = asyncify(func, self._executor)
+            async with aclosing(concurrent_map(func, self, concurrency, ordered)) as results:
+                async for result in results:
+                    yield result
+            return
+
+        func = offload(func, self._executor)
+        if asyncio.iscoroutinefunction(func):
+            async for item in self:
+                yield await func(item)
+        else:
+            async for item in self:
+                yield func(item)
 
     @async_iter
     async def skip(self, count: int) -> AsyncIterator[_T]:
@@ -153,22 +308,38 @@ class AsyncIter(Generic[_T]):
 
         :return: iterable
         """
-        func = asyncify(func)
+        func = asyncify(func, self._executor)
         async for item in self:  # pragma: no cover
             if await func(item):
                 break
             yield item
 
     @async_iter
-    async def skip_where(self, func: _ConditionFunc) -> AsyncIterator[_T]:
+    async def skip_where(self, func: _ConditionFunc, concurrency: int = 1) -> AsyncIterator[_T]:
         """Skip elements where conditional is satisfied
 
+        :param func: condition function
+        :param concurrency: max number of conditions evaluated at the same time, order of items is kept
+
         :return: async iterable
+
+        :raise ValueError: if concurrency is less than 1
         """
-        func = asyncify(func)
-        async for item in self:
-            if not await func(item):
-                yield item
+        if concurrency != 1:
+            async with aclosing(concurrent_filter(asyncify(func, self._executor), self, concurrency, True)) as items:
+                async for item in items:
+                    yield item
+            return
+
+        func = offload(func, self._executor)
+        if asyncio.iscoroutinefunction(func):
+            async for item in self:
+                if not await func(item):
+                    yield item
+        else:
+            async for item in self:
+                if not func(item):
+                    yield item
 
     async def count(self) -> int:
         """Return count of items in iterator
@@ -184,20 +355,33 @@ class AsyncIter(Generic[_T]):
         self,
         func: _ConditionFunc,
         default: _DefaultT = _EMPTY,
+        concurrency: int = 1,
     ) -> _T | _DefaultT:
         """Find first item for which the conditional is satisfied
 
         :param func: condition function
         :param default: default value
+        :param concurrency: max number of conditions evaluated at the same time.
+            Conditions still in flight are cancelled once the item is found.
 
         :return: item
 
         :raise ValueError: the item was not found and default was not provided
         """
-        func = asyncify(func)
-        async for item in self:
-            if await func(item):  # pragma: no cover
-                return item
+        if concurrency != 1:
+            async with aclosing(concurrent_filter(asyncify(func, self._executor), self, concurrency)) as items:
+                async for item in items:
+                    return item
+        else:
+            func = offload(func, self._executor)
+            if asyncio.iscoroutinefunction(func):
+                async for item in self:
+                    if await func(item):  # pragma: no cover
+                        return item
+            else:
+                async for item in self:
+                    if func(item):  # pragma: no cover
+                        return item
 
         if default is not _EMPTY:
             return default
@@ -208,21 +392,32 @@ class AsyncIter(Generic[_T]):
         self,
         func: _ConditionFunc,
         default: _DefaultT = _EMPTY,
+        concurrency: int = 1,
     ) -> _T | _DefaultT:
         """Find first item for which the conditional is satisfied
 
         :param func: condition function
         :param default: default value
+        :param concurrency: max number of conditions evaluated at the same time
 
         :return: item
 
         :raise ValueError: the item was not found and default was not provided
         """
-        func = asyncify(func)
         last_item = _EMPTY
-        async for item in self:
-            if await func(item):  # pragma: no cover
+        if concurrency != 1:
+            async for item in concurrent_filter(asyncify(func, self._executor), self, concurrency):
                 last_item = item
+        else:
+            func = offload(func, self._executor)
+            if asyncio.iscoroutinefunction(func):
+                async for item in self:
+                    if await func(item):  # pragma: no cover
+                        last_item = item
+            else:
+                async for item in self:
+                    if func(item):  # pragma: no cover
+                        last_item = item
 
         if last_item is not _EMPTY:
             return last_item
@@ -233,15 +428,31 @@ class AsyncIter(Generic[_T]):
         raise ValueError('Item not found')
 
     @async_iter
-    async def where(self, func: _ConditionFunc) -> AsyncIterator[_T]:
+    async def where(self, func: _ConditionFunc, concurrency: int = 1) -> AsyncIterator[_T]:
         """Filter item by condition
 
+        :param func: condition function
+        :param concurrency: max number of conditions evaluated at the same time, order of items is kept
+
         :return: iterable
+
+        :raise ValueError: if concurrency is less than 1
         """
-        func = asyncify(func)
-        async for item in self:
-            if await func(item):
-                yield item
+        if concurrency != 1:
+            async with aclosing(concurrent_filter(asyncify(func, self._executor), self, concurrency)) as items:
+                async for item in items:
+                    yield item
+            return
+
+        func = offload(func, self._executor)
+        if asyncio.iscoroutinefunction(func):
+            async for item in self:
+                if await func(item):
+                    yield item
+        else:
+            async for item in self:
+                if func(item):
+                    yield item
 
     @async_iter
     async def take_while(self, func: _ConditionFunc) -> AsyncIterator[_T]:
@@ -249,12 +460,19 @@ class AsyncIter(Generic[_T]):
 
         :return: iterable
         """
-        func = asyncify(func)
-        async for item in self:
-            if await func(item):
-                yield item
-            else:
-                break
+        func = offload(func, self._executor)
+        if asyncio.iscoroutinefunction(func):
+            async for item in self:
+                if await func(item):
+                    yield item
+                else:
+                    break
+        else:
+            async for item in self:
+                if func(item):
+                    yield item
+                else:
+                    break
 
     async def next(self) -> _T:
         """Returns the first item
@@ -293,6 +511,119 @@ class AsyncIter(Generic[_T]):
             async for item in iterable:
                 yield item
 
+    @async_iter
+    async def merge(self, *iterables: AsyncIterable[_T], buffer: int = 16) -> AsyncIterator[_T]:
+        """Read this and other iterables concurrently and yield items as soon as they arrive.
+        Items of one iterable keep their order, items of different iterables are interleaved.
+
+        Each iterable is read by its own task into a shared queue,
+        so the iterables are paused when the consumer falls `buffer` items behind.
+        When the consumer stops early or one of the iterables raises an error,
+        the remaining iterables are cancelled and closed.
+
+        :param iterables: other iterables
+        :param buffer: max number of items read ahead of the consumer
+
+        :return: iterator of items
+
+        :raise ValueError: if buffer is less than 1
+        """
+        async with aclosing(merge((self, *iterables), buffer)) as items:
+            async for item in items:
+                yield item
+
+    @async_iter
+    async def merge_sorted(
+        self,
+        *iterables: AsyncIterable[_T],
+        key: _KeyFunc | None = None,
+        buffer: int = 256,
+    ) -> AsyncIterator[_T]:
+        """Merge this and other iterables, each sorted by key, into one sorted iterable, like `heapq.merge()`.
+        Of items with equal keys, the items of earlier iterables go first.
+
+        Each iterable is read ahead by its own task in chunks of up to `buffer` items,
+        so a slow iterable does not delay reading the others.
+        When the consumer stops early or one of the iterables raises an error,
+        the remaining iterables are cancelled and closed.
+
+        :param iterables: other iterables
+        :param key: function to extract comparison key from an item
+        :param buffer: max number of items in a chunk read ahead from each iterable
+
+        :return: iterator of sorted items
+
+        :raise ValueError: if buffer is less than 1
+        """
+        if key is not None:
+            key = offload(key, self._executor)
+        async with aclosing(merge_sorted((self, *iterables), key, buffer)) as items:
+            async for item in items:
+                yield item
+
+    @async_iter
+    async def prefetch(self, n: int = 1) -> AsyncIterator[_T]:
+        """Read up to `n` items ahead in a background task,
+        so the source produces next items while the consumer processes the current one.
+
+        Errors of the source are raised to the consumer,
+        the background task is cancelled when the consumer stops early.
+
+        :param n: max number of items read ahead
+
+        :return: iterator of items
+
+        :raise ValueError: if n is less than 1
+        """
+        async with aclosing(merge((self,), n)) as items:
+            async for item in items:
+                yield item
+
+    def cache(self, max_in_memory: int | None = None, block_size: int = 1024) -> AsyncCache[_T]:
+        """Record items as they are read, so they can be iterated again any number of times.
+        Each iteration of the cache starts from the first item, the source is read only once.
+        The cache can be read by several tasks concurrently.
+
+        Usage:
+        ```python
+        rows = AsyncIter(fetch_rows()).cache(max_in_memory=100_000)
+        total, has_errors = await asyncio.gather(
+            AsyncIter(rows).count(),
+            AsyncIter(rows).contains(error_row),
+        )
+        ```
+
+        :param max_in_memory: number of items kept in memory, older items are spilled to a temporary file.
+            Items are spilled in whole blocks, so up to `max(max_in_memory, block_size)` items are kept in memory.
+            None to keep all items in memory.
+        :param block_size: number of items spilled to the file at once
+
+        :return: replayable async iterable
+
+        :raise ValueError: if max_in_memory is negative or block_size is less than 1
+        """
+        return AsyncCache(self._it, max_in_memory, block_size)
+
+    def tee(self, n: int = 2, buffer: int = 1024) -> tuple['AsyncIter[_T]', ...]:
+        """Split into `n` iterators that read this iterator once, e.g. to consume it in several tasks
+
+        Unlike `itertools.tee`, memory is bounded: at most `buffer` items are kept for slower iterators,
+        and an iterator that is `buffer` items ahead of the slowest one waits until the slowest one catches up.
+        An iterator that is not read anymore holds the others back, so it should be read to the end or closed.
+
+        :param n: number of iterators
+        :param buffer: max number of items kept for slower iterators
+
+        :return: tuple of iterators
+
+        :raise ValueError: if n or buffer is less than 1
+        """
+        tee = AsyncTee(self._it, n, buffer)
+        iterators = tuple(AsyncIter(tee.iterate(index)) for index in range(n))
+        for it in iterators:
+            it._executor = self._executor
+        return iterators
+
     async def all(self) -> bool:
         """Checks whether all elements of this iterable are true
 
@@ -383,9 +714,13 @@ class AsyncIter(Generic[_T]):
             except StopAsyncIteration as err:
                 raise ValueError('Iterator is empty') from err
 
-        func = asyncify(func)
-        async for item in self:
-            initial = await func(initial, item)
+        func = offload(func, self._executor)
+        if asyncio.iscoroutinefunction(func):
+            async for item in self:
+                initial = await func(initial, item)
+        else:
+            async for item in self:
+                initial = func(initial, item)
         return cast(_T, initial)
 
     async def max(
@@ -409,13 +744,27 @@ class AsyncIter(Generic[_T]):
                 raise ValueError('Iterator is empty') from err
             else:
                 return default
-        key = asyncify(key if key else lambda x: x)
-        max_item_key = await key(max_item)
-        async for item in self:
-            item_key = await key(item)
-            if item_key > max_item_key:
-                max_item = item
-                max_item_key = item_key
+        if key is None:
+            async for item in self:
+                if item > max_item:
+                    max_item = item
+            return max_item
+
+        key = offload(key, self._executor)
+        if asyncio.iscoroutinefunction(key):
+            max_item_key = await key(max_item)
+            async for item in self:
+                item_key = await key(item)
+                if item_key > max_item_key:
+                    max_item = item
+                    max_item_key = item_key
+        else:
+            max_item_key = key(max_item)
+            async for item in self:
+                item_key = key(item)
+                if item_key > max_item_key:
+                    max_item = item
+                    max_item_key = item_key
         return max_item
 
     async def min(
@@ -439,15 +788,213 @@ class AsyncIter(Generic[_T]):
                 raise ValueError('Iterator is empty') from err
             else:
                 return default
-        key = asyncify(key if key else lambda x: x)
-        max_item_key = await key(max_item)
-        async for item in self:
-            item_key = await key(item)
-            if item_key < max_item_key:
-                max_item = item
-                max_item_key = item_key
+        if key is None:
+            async for item in self:
+                if item < max_item:
+                    max_item = item
+            return max_item
+
+        key = offload(key, self._executor)
+        if asyncio.iscoroutinefunction(key):
+            max_item_key = await key(max_item)
+            async for item in self:
+                item_key = await key(item)
+                if item_key < max_item_key:
+                    max_item = item
+                    max_item_key = item_key
+        else:
+            max_item_key = key(max_item)
+            async for item in self:
+                item_key = key(item)
+                if item_key < max_item_key:
+                    max_item = item
+                    max_item_key = item_key
         return max_item
 
+    async def approx_distinct(self, precision: int = 14) -> int:
+        """Estimate the number of distinct items with `HyperLogLog` in one pass and `2 ** precision` bytes,
+        the relative error is about `1.04 / sqrt(2 ** precision)`.
+
+        :param precision: number of bits of the hash that select a register, from 4 to 18
+
+        :return: estimated number of distinct items
+
+        :raise ValueError: if precision is out of range
+        """
+        sketch = HyperLogLog(precision)
+        async for item in self:
+            sketch.add(item)
+        return sketch.result()
+
+    async def approx_quantiles(self, qs: Sequence[float], k: int = 200) -> list[_T]:
+        """Estimate quantiles of comparable items with `QuantileSketch` in one pass and O(k) memory
+
+        :param qs: quantiles, numbers from 0 to 1, e.g. (0.5, 0.99) for the median and the 99th percentile
+        :param k: accuracy of the sketch, the rank error is about 1.7% for the default value
+
+        :return: item for each quantile
+
+        :raise ValueError: if the iterable is empty, a quantile is out of range or k is less than 2
+        """
+        sketch: QuantileSketch[_T] = QuantileSketch(qs, k)
+        async for item in self:
+            sketch.add(item)
+        return sketch.result()
+
+    async def reservoir_sample(self, k: int, seed: int | None = None) -> list[_T]:
+        """Return uniform random sample of `k` items with `ReservoirSample` in one pass and O(k) memory
+
+        :param k: size of the sample
+        :param seed: seed of the random generator
+
+        :return: sampled items, all items if there are at most `k` of them
+
+        :raise ValueError: if k is less than 1
+        """
+        sketch: ReservoirSample[_T] = ReservoirSample(k, seed)
+        async for item in self:
+            sketch.add(item)
+        return sketch.result()
+
+    @async_iter
+    async def sort(
+        self,
+        key: _KeyFunc | None = None,
+        reverse: bool = False,
+        max_in_memory: int | None = None,
+        block_size: int = 1024,
+    ) -> AsyncIterator[_T]:
+        """Sort items, the sort is stable. The key is computed once for each item.
+
+        If max_in_memory is provided, items are sorted in runs of `max_in_memory` items,
+        runs are spilled to a temporary file and merged lazily,
+        so streams that do not fit in memory can be sorted.
+        Spilled runs are sorted, written and merged in worker threads, not in the event loop.
+
+        :param key: function to extract comparison key from an item
+        :param reverse: sort in descending order
+        :param max_in_memory: max number of items sorted in memory at once, None to sort all items in memory
+        :param block_size: number of items written to and read from the file at once
+
+        :return: iterator of sorted items
+
+        :raise ValueError: if max_in_memory or block_size is less than 1
+        """
+        if (max_in_memory is not None and max_in_memory < 1) or block_size < 1:
+            raise ValueError('max_in_memory and block_size must be greater than 0')
+
+        if key is not None:
+            key = offload(key, self._executor)
+        is_coroutine = asyncio.iscoroutinefunction(key)
+        # items are decorated with their keys, so keys are not computed again by sort and merge
+        sort_key = None if key is None else operator.itemgetter(0)
+
+        loop = asyncio.get_running_loop()
+        spill: SpillFile[Any] = SpillFile()
+        runs = []
+        entries: list[Any] = []
+        try:
+            async for item in self:
+                if key is None:
+                    entries.append(item)
+                elif is_coroutine:
+                    entries.append((await key(item), item))
+                else:
+                    entries.append((key(item), item))
+                if len(entries) == max_in_memory:
+                    runs.append(await loop.run_in_executor(
+                        None, spill_sorted_run, spill, entries, sort_key, reverse, block_size,
+                    ))
+                    entries = []
+
+            if runs:
+                if entries:
+                    runs.append(await loop.run_in_executor(
+                        None, spill_sorted_run, spill, entries, sort_key, reverse, block_size,
+                    ))
+                merged = heapq.merge(*(read_run(spill, blocks) for blocks in runs), key=sort_key, reverse=reverse)
+                chunks = thread_chunks(merged, block_size, 1)
+            else:
+                entries.sort(key=sort_key, reverse=reverse)
+                chunks = async_iterate((entries,))
+
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    if key is None:
+                        for item in chunk:
+                            yield item
+                    else:
+                        for _, item in chunk:
+                            yield item
+        finally:
+            spill.close()
+
+    @async_iter
+    async def top_k(
+        self,
+        k: int,
+        key: _KeyFunc | None = None,
+        reverse: bool = False,
+        concurrency: int = 1,
+    ) -> AsyncIterator[_T]:
+        """Return `k` largest items in descending order, equivalent to `sort(key, reverse=True).take(k)`,
+        but keeps only `k` items in a heap: O(n log k) time and O(k) memory.
+        The key is computed once for each item.
+
+        :param k: number of items
+        :param key: function to extract comparison key from an item
+        :param reverse: return `k` smallest items in ascending order instead
+        :param concurrency: max number of key calls in flight, see `map()`
+
+        :return: iterator of items
+
+        :raise ValueError: if k is negative or concurrency is less than 1
+        """
+        if k < 0:
+            raise ValueError('k must be a non-negative integer')
+        if concurrency < 1:
+            raise ValueError('concurrency must be greater than 0')
+        if k == 0:
+            return
+
+        if key is None:
+            pairs = ((item, item) async for item in self)
+        elif concurrency == 1:
+            key = offload(key, self._executor)
+            if asyncio.iscoroutinefunction(key):
+                pairs = ((await key(item), item) async for item in self)
+            else:
+                pairs = ((key(item), item) async for item in self)
+        else:
+            async_key = asyncify(key, self._executor)
+
+            async def decorate(item: _T) -> tuple[Any, _T]:
+                return await async_key(item), item
+
+            pairs = concurrent_map(decorate, self, concurrency)
+
+        # the heap keeps the `k` greatest entries, an entry is (key, -index, item),
+        # so of items with equal keys the earliest ones are kept and items are never compared
+        heap: list[tuple[Any, int, _T]] = []
+        wrap = _ReversedKey if reverse else _identity
+        better = operator.lt if reverse else operator.gt
+        index = 0
+        async with aclosing(pairs):
+            async for item_key, item in pairs:
+                if len(heap) < k:
+                    heapq.heappush(heap, (wrap(item_key), index, item))
+                    index -= 1
+                    if len(heap) == k:
+                        worst_key = heap[0][0].key if reverse else heap[0][0]
+                elif better(item_key, worst_key):
+                    heapq.heapreplace(heap, (wrap(item_key), index, item))
+                    index -= 1
+                    worst_key = heap[0][0].key if reverse else heap[0][0]
+
+        heap.sort(reverse=True)
+        for _, _, item in heap:
+            yield item
+
     @async_iter
     async def accumulate(
         self,
@@ -468,11 +1015,16 @@ class AsyncIter(Generic[_T]):
             except StopAsyncIteration:
                 return
 
-        func = asyncify(func)
+        func = offload(func, self._executor)
         yield total
-        async for item in self:
-            total = await func(total, item)
-            yield total
+        if asyncio.iscoroutinefunction(func):
+            async for item in self:
+                total = await func(total, item)
+                yield total
+        else:
+            async for item in self:
+                total = func(total, item)
+                yield total
 
     @async_iter
     async def append_left(self, item: _T) -> AsyncIterator[_T]:
@@ -591,8 +1143,10 @@ class AsyncIter(Generic[_T]):
 
         :return: True if the iterable contains item
         """
-        default = object()
-        return await self.first_where(lambda x: x == item, default=default) is not default
+        async for item_ in self:
+            if item_ == item:
+                return True
+        return False
 
     async def is_empty(self) -> bool:
         """Return True if iterable is empty
@@ -620,19 +1174,508 @@ class AsyncIter(Generic[_T]):
             previous = item
 
     @async_iter
-    async def batches(self, batch_size: int) -> AsyncIterator[tuple[_T, ...]]:
+    async def batches(
+        self,
+        batch_size: int,
+        max_wait: float | None = None,
+        max_weight: float | None = None,
+        weight: Callable[[_T], float] = len,
+    ) -> AsyncIterator[tuple[_T, ...]]:
         """Create iterator of tuples whose length = batch_size
 
+        :param batch_size: max number of items in a batch
+        :param max_wait: if provided, a batch is flushed when max_wait seconds have passed since its first item,
+            without waiting for the next item
+        :param max_weight: if provided, a batch is also flushed before its total weight exceeds max_weight.
+            An item heavier than max_weight gets a batch of its own.
+        :param weight: weight of an item, e.g. size in bytes. By default len() is used.
+
         :return: iterator of tuples whose length = batch_size
+
+        :raise ValueError: if batch_size is less than 1
         """
-        while True:
-            try:
-                item = await self.next()
-            except StopAsyncIteration:
-                break
-            it = self.append_left(item)
-            batch = await it.take(batch_size).to_tuple()
-            yield batch
+        if batch_size < 1:
+            raise ValueError('batch_size must be greater than 0')
+
+        items: list[_T] = []
+        items_weight = 0.
+        if max_wait is None:
+            async for item in self:
+                if max_weight is not None:
+                    item_weight = weight(item)
+                    if items and items_weight + item_weight > max_weight:
+                        yield tuple(items)
+                        items, items_weight = [], 0.
+                    items_weight += item_weight
+                items.append(item)
+                if len(items) == batch_size:
+                    yield tuple(items)
+                    items, items_weight = [], 0.
+            if items:
+                yield tuple(items)
+            return
+
+        loop = asyncio.get_running_loop()
+        poller = NextPoller(self._it)
+        deadline = 0.
+        try:
+            while True:
+                try:
+                    item = await poller.next(deadline - loop.time() if items else None)
+                except TimeoutError:
+                    yield tuple(items)
+                    items, items_weight = [], 0.
+                    continue
+                except StopAsyncIteration:
+                    break
+                if max_weight is not None:
+                    item_weight = weight(item)
+                    if items and items_weight + item_weight > max_weight:
+                        yield tuple(items)
+                        items, items_weight = [], 0.
+                    items_weight += item_weight
+                if not items:
+                    deadline = loop.time() + max_wait
+                items.append(item)
+                if len(items) == batch_size:
+                    yield tuple(items)
+                    items, items_weight = [], 0.
+        finally:
+            await poller.aclose()
+        if items:
+            yield tuple(items)
+
+    @async_iter
+    async def tumbling_window(
+        self,
+        size: int,
+        agg: Callable[[], Aggregator[_T, Any]] | None = None,
+    ) -> AsyncIterator[Any]:
+        """Split items into consecutive windows of `size` items, the last window may be smaller
+
+        :param size: number of items in a window
+        :param agg: aggregator factory, e.g. `Sum` or `lambda: Fold(operator.mul, 1)`.
+            If provided, aggregated value of each window is yielded instead of tuple of items.
+
+        :return: iterator of windows
+
+        :raise ValueError: if size is less than 1
+        """
+        if agg is None:
+            async for batch in self.batches(size):
+                yield batch
+            return
+
+        if size < 1:
+            raise ValueError('size must be greater than 0')
+
+        aggregator = agg()
+        count = 0
+        async for item in self:
+            aggregator.add(item)
+            count += 1
+            if count == size:
+                yield aggregator.result()
+                aggregator = agg()
+                count = 0
+        if count:
+            yield aggregator.result()
+
+    @async_iter
+    async def sliding_window(
+        self,
+        size: int,
+        step: int = 1,
+        agg: Callable[[], Aggregator[_T, Any]] | None = None,
+    ) -> AsyncIterator[Any]:
+        """Create windows of `size` items, a new window starts every `step` items.
+        Only full windows are yielded.
+
+        If step is less than size, windows overlap and the aggregator must support removing items.
+        If step is greater than size, items between windows are skipped.
+
+        :param size: number of items in a window
+        :param step: number of items between starts of windows
+        :param agg: aggregator factory, e.g. `Sum` or `lambda: Fold(operator.mul, 1)`.
+            If provided, aggregated value of each window is yielded instead of tuple of items.
+
+        :return: iterator of windows
+
+        :raise ValueError: if size or step is less than 1
+        """
+        if size < 1 or step < 1:
+            raise ValueError('size and step must be greater than 0')
+
+        window: deque[_T] = deque()
+        aggregator = None if agg is None else agg()
+        skip = 0
+        async for item in self:
+            if skip:
+                skip -= 1
+                continue
+            window.append(item)
+            if aggregator is not None:
+                aggregator.add(item)
+            if len(window) < size:
+                continue
+
+            yield tuple(window) if aggregator is None else aggregator.result()
+            if step >= size:
+                window.clear()
+                skip = step - size
+                if agg is not None:
+                    aggregator = agg()
+            else:
+                for _ in range(step):
+                    removed = window.popleft()
+                    if aggregator is not None:
+                        aggregator.remove(removed)
+
+    @async_iter
+    async def time_window(
+        self,
+        duration: float,
+        step: float | None = None,
+        agg: Callable[[], Aggregator[_T, Any]] | None = None,
+    ) -> AsyncIterator[Any]:
+        """Group items by the time they arrive, using the event loop clock.
+
+        Every `step` seconds since the start of the iteration, the items that arrived
+        within the last `duration` seconds are yielded as a window.
+        A window is yielded on time even if the source does not produce the next item,
+        empty windows are skipped.
+        When the source is exhausted, the remaining windows are yielded immediately.
+
+        If step is less than duration, windows overlap and the aggregator must support removing items.
+        If step is greater than duration, items that arrived between windows are skipped.
+
+        :param duration: length of a window in seconds
+        :param step: time between ends of windows in seconds, by default equals to duration
+        :param agg: aggregator factory, e.g. `Sum` or `lambda: Fold(operator.mul, 1)`.
+            If provided, aggregated value of each window is yielded instead of tuple of items.
+
+        :return: iterator of windows
+
+        :raise ValueError: if duration or step is not positive
+        """
+        if step is None:
+            step = duration
+        if duration <= 0 or step <= 0:
+            raise ValueError('duration and step must be greater than 0')
+
+        loop = asyncio.get_running_loop()
+        poller = NextPoller(self._it)
+        window: _TimedWindow[_T] = _TimedWindow(agg)
+        end = loop.time() + step
+        try:
+            while True:
+                try:
+                    item = await poller.next(end - loop.time())
+                except TimeoutError:
+                    received = False
+                except StopAsyncIteration:
+                    break
+                else:
+                    received = True
+
+                now = loop.time()
+                while now >= end:
+                    window.evict(end - duration)
+                    if window:
+                        yield window.result()
+                    else:
+                        # skip empty windows at once
+                        end += step * ((now - end) // step)
+                    end += step
+                if received and now >= end - duration:
+                    window.add(now, item)
+        finally:
+            await poller.aclose()
+
+        while window:
+            window.evict(end - duration)
+            if window:
+                yield window.result()
+            end += step
+
+    @async_iter
+    async def session_window(
+        self,
+        gap: float,
+        agg: Callable[[], Aggregator[_T, Any]] | None = None,
+    ) -> AsyncIterator[Any]:
+        """Group items into sessions using the event loop clock.
+        A session is yielded as soon as no new item arrives within `gap` seconds after its last item.
+
+        :param gap: max time between items of a session in seconds
+        :param agg: aggregator factory, e.g. `Sum` or `lambda: Fold(operator.mul, 1)`.
+            If provided, aggregated value of each session is yielded instead of tuple of items.
+
+        :return: iterator of sessions
+
+        :raise ValueError: if gap is not positive
+        """
+        if gap <= 0:
+            raise ValueError('gap must be greater than 0')
+
+        loop = asyncio.get_running_loop()
+        poller = NextPoller(self._it)
+        window: _TimedWindow[_T] = _TimedWindow(agg)
+        deadline = 0.
+        try:
+            while True:
+                try:
+                    item = await poller.next(deadline - loop.time() if window else None)
+                except TimeoutError:
+                    yield window.result()
+                    window.clear()
+                    continue
+                except StopAsyncIteration:
+                    break
+                now = loop.time()
+                window.add(now, item)
+                deadline = now + gap
+        finally:
+            await poller.aclose()
+
+        if window:
+            yield window.result()
+
+    @async_iter
+    async def group_by(
+        self,
+        key: _KeyFunc,
+        agg: Callable[[], Aggregator[_T, Any]] | Mapping[str, Callable[[], Aggregator[_T, Any]]] | None = None,
+        engine: str = 'hash',
+    ) -> AsyncIterator[tuple[Any, Any]]:
+        """Group items by key, yield (key, group) pairs.
+
+        The 'hash' engine groups all items and yields groups in order of their first items
+        once the iterable is exhausted. With an aggregator only one aggregator per group is kept,
+        items of the groups are not stored.
+
+        The 'sorted' engine groups consecutive items with equal keys, like `itertools.groupby()`,
+        a group is yielded as soon as an item with another key is read.
+        The items must be sorted by the key, otherwise a key may have several groups.
+        With an aggregator it keeps O(1) memory.
+
+        :param key: function to extract group key from an item
+        :param agg: aggregator factory, e.g. `Sum` or `lambda: Fold(operator.mul, 1)`,
+            or a mapping of aggregator factories by name, e.g. `{'min': Min, 'max': Max}`.
+            If provided, aggregated value of each group is yielded instead of tuple of items,
+            for a mapping the value is a dict of aggregated values by the same names.
+        :param engine: 'hash' or 'sorted'
+
+        :return: iterator of (key, group) pairs
+
+        :raise ValueError: if engine is unknown
+        """
+        if engine not in ('hash', 'sorted'):
+            raise ValueError(f'unknown engine: {engine!r}')
+        if isinstance(agg, Mapping):
+            agg = partial(Combine, agg)
+        key = offload(key, self._executor)
+        is_coroutine = asyncio.iscoroutinefunction(key)
+
+        if engine == 'hash':
+            groups: defaultdict[Any, Any] = defaultdict(list if agg is None else agg)
+            async for item in self:
+                item_key = await key(item) if is_coroutine else key(item)
+                if agg is None:
+                    groups[item_key].append(item)
+                else:
+                    groups[item_key].add(item)
+            for group_key, group in groups.items():
+                yield group_key, tuple(group) if agg is None else group.result()
+            return
+
+        group_key: Any = None
+        group: Any = None
+        async for item in self:
+            item_key = await key(item) if is_coroutine else key(item)
+            if group is None or item_key != group_key:
+                if group is not None:
+                    yield group_key, tuple(group) if agg is None else group.result()
+                group_key = item_key
+                group = [] if agg is None else agg()
+                add = group.append if agg is None else group.add
+            add(item)
+        if group is not None:
+            yield group_key, tuple(group) if agg is None else group.result()
+
+    @async_iter
+    async def join(
+        self,
+        other: AsyncIterable[_R] | Iterable[_R],
+        left_key: _KeyFunc,
+        right_key: _KeyFunc | None = None,
+        how: str = 'inner',
+        engine: str = 'hash',
+    ) -> AsyncIterator[Any]:
+        """Join items with items of `other` that have equal keys.
+
+        Join types:
+
+        - 'inner': (item, other_item) pair for each pair of matching items
+        - 'left': same as 'inner', plus (item, None) for each item without a match
+        - 'semi': items that have a match, each item once
+        - 'anti': items that do not have a match
+
+        The 'hash' engine reads `other` into a dict and then streams the items,
+        so `other` should be the smaller side. For 'semi' and 'anti' only the keys of `other` are kept.
+
+        The 'merge' engine reads both iterables in step, they must be sorted by key in ascending order.
+        It keeps only the other items of the current key, for 'semi' and 'anti' it keeps none.
+
+        :param other: iterable to join with, sync or async
+        :param left_key: function to extract the join key from an item
+        :param right_key: function to extract the join key from an item of `other`, by default `left_key`
+        :param how: 'inner', 'left', 'semi' or 'anti'
+        :param engine: 'hash' or 'merge'
+
+        :return: iterator of pairs for 'inner' and 'left', iterator of items for 'semi' and 'anti'
+
+        :raise ValueError: if how or engine is unknown
+        """
+        if how not in ('inner', 'left', 'semi', 'anti'):
+            raise ValueError(f'unknown join type: {how!r}')
+        if engine not in ('hash', 'merge'):
+            raise ValueError(f'unknown engine: {engine!r}')
+        left_key = offload(left_key, self._executor)
+        right_key = left_key if right_key is None else offload(right_key, self._executor)
+        left_is_coroutine = asyncio.iscoroutinefunction(left_key)
+        right_is_coroutine = asyncio.iscoroutinefunction(right_key)
+        others = async_iterate(other) if isinstance(other, Iterable) else aiter(other)
+
+        if engine == 'hash':
+            if how in ('semi', 'anti'):
+                keys = set()
+                async for other_item in others:
+                    keys.add(await right_key(other_item) if right_is_coroutine else right_key(other_item))
+                keep = how == 'semi'
+                async for item in self:
+                    item_key = await left_key(item) if left_is_coroutine else left_key(item)
+                    if (item_key in keys) is keep:
+                        yield item
+                return
+
+            table: defaultdict[Any, list[_R]] = defaultdict(list)
+            async for other_item in others:
+                table[await right_key(other_item) if right_is_coroutine else right_key(other_item)].append(other_item)
+            async for item in self:
+                matches = table.get(await left_key(item) if left_is_coroutine else left_key(item))
+                if matches:
+                    for other_item in matches:
+                        yield item, other_item
+                elif how == 'left':
+                    yield item, None
+            return
+
+        collect = how in ('inner', 'left')
+        other_item: Any = await anext(others, _EMPTY)
+        if other_item is not _EMPTY:
+            other_key = await right_key(other_item) if right_is_coroutine else right_key(other_item)
+        group_key: Any = _EMPTY
+        group: list[_R] = []
+        matched = False
+        async for item in self:
+            item_key = await left_key(item) if left_is_coroutine else left_key(item)
+            if group_key is _EMPTY or item_key != group_key:
+                group_key = item_key
+                group = []
+                matched = False
+                # skip other items with smaller keys, collect the ones with the same key
+                while other_item is not _EMPTY and not item_key < other_key:
+                    if other_key == item_key:
+                        matched = True
+                        if collect:
+                            group.append(other_item)
+                    other_item = await anext(others, _EMPTY)
+                    if other_item is not _EMPTY:
+                        other_key = await right_key(other_item) if right_is_coroutine else right_key(other_item)
+
+            if how == 'semi':
+                if matched:
+                    yield item
+            elif how == 'anti':
+                if not matched:
+                    yield item
+            elif group:
+                for other_item_ in group:
+                    yield item, other_item_
+            elif how == 'left':
+                yield item, None
+
+    @async_iter
+    async def distinct(
+        self,
+        key: _KeyFunc | None = None,
+        mode: str = 'exact',
+        size: int | None = None,
+        ttl: float | None = None,
+        error_rate: float = 0.01,
+    ) -> AsyncIterator[_T]:
+        """Yield items whose keys were not seen before, the first item of each key is kept.
+
+        Modes:
+
+        - 'exact': all keys are kept in a set, memory grows with the number of distinct keys.
+        - 'lru': only recently seen keys are kept, at most `size` keys and for `ttl` seconds since a key was
+          last seen by the event loop clock. A duplicate is dropped only if its key is still remembered,
+          this suits event streams where duplicates arrive close together.
+        - 'bloom': keys are kept in a Bloom filter sized for `size` keys, memory is fixed.
+          A new key is dropped as a duplicate with probability about `error_rate`, a duplicate is always dropped.
+
+        :param key: function to extract the key from an item, by default the item is the key
+        :param mode: 'exact', 'lru' or 'bloom'
+        :param size: 'lru' mode: max number of remembered keys, 'bloom' mode: expected number of distinct keys
+        :param ttl: 'lru' mode: time in seconds to remember a key
+        :param error_rate: 'bloom' mode: false positive rate at `size` keys
+
+        :return: iterator of distinct items
+
+        :raise ValueError: if mode is unknown or its parameters are invalid
+        """
+        if mode not in ('exact', 'lru', 'bloom'):
+            raise ValueError(f'unknown mode: {mode!r}')
+        if key is not None:
+            key = offload(key, self._executor)
+        is_coroutine = asyncio.iscoroutinefunction(key)
+
+        if mode == 'exact':
+            seen: set[Any] = set()
+            async for item in self:
+                if key is None:
+                    item_key = item
+                else:
+                    item_key = await key(item) if is_coroutine else key(item)
+                if item_key not in seen:
+                    seen.add(item_key)
+                    yield item
+            return
+
+        # validated here rather than by the key stores, so errors name the parameters of this method
+        if size is not None and size < 1:
+            raise ValueError('size must be greater than 0')
+        keys: RecentSet | BloomFilter
+        if mode == 'lru':
+            if size is None and ttl is None:
+                raise ValueError('size or ttl must be provided in lru mode')
+            if ttl is not None and ttl <= 0:
+                raise ValueError('ttl must be greater than 0')
+            keys = RecentSet(size, ttl, asyncio.get_running_loop().time)
+        else:
+            if size is None:
+                raise ValueError('size must be provided in bloom mode')
+            keys = BloomFilter(size, error_rate)
+
+        async for item in self:
+            if key is None:
+                item_key = item
+            else:
+                item_key = await key(item) if is_coroutine else key(item)
+            if keys.add(item_key):
+                yield item
 
     @async_iter
     async def flatten(self: 'AsyncIter[AsyncIterator[_T]]') -> AsyncIterator[_T]:
@@ -653,3 +1696,228 @@ class AsyncIter(Generic[_T]):
                 raise TypeError(
                     f"Item of type {type(iterable)} is not iterable"
                 )
+
+
+class ChunkedAsyncIter(AsyncIter[_T]):
+    """AsyncIter that passes items between element-wise methods in chunks
+
+    Created by `AsyncIter.chunked_mode()` and `AsyncIter.from_sync(it, chunk_size=...)`.
+    """
+    __slots__ = ('_chunks', '_started')
+
+    def __init__(self, chunks: AsyncIterator[list[_T]]):
+        self._chunks = chunks
+        self._started = [False]
+        super().__init__(unchunk(chunks, self._started))
+
+    def _derive(self, chunks: AsyncIterator[list[_R]]) -> 'ChunkedAsyncIter[_R]':
+        it = ChunkedAsyncIter(chunks)
+        it._executor = self._executor
+        return it
+
+    def chunked_mode(self, chunk_size: int = 256) -> 'AsyncIter[_T]':
+        if self._started[0]:
+            return super().chunked_mode(chunk_size)
+        return self
+
+    def enumerate(self, start: int = 0) -> 'AsyncIter[tuple[int, _T]]':
+        if self._started[0]:
+            return super().enumerate(start)
+        return self._derive(_enumerate_chunks(self._chunks, start))
+
+    def map(
+        self,
+        func: Callable[[_T], _R | Awaitable[_R]],
+        concurrency: int = 1,
+        ordered: bool = True,
+    ) -> 'AsyncIter[_R]':
+        if self._started[0] or concurrency != 1:
+            return super().map(func, concurrency, ordered)
+        return self._derive(_map_chunks(self._chunks, offload(func, self._executor)))
+
+    def skip_where(self, func: _ConditionFunc, concurrency: int = 1) -> 'AsyncIter[_T]':
+        if self._started[0] or concurrency != 1:
+            return super().skip_where(func, concurrency)
+        return self._derive(_filter_chunks(self._chunks, offload(func, self._executor), invert=True))
+
+    def where(self, func: _ConditionFunc, concurrency: int = 1) -> 'AsyncIter[_T]':
+        if self._started[0] or concurrency != 1:
+            return super().where(func, concurrency)
+        return self._derive(_filter_chunks(self._chunks, offload(func, self._executor)))
+
+    def take_while(self, func: _ConditionFunc) -> 'AsyncIter[_T]':
+        if self._started[0]:
+            return super().take_while(func)
+        return self._derive(_take_while_chunks(self._chunks, offload(func, self._executor)))
+
+
+class FusedAsyncIter(AsyncIter[_T]):
+    """AsyncIter that fuses element-wise methods into a single async generator
+
+    Created by `AsyncIter.fuse()`.
+    """
+
+    __slots__ = ('_upstream', '_stages', '_started')
+
+    def __init__(self, upstream: AsyncIterator[Any], stages: tuple[tuple[str, Any, bool], ...] = ()):
+        self._upstream = upstream
+        self._stages = stages
+        self._started = [False]
+        fused = compile_stages(tuple((kind, is_coroutine) for kind, _, is_coroutine in stages), is_async=True)
+        super().__init__(fused(self._started, upstream, *(arg for _, arg, _ in stages)))
+
+    def _extend(self, kind: str, arg: Any) -> 'FusedAsyncIter[Any]':
+        is_coroutine = False
+        if callable(arg):
+            arg = offload(arg, self._executor)
+            is_coroutine = asyncio.iscoroutinefunction(arg)
+        it = FusedAsyncIter(self._upstream, (*self._stages, (kind, arg, is_coroutine)))
+        it._executor = self._executor
+        return it
+
+    def fuse(self) -> 'AsyncIter[_T]':
+        if self._started[0]:
+            return super().fuse()
+        return self
+
+    def enumerate(self, start: int = 0) -> 'AsyncIter[tuple[int, _T]]':
+        if self._started[0]:
+            return super().enumerate(start)
+        return self._extend('enumerate', start)
+
+    def take(self, limit: int) -> 'AsyncIter[_T]':
+        if self._started[0]:
+            return super().take(limit)
+        return self._extend('take', limit)
+
+    def map(
+        self,
+        func: Callable[[_T], _R | Awaitable[_R]],
+        concurrency: int = 1,
+        ordered: bool = True,
+    ) -> 'AsyncIter[_R]':
+        if self._started[0] or concurrency != 1:
+            return super().map(func, concurrency, ordered)
+        return self._extend('map', func)
+
+    def skip(self, count: int) -> 'AsyncIter[_T]':
+        if self._started[0]:
+            return super().skip(count)
+        return self._extend('skip', count)
+
+    def skip_where(self, func: _ConditionFunc, concurrency: int = 1) -> 'AsyncIter[_T]':
+        if self._started[0] or concurrency != 1:
+            return super().skip_where(func, concurrency)
+        return self._extend('skip_where', func)
+
+    def where(self, func: _ConditionFunc, concurrency: int = 1) -> 'AsyncIter[_T]':
+        if self._started[0] or concurrency != 1:
+            return super().where(func, concurrency)
+        return self._extend('where', func)
+
+    def take_while(self, func: _ConditionFunc) -> 'AsyncIter[_T]':
+        if self._started[0]:
+            return super().take_while(func)
+        return self._extend('take_while', func)
+
+
+async def _enumerate_chunks(chunks: AsyncIterator[list[_T]], start: int) -> AsyncIterator[list[tuple[int, _T]]]:
+    index = start
+    async for chunk in chunks:
+        yield list(zip(range(index, index + len(chunk)), chunk, strict=True))
+        index += len(chunk)
+
+
+async def _map_chunks(chunks: AsyncIterator[list[_T]], func: Callable) -> AsyncIterator[list[_R]]:
+    if asyncio.iscoroutinefunction(func):
+        async for chunk in chunks:
+            yield [await func(item) for item in chunk]
+    else:
+        async for chunk in chunks:
+            yield list(map(func, chunk))
+
+
+async def _filter_chunks(
+    chunks: AsyncIterator[list[_T]],
+    func: Callable,
+    invert: bool = False,
+) -> AsyncIterator[list[_T]]:
+    if asyncio.iscoroutinefunction(func):
+        async for chunk in chunks:
+            if filtered := [item for item in chunk if bool(await func(item)) is not invert]:
+                yield filtered
+    else:
+        filter_ = itertools.filterfalse if invert else filter
+        async for chunk in chunks:
+            if filtered := list(filter_(func, chunk)):
+                yield filtered
+
+
+async def _take_while_chunks(chunks: AsyncIterator[list[_T]], func: Callable) -> AsyncIterator[list[_T]]:
+    is_coroutine_func = asyncio.iscoroutinefunction(func)
+    async for chunk in chunks:
+        for index, item in enumerate(chunk):
+            if not (await func(item) if is_coroutine_func else func(item)):
+                if index:
+                    yield chunk[:index]
+                return
+        yield chunk
+
+
+class _TimedWindow(Generic[_T]):
+    """Items of a time window with their arrival time, aggregated incrementally if aggregator is provided"""
+
+    __slots__ = ('_agg', '_aggregator', '_items')
+
+    def __init__(self, agg: Callable[[], Aggregator[_T, Any]] | None):
+        self._agg = agg
+        self._aggregator = None if agg is None else agg()
+        self._items: deque[tuple[float, _T]] = deque()
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def add(self, timestamp: float, item: _T) -> None:
+        self._items.append((timestamp, item))
+        if self._aggregator is not None:
+            self._aggregator.add(item)
+
+    def evict(self, cutoff: float) -> None:
+        """Remove items that arrived before cutoff"""
+        items = self._items
+        if items and items[-1][0] < cutoff:
+            self.clear()
+            return
+        while items and items[0][0] < cutoff:
+            _, item = items.popleft()
+            if self._aggregator is not None:
+                self._aggregator.remove(item)
+
+    def clear(self) -> None:
+        self._items.clear()
+        if self._agg is not None:
+            self._aggregator = self._agg()
+
+    def result(self) -> Any:
+        if self._aggregator is None:
+            return tuple(item for _, item in self._items)
+        return self._aggregator.result()
+
+
+def _identity(value: _T) -> _T:
+    return value
+
+
+class _ReversedKey:
+    """Comparison key with reversed order"""
+
+    __slots__ = ('key',)
+
+    def __init__(self, key: Any):
+        self.key = key
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _ReversedKey) and bool(self.key == other.key)
+
+    def __lt__(self, other: '_ReversedKey') -> bool:
+        return bool(other.key < self.key)
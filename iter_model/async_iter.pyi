@@ -1,11 +1,16 @@
-from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
-from typing import Generic, ParamSpec, TypeVar
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Mapping, Sequence
+from concurrent.futures import Executor
+from typing import Any, Generic, ParamSpec, TypeVar, overload
 
+from .aggregators import Aggregator
 from .async_utils import asyncify as asyncify
+from .cache import AsyncCache
 from .empty_iterator import EmptyAsyncIterator as EmptyAsyncIterator
+from .sync_iter import SyncIter
 
 _T = TypeVar('_T')
 _R = TypeVar('_R')
+_K = TypeVar('_K')
 _P = ParamSpec('_P')
 _DefaultT = TypeVar('_DefaultT')
 _KeyFunc = Callable[[_T], _R | Awaitable[_R]]
@@ -16,32 +21,76 @@ def async_iter(func: Callable[_P, AsyncIterable[_T]]) -> Callable[_P, AsyncIter[
 
 class AsyncIter(Generic[_T]):
     _it: AsyncIterator[_T]
+    _executor: Executor | None
 
     def __init__(self, it: AsyncIterable[_T]) -> None: ...
     def __aiter__(self) -> AsyncIterator[_T]: ...
     async def __anext__(self) -> _T: ...
 
     @classmethod
-    def from_sync(cls, it: Iterable[_T]) -> AsyncIter[_T]: ...
+    def from_sync(
+        cls,
+        it: Iterable[_T],
+        chunk_size: int | None = ...,
+        thread: bool = ...,
+        prefetch: int = ...,
+    ) -> AsyncIter[_T]: ...
     @classmethod
     def empty(cls) -> AsyncIter[_T]: ...
+    def fuse(self) -> AsyncIter[_T]: ...
+    def chunked_mode(self, chunk_size: int = ...) -> AsyncIter[_T]: ...
+    def with_executor(self, executor: Executor | None) -> AsyncIter[_T]: ...
+    def to_sync(self, prefetch: int = ...) -> SyncIter[_T]: ...
     async def to_list(self) -> list[_T]: ...
     async def to_tuple(self) -> tuple[_T, ...]: ...
     async def to_set(self) -> set[_T]: ...
     def enumerate(self, start: int = ...) -> AsyncIter[tuple[int, _T]]: ...
     def take(self, limit: int) -> AsyncIter[_T]: ...
-    def map(self, func: Callable[[_T], _R | Awaitable[_R]]) -> AsyncIter[_R]: ...
+    @overload
+    def map(
+        self,
+        func: Callable[[_T], Awaitable[_R]],
+        concurrency: int = ...,
+        ordered: bool = ...,
+    ) -> AsyncIter[_R]: ...
+    @overload
+    def map(
+        self,
+        func: Callable[[_T], _R],
+        concurrency: int = ...,
+        ordered: bool = ...,
+    ) -> AsyncIter[_R]: ...
     def skip(self, count: int) -> AsyncIter[_T]: ...
     def skip_while(self, func: _ConditionFunc) -> AsyncIter[_T]: ...
-    def skip_where(self, func: _ConditionFunc) -> AsyncIter: ...
+    def skip_where(self, func: _ConditionFunc, concurrency: int = ...) -> AsyncIter: ...
     async def count(self) -> int: ...
-    async def first_where(self, func: _ConditionFunc, default: _DefaultT = ...) -> _T | _DefaultT: ...
-    async def last_where(self, func: _ConditionFunc, default: _DefaultT = ...) -> _T | _DefaultT: ...
-    def where(self, func: _ConditionFunc) -> AsyncIter[_T]: ...
+    async def first_where(
+        self,
+        func: _ConditionFunc,
+        default: _DefaultT = ...,
+        concurrency: int = ...,
+    ) -> _T | _DefaultT: ...
+    async def last_where(
+        self,
+        func: _ConditionFunc,
+        default: _DefaultT = ...,
+        concurrency: int = ...,
+    ) -> _T | _DefaultT: ...
+    def where(self, func: _ConditionFunc, concurrency: int = ...) -> AsyncIter[_T]: ...
     def take_while(self, func: _ConditionFunc) -> AsyncIter[_T]: ...
     async def next(self) -> _T: ...
     async def last(self) -> _T: ...
     def chain(self, *iterables: AsyncIterator[_T]) -> AsyncIter[_T]: ...
+    def merge(self, *iterables: AsyncIterable[_T], buffer: int = ...) -> AsyncIter[_T]: ...
+    def merge_sorted(
+        self,
+        *iterables: AsyncIterable[_T],
+        key: _KeyFunc | None = ...,
+        buffer: int = ...,
+    ) -> AsyncIter[_T]: ...
+    def prefetch(self, n: int = ...) -> AsyncIter[_T]: ...
+    def cache(self, max_in_memory: int | None = ..., block_size: int = ...) -> AsyncCache[_T]: ...
+    def tee(self, n: int = ..., buffer: int = ...) -> tuple[AsyncIter[_T], ...]: ...
     async def all(self) -> bool: ...
     async def any(self) -> bool: ...
     def mark_first(self) -> AsyncIter[tuple[_T, bool]]: ...
@@ -50,6 +99,23 @@ class AsyncIter(Generic[_T]):
     async def reduce(self, func: _BinaryFunc, initial: _T = ...) -> _T | _R: ...
     async def max(self, key: _KeyFunc | None = ..., default: _DefaultT = ...) -> _T | _DefaultT: ...
     async def min(self, key: _KeyFunc | None = ..., default: _DefaultT = ...) -> _T | _DefaultT: ...
+    async def approx_distinct(self, precision: int = ...) -> int: ...
+    async def approx_quantiles(self, qs: Sequence[float], k: int = ...) -> list[_T]: ...
+    async def reservoir_sample(self, k: int, seed: int | None = ...) -> list[_T]: ...
+    def sort(
+        self,
+        key: _KeyFunc | None = ...,
+        reverse: bool = ...,
+        max_in_memory: int | None = ...,
+        block_size: int = ...,
+    ) -> AsyncIter[_T]: ...
+    def top_k(
+        self,
+        k: int,
+        key: _KeyFunc | None = ...,
+        reverse: bool = ...,
+        concurrency: int = ...,
+    ) -> AsyncIter[_T]: ...
     def accumulate(self, func: _BinaryFunc = ..., initial: _T | None = ...) -> AsyncIter[_R]: ...
     def append_left(self, item: _T) -> AsyncIter[_T]: ...
     def append_right(self, item: _T) -> AsyncIter[_T]: ...
@@ -61,5 +127,93 @@ class AsyncIter(Generic[_T]):
     async def contains(self, item: _T) -> bool: ...
     async def is_empty(self) -> bool: ...
     def pairwise(self) -> AsyncIter[tuple[_T, _T]]: ...
-    def batches(self, batch_size: int) -> AsyncIter[tuple[_T, ...]]: ...
+    def batches(
+        self,
+        batch_size: int,
+        max_wait: float | None = ...,
+        max_weight: float | None = ...,
+        weight: Callable[[_T], float] = ...,
+    ) -> AsyncIter[tuple[_T, ...]]: ...
+    @overload
+    def tumbling_window(self, size: int, agg: None = ...) -> AsyncIter[tuple[_T, ...]]: ...
+    @overload
+    def tumbling_window(self, size: int, agg: Callable[[], Aggregator[_T, _R]]) -> AsyncIter[_R]: ...
+    @overload
+    def sliding_window(self, size: int, step: int = ..., agg: None = ...) -> AsyncIter[tuple[_T, ...]]: ...
+    @overload
+    def sliding_window(self, size: int, step: int, agg: Callable[[], Aggregator[_T, _R]]) -> AsyncIter[_R]: ...
+    @overload
+    def sliding_window(self, size: int, *, agg: Callable[[], Aggregator[_T, _R]]) -> AsyncIter[_R]: ...
+    @overload
+    def time_window(
+        self,
+        duration: float,
+        step: float | None = ...,
+        agg: None = ...,
+    ) -> AsyncIter[tuple[_T, ...]]: ...
+    @overload
+    def time_window(
+        self,
+        duration: float,
+        step: float | None,
+        agg: Callable[[], Aggregator[_T, _R]],
+    ) -> AsyncIter[_R]: ...
+    @overload
+    def time_window(self, duration: float, *, agg: Callable[[], Aggregator[_T, _R]]) -> AsyncIter[_R]: ...
+    @overload
+    def session_window(self, gap: float, agg: None = ...) -> AsyncIter[tuple[_T, ...]]: ...
+    @overload
+    def session_window(self, gap: float, agg: Callable[[], Aggregator[_T, _R]]) -> AsyncIter[_R]: ...
+    @overload
+    def group_by(
+        self,
+        key: Callable[[_T], _K | Awaitable[_K]],
+        agg: None = ...,
+        engine: str = ...,
+    ) -> AsyncIter[tuple[_K, tuple[_T, ...]]]: ...
+    @overload
+    def group_by(
+        self,
+        key: Callable[[_T], _K | Awaitable[_K]],
+        agg: Callable[[], Aggregator[_T, _R]],
+        engine: str = ...,
+    ) -> AsyncIter[tuple[_K, _R]]: ...
+    @overload
+    def group_by(
+        self,
+        key: Callable[[_T], _K | Awaitable[_K]],
+        agg: Mapping[str, Callable[[], Aggregator[_T, Any]]],
+        engine: str = ...,
+    ) -> AsyncIter[tuple[_K, dict[str, Any]]]: ...
+    def join(
+        self,
+        other: AsyncIterable[_R] | Iterable[_R],
+        left_key: Callable[[_T], Any | Awaitable[Any]],
+        right_key: Callable[[_R], Any | Awaitable[Any]] | None = ...,
+        how: str = ...,
+        engine: str = ...,
+    ) -> AsyncIter[Any]: ...
+    def distinct(
+        self,
+        key: _KeyFunc | None = ...,
+        mode: str = ...,
+        size: int | None = ...,
+        ttl: float | None = ...,
+        error_rate: float = ...,
+    ) -> AsyncIter[_T]: ...
     def flatten(self: AsyncIter[AsyncIterator[_T]]) -> AsyncIter[_T]: ...
+
+class ChunkedAsyncIter(AsyncIter[_T]):
+    _chunks: AsyncIterator[list[_T]]
+    _started: list[bool]
+
+    def __init__(self, chunks: AsyncIterator[list[_T]]) -> None: ...
+    def _derive(self, chunks: AsyncIterator[list[_R]]) -> ChunkedAsyncIter[_R]: ...
+
+class FusedAsyncIter(AsyncIter[_T]):
+    _upstream: AsyncIterator[Any]
+    _stages: tuple[tuple[str, Any, bool], ...]
+    _started: list[bool]
+
+    def __init__(self, upstream: AsyncIterator[Any], stages: tuple[tuple[str, Any, bool], ...] = ...) -> None: ...
+    def _extend(self, kind: str, arg: Any) -> FusedAsyncIter[Any]: ...
@@ -1,20 +1,525 @@
 import asyncio
-from collections.abc import Awaitable, Callable
-from functools import wraps
-from typing import ParamSpec, TypeVar, cast
+import heapq
+import itertools
+import threading
+from collections import deque
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Sequence,
+)
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import aclosing
+from functools import partial, wraps
+from typing import Any, Generic, ParamSpec, TypeVar, cast
 
 _T = TypeVar('_T')
 _R = TypeVar('_R')
 _P = ParamSpec('_P')
 
+_background_loop: asyncio.AbstractEventLoop | None = None
+_background_thread: threading.Thread | None = None
+_background_loop_lock = threading.Lock()
 
-def asyncify(func: Callable[_P, _R | Awaitable[_R]]) -> Callable[_P, Awaitable[_R]]:
+
+def asyncify(
+    func: Callable[_P, _R | Awaitable[_R]],
+    executor: Executor | None = None,
+) -> Callable[_P, Awaitable[_R]]:
+    """Convert function to coroutine function, coroutine functions are returned as is
+
+    :param func: function to convert
+    :param executor: if provided, the sync function is called in the executor
+        instead of blocking the event loop, otherwise it is called inline
+    :return: coroutine function
+    """
 
     if asyncio.iscoroutinefunction(func):
         return cast(Callable[_P, Awaitable[_R]], func)
 
+    if executor is not None:
+        @wraps(func)
+        async def offload_wrapper(*args: _P.args, **kwargs: _P.kwargs) -> _R:
+            loop = asyncio.get_running_loop()
+            return cast(_R, await loop.run_in_executor(executor, partial(func, *args, **kwargs)))
+
+        return cast(Callable[_P, Awaitable[_R]], offload_wrapper)
+
     @wraps(func)
     async def wrapper(*args: _P.args, **kwargs: _P.kwargs) -> _R:
         return cast(_R, func(*args, **kwargs))
 
     return cast(Callable[_P, Awaitable[_R]], wrapper)
+
+
+def offload(func: Callable[_P, _R], executor: Executor | None) -> Callable[_P, _R | Awaitable[_R]]:
+    """Wrap sync function to be called in the executor
+
+    Unlike `asyncify`, the function is returned as is when there is no executor,
+    so the caller can check it once with `asyncio.iscoroutinefunction`
+    and call sync functions directly instead of awaiting a wrapper coroutine per item.
+
+    :param func: function to wrap
+    :param executor: executor to call sync function in
+    :return: func or coroutine function that runs func in the executor
+    """
+    if executor is None:
+        return func
+    return asyncify(func, executor)
+
+
+async def concurrent_map(
+    func: Callable[[_T], Awaitable[_R]],
+    it: AsyncIterator[_T],
+    concurrency: int,
+    ordered: bool = True,
+) -> AsyncGenerator[_R, None]:
+    """Apply func to items of the iterator keeping up to `concurrency` calls in flight
+
+    The source is read only when there is a free slot, so a slow consumer
+    also slows down reading of the source.
+    Calls that are still in flight are cancelled when the generator is closed.
+
+    :param func: async function
+    :param it: source iterator
+    :param concurrency: max number of calls in flight
+    :param ordered: yield results in the order of the source,
+        otherwise yield results as soon as they are ready
+
+    :return: async iterator of results
+
+    :raise ValueError: if concurrency is less than 1
+    """
+    if concurrency < 1:
+        raise ValueError('concurrency must be greater than 0')
+
+    pending: deque[asyncio.Future[_R]] = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    item = await anext(it)
+                except StopAsyncIteration:
+                    exhausted = True
+                else:
+                    pending.append(asyncio.ensure_future(func(item)))
+
+            if not pending:
+                return
+
+            if ordered:
+                yield await pending.popleft()
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.remove(task)
+                for task in done:
+                    yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def concurrent_filter(
+    func: Callable[[_T], Awaitable[bool]],
+    it: AsyncIterator[_T],
+    concurrency: int,
+    invert: bool = False,
+) -> AsyncGenerator[_T, None]:
+    """Filter items of the iterator by condition keeping up to `concurrency` checks in flight.
+    Items are yielded in the order of the source.
+
+    :param func: async condition function
+    :param it: source iterator
+    :param concurrency: max number of checks in flight
+    :param invert: yield items for which the condition is not satisfied
+
+    :return: async iterator of items
+
+    :raise ValueError: if concurrency is less than 1
+    """
+    async def check(item: _T) -> tuple[_T, bool]:
+        return item, bool(await func(item)) is not invert
+
+    async with aclosing(concurrent_map(check, it, concurrency)) as results:
+        async for item, satisfied in results:
+            if satisfied:
+                yield item
+
+
+async def async_iterate(it: Iterable[_T]) -> AsyncGenerator[_T, None]:
+    """Iterate sync iterable as async one
+
+    :param it: source iterable
+    :return: async iterator of items
+    """
+    for item in it:
+        yield item
+
+
+async def sync_chunks(it: Iterable[_T], chunk_size: int) -> AsyncGenerator[list[_T], None]:
+    """Split sync iterable into lists of `chunk_size` items
+
+    :param it: source iterable
+    :param chunk_size: max number of items in a chunk
+    :return: async iterator of chunks
+
+    :raise ValueError: if chunk_size is less than 1
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be greater than 0')
+
+    iterator = iter(it)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield chunk
+
+
+async def async_chunks(it: AsyncIterator[_T], chunk_size: int) -> AsyncGenerator[list[_T], None]:
+    """Split async iterator into lists of `chunk_size` items
+
+    :param it: source iterator
+    :param chunk_size: max number of items in a chunk
+    :return: async iterator of chunks
+
+    :raise ValueError: if chunk_size is less than 1
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be greater than 0')
+
+    chunk = []
+    async for item in it:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _read_chunk(it: Iterator[_T], chunk_size: int) -> list[_T]:
+    return list(itertools.islice(it, chunk_size))
+
+
+async def thread_chunks(it: Iterable[_T], chunk_size: int, prefetch: int) -> AsyncGenerator[list[_T], None]:
+    """Split sync iterable into lists of `chunk_size` items, advancing it in a dedicated thread
+
+    Up to `prefetch` chunks are read ahead. When the generator is closed,
+    the iterable is closed in the same thread, e.g. a generator is closed there after its last read.
+
+    :param it: source iterable
+    :param chunk_size: max number of items in a chunk
+    :param prefetch: max number of chunks read ahead
+    :return: async iterator of chunks
+
+    :raise ValueError: if chunk_size or prefetch is less than 1
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be greater than 0')
+    if prefetch < 1:
+        raise ValueError('prefetch must be greater than 0')
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(1, thread_name_prefix='iter_model')
+    iterator = iter(it)
+    read_chunk = partial(_read_chunk, iterator, chunk_size)
+    pending: deque[asyncio.Future[list[_T]]] = deque()
+    try:
+        while True:
+            while len(pending) < prefetch:
+                pending.append(loop.run_in_executor(executor, read_chunk))
+            chunk = await pending.popleft()
+            if chunk:
+                yield chunk
+            if len(chunk) < chunk_size:
+                return
+    finally:
+        for future in pending:
+            future.cancel()
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await loop.run_in_executor(executor, close)
+        executor.shutdown(wait=False)
+
+
+async def unchunk(chunks: AsyncGenerator[list[_T], None], started: list[bool]) -> AsyncGenerator[_T, None]:
+    """Yield items of chunks one by one, chunks are closed when the generator is closed
+
+    :param chunks: async generator of chunks
+    :param started: single-item list, set to True once the iteration starts
+    :return: async iterator of items
+    """
+    started[0] = True
+    async with aclosing(chunks):
+        async for chunk in chunks:
+            for item in chunk:
+                yield item
+
+
+async def _anext(it: AsyncIterator[_T]) -> _T:
+    return await anext(it)
+
+
+class NextPoller(Generic[_T]):
+    """Wait for the next item of async iterator with timeout.
+
+    Unlike `asyncio.wait_for(anext(it), timeout)`, the pending `anext` call is not cancelled on timeout,
+    so the iterator is not broken and the next call continues waiting for the same item.
+    """
+
+    __slots__ = ('_it', '_task')
+
+    def __init__(self, it: AsyncIterator[_T]):
+        self._it = it
+        self._task: asyncio.Task[_T] | None = None
+
+    async def next(self, timeout: float | None = None) -> _T:
+        """Return the next item
+
+        :param timeout: max time to wait in seconds, None to wait without limit
+        :return: next item
+
+        :raise TimeoutError: if the item is not ready in time
+        :raise StopAsyncIteration: if the iterator is exhausted
+        """
+        if self._task is None:
+            self._task = asyncio.ensure_future(_anext(self._it))
+        done, _ = await asyncio.wait((self._task,), timeout=timeout)
+        if not done:
+            raise TimeoutError
+        task, self._task = self._task, None
+        return task.result()
+
+    async def aclose(self) -> None:
+        """Cancel pending `anext` call"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+async def _pump(it: AsyncIterable[_T], queue: 'asyncio.Queue[tuple[bool, Any]]') -> None:
+    """Put items of the iterable to the queue as `(True, item)`,
+    then `(False, None)` when the iterable is exhausted or `(False, error)` if it fails.
+    The iterable is closed when the pump is done or cancelled.
+    """
+    iterator = aiter(it)
+    try:
+        async for item in iterator:
+            await queue.put((True, item))
+    except Exception as error:
+        await queue.put((False, error))
+    else:
+        await queue.put((False, None))
+    finally:
+        aclose = getattr(iterator, 'aclose', None)
+        if aclose is not None:
+            await aclose()
+
+
+async def merge(iterables: Sequence[AsyncIterable[_T]], buffer: int) -> AsyncGenerator[_T, None]:
+    """Read iterables concurrently and yield items as soon as they arrive
+
+    Each iterable is read by its own task into a shared queue of `buffer` items.
+    Tasks that are still running are cancelled when the generator is closed or one of the iterables fails.
+
+    :param iterables: source iterables
+    :param buffer: max number of items read ahead of the consumer
+    :return: async iterator of items
+
+    :raise ValueError: if buffer is less than 1
+    """
+    if buffer < 1:
+        raise ValueError('buffer must be greater than 0')
+
+    queue: asyncio.Queue[tuple[bool, Any]] = asyncio.Queue(buffer)
+    tasks = [asyncio.ensure_future(_pump(it, queue)) for it in iterables]
+    running = len(tasks)
+    try:
+        while running:
+            is_item, value = await queue.get()
+            if is_item:
+                yield value
+            elif value is None:
+                running -= 1
+            else:
+                raise value
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _pump_chunks(it: AsyncIterable[_T], queue: 'asyncio.Queue[tuple[bool, Any]]', chunk_size: int) -> None:
+    """Put items of the iterable to the queue in lists of up to `chunk_size` items as `(True, chunk)`,
+    then `(False, None)` when the iterable is exhausted or `(False, error)` if it fails.
+    A chunk is put early if the queue is empty, so the consumer does not wait for a slow iterable to fill it.
+    The iterable is closed when the pump is done or cancelled.
+    """
+    iterator = aiter(it)
+    chunk: list[_T] = []
+    error: Exception | None = None
+    try:
+        try:
+            async for item in iterator:
+                chunk.append(item)
+                if len(chunk) == chunk_size or queue.empty():
+                    await queue.put((True, chunk))
+                    chunk = []
+        except Exception as exc:
+            error = exc
+        if chunk:
+            await queue.put((True, chunk))
+        await queue.put((False, error))
+    finally:
+        aclose = getattr(iterator, 'aclose', None)
+        if aclose is not None:
+            await aclose()
+
+
+async def merge_sorted(
+    iterables: Sequence[AsyncIterable[_T]],
+    key: Callable[[_T], Any] | None,
+    buffer: int,
+) -> AsyncGenerator[_T, None]:
+    """Merge sorted iterables into one sorted stream, like `heapq.merge()`
+
+    Each iterable is read ahead by its own task in chunks of up to `buffer` items,
+    the heap holds the current item of each iterable.
+    Items of a chunk are passed to the heap without awaiting the queue, and their keys are computed at once.
+    Tasks that are still running are cancelled when the generator is closed or one of the iterables fails.
+
+    :param iterables: source iterables sorted by key
+    :param key: sync or async function to extract comparison key from an item
+    :param buffer: max number of items in a chunk
+    :return: async iterator of items
+
+    :raise ValueError: if buffer is less than 1
+    """
+    if buffer < 1:
+        raise ValueError('buffer must be greater than 0')
+
+    is_coroutine = asyncio.iscoroutinefunction(key)
+    queues: list[asyncio.Queue[tuple[bool, Any]]] = [asyncio.Queue(1) for _ in iterables]
+    tasks = [
+        asyncio.ensure_future(_pump_chunks(it, queue, buffer))
+        for it, queue in zip(iterables, queues, strict=True)
+    ]
+    # an entry is (key, index, item), so of items with equal keys the ones of earlier iterables go first
+    chunks: list[list[tuple[Any, int, _T]]] = [[] for _ in iterables]
+    positions = [0] * len(iterables)
+
+    async def next_chunk(index: int) -> bool:
+        is_chunk, value = await queues[index].get()
+        if not is_chunk:
+            if value is not None:
+                raise value
+            return False
+        if key is None:
+            chunks[index] = [(item, index, item) for item in value]
+        elif is_coroutine:
+            chunks[index] = [(await key(item), index, item) for item in value]
+        else:
+            chunks[index] = [(key(item), index, item) for item in value]
+        positions[index] = 0
+        return True
+
+    try:
+        heap = []
+        for index in range(len(iterables)):
+            if await next_chunk(index):
+                heap.append(chunks[index][0])
+                positions[index] = 1
+        heapq.heapify(heap)
+
+        while heap:
+            index = heap[0][1]
+            yield heap[0][2]
+            position = positions[index]
+            if position == len(chunks[index]):
+                if not await next_chunk(index):
+                    heapq.heappop(heap)
+                    continue
+                position = 0
+            heapq.heapreplace(heap, chunks[index][position])
+            positions[index] = position + 1
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Return event loop that runs forever in a daemon thread, the loop is created on the first call
+
+    :return: event loop
+    """
+    global _background_loop, _background_thread
+    with _background_loop_lock:
+        if _background_loop is None:
+            loop = asyncio.new_event_loop()
+            _background_thread = threading.Thread(target=loop.run_forever, name='iter_model-loop', daemon=True)
+            _background_thread.start()
+            _background_loop = loop
+        return _background_loop
+
+
+async def _start_pump(it: AsyncIterable[_T], queue: 'asyncio.Queue[tuple[bool, Any]]') -> 'asyncio.Task[None]':
+    return asyncio.ensure_future(_pump(it, queue))
+
+
+async def _stop(task: 'asyncio.Task[None]') -> None:
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def _get_batch(queue: 'asyncio.Queue[tuple[bool, Any]]') -> list[tuple[bool, Any]]:
+    """Wait for the first message, then take all messages that are already in the queue"""
+    batch = [await queue.get()]
+    while not queue.empty():
+        batch.append(queue.get_nowait())
+    return batch
+
+
+def sync_iterate(it: AsyncIterable[_T], prefetch: int) -> Generator[_T, None, None]:
+    """Iterate async iterable from sync code, the iterable is read on the background loop
+
+    Items are read ahead into a queue of `prefetch` items,
+    and each call to the loop takes all items that are ready at the moment,
+    so a fast iterable is handed over in batches, while items of a slow one are not delayed.
+    The iterable is closed when the generator is closed.
+
+    :param it: source iterable, it must not be bound to another event loop
+    :param prefetch: max number of items read ahead
+    :return: iterator of items
+
+    :raise ValueError: if prefetch is less than 1
+    """
+    if prefetch < 1:
+        raise ValueError('prefetch must be greater than 0')
+
+    loop = background_loop()
+    queue: asyncio.Queue[tuple[bool, Any]] = asyncio.Queue(prefetch)
+    pump = asyncio.run_coroutine_threadsafe(_start_pump(it, queue), loop).result()
+    try:
+        while True:
+            for is_item, value in asyncio.run_coroutine_threadsafe(_get_batch(queue), loop).result():
+                if is_item:
+                    yield value
+                elif value is None:
+                    return
+                else:
+                    raise value
+    finally:
+        if threading.current_thread() is _background_thread:
+            # closed on the loop itself, e.g. dropped in a callback, waiting for the pump would block the loop
+            loop.call_soon(pump.cancel)
+        else:
+            asyncio.run_coroutine_threadsafe(_stop(pump), loop).result()
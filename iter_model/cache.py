@@ -0,0 +1,202 @@
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterator, Generator, Iterator
+from typing import Generic, TypeVar
+
+from .spill import SpillFile
+
+_T = TypeVar('_T')
+
+
+class _CacheBuffer(Generic[_T]):
+    """Items recorded from the source.
+    The oldest items are spilled to a temporary file in blocks of `block_size` items,
+    once there are more than `max_in_memory` items in memory,
+    so up to `max(max_in_memory, block_size)` items are kept in memory.
+    """
+
+    __slots__ = ('_max_in_memory', '_block_size', '_memory', '_spill', '_spilled', '_exhausted', '_error')
+
+    def __init__(self, max_in_memory: int | None, block_size: int):
+        if max_in_memory is not None and max_in_memory < 0:
+            raise ValueError('max_in_memory must be a non-negative integer')
+        if block_size < 1:
+            raise ValueError('block_size must be greater than 0')
+
+        self._max_in_memory = max_in_memory
+        self._block_size = block_size
+        self._memory: list[_T] = []
+        self._spill: SpillFile[_T] = SpillFile()
+        self._spilled = 0
+        self._exhausted = False
+        self._error: Exception | None = None
+
+    def _block_to_spill(self) -> list[_T] | None:
+        memory = self._memory
+        if self._max_in_memory is None or len(memory) <= self._max_in_memory or len(memory) < self._block_size:
+            return None
+        return memory[:self._block_size]
+
+    def _drop_spilled(self) -> None:
+        del self._memory[:self._block_size]
+        self._spilled += self._block_size
+
+    def _fail(self, error: Exception) -> None:
+        self._exhausted = True
+        self._error = error
+
+    def _check_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        """Delete the spill file, the cache must not be read after that"""
+        self._spill.close()
+
+
+class SyncCache(_CacheBuffer[_T]):
+    """Iterable that records items of the iterator as they are read,
+    each `iter()` call starts a new reader from the first item.
+
+    Readers share one position in the source, so a reader that gets ahead reads the source
+    and the others replay the recorded items. Readers must be used from one thread.
+
+    :param it: source iterator
+    :param max_in_memory: number of items kept in memory, None to keep all items in memory.
+        Items are spilled in whole blocks, so up to `max(max_in_memory, block_size)` items are kept in memory.
+    :param block_size: number of items spilled to the file at once
+
+    :raise ValueError: if max_in_memory is negative or block_size is less than 1
+    """
+
+    __slots__ = ('_it',)
+
+    def __init__(self, it: Iterator[_T], max_in_memory: int | None = None, block_size: int = 1024):
+        super().__init__(max_in_memory, block_size)
+        self._it = it
+
+    def _read_source(self) -> bool:
+        if self._exhausted:
+            self._check_error()
+            return False
+        try:
+            item = next(self._it)
+        except StopIteration:
+            self._exhausted = True
+            return False
+        except Exception as error:
+            self._fail(error)
+            raise
+
+        self._memory.append(item)
+        block = self._block_to_spill()
+        if block is not None:
+            self._spill.write(block)
+            self._drop_spilled()
+        return True
+
+    def __iter__(self) -> Generator[_T, None, None]:
+        position = 0
+        block: list[_T] = []
+        block_start = 0
+        while True:
+            offset = position - self._spilled
+            if offset < 0:
+                if not block_start <= position < block_start + len(block):
+                    index = position // self._block_size
+                    block = self._spill.read(index)
+                    block_start = index * self._block_size
+                yield block[position - block_start]
+            elif offset < len(self._memory):
+                yield self._memory[offset]
+            elif self._read_source():
+                continue
+            else:
+                return
+            position += 1
+
+
+class AsyncCache(_CacheBuffer[_T]):
+    """Async iterable that records items of the iterator as they are read,
+    each `aiter()` call starts a new reader from the first item.
+
+    Readers may run concurrently in different tasks: one of them reads the source at a time,
+    the others replay the recorded items. The spill file is written and read in the default executor.
+
+    :param it: source iterator
+    :param max_in_memory: number of items kept in memory, None to keep all items in memory.
+        Items are spilled in whole blocks, so up to `max(max_in_memory, block_size)` items are kept in memory.
+    :param block_size: number of items spilled to the file at once
+
+    :raise ValueError: if max_in_memory is negative or block_size is less than 1
+    """
+
+    __slots__ = ('_it', '_lock', '_reading')
+
+    def __init__(self, it: AsyncIterator[_T], max_in_memory: int | None = None, block_size: int = 1024):
+        super().__init__(max_in_memory, block_size)
+        self._it = it
+        self._lock = asyncio.Lock()
+        self._reading: asyncio.Task[bool] | None = None
+
+    async def _read_next(self) -> bool:
+        try:
+            item = await anext(self._it)
+        except StopAsyncIteration:
+            self._exhausted = True
+            return False
+        except Exception as error:
+            self._fail(error)
+            raise
+
+        self._memory.append(item)
+        block = self._block_to_spill()
+        if block is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._spill.write, block)
+            self._drop_spilled()
+        return True
+
+    async def _read_source(self, position: int) -> bool:
+        async with self._lock:
+            if position < self._spilled + len(self._memory):
+                # read by another reader while this one was waiting for the lock
+                return True
+            if self._exhausted:
+                self._check_error()
+                return False
+            # the source is read in its own task, so a cancelled reader stops waiting for the item,
+            # but does not cancel reading it, the next reader waits for the same task
+            if self._reading is None:
+                self._reading = asyncio.ensure_future(self._read_next())
+            await asyncio.wait((self._reading,))
+            reading, self._reading = self._reading, None
+            return reading.result()
+
+    def close(self) -> None:
+        """Cancel pending read of the source and delete the spill file, the cache must not be read after that"""
+        if self._reading is not None:
+            self._reading.cancel()
+        super().close()
+
+    def __aiter__(self) -> AsyncGenerator[_T, None]:
+        return self._read()
+
+    async def _read(self) -> AsyncGenerator[_T, None]:
+        loop = asyncio.get_running_loop()
+        position = 0
+        block: list[_T] = []
+        block_start = 0
+        while True:
+            offset = position - self._spilled
+            if offset < 0:
+                if not block_start <= position < block_start + len(block):
+                    index = position // self._block_size
+                    block = await loop.run_in_executor(None, self._spill.read, index)
+                    block_start = index * self._block_size
+                yield block[position - block_start]
+            elif offset < len(self._memory):
+                yield self._memory[offset]
+            elif await self._read_source(position):
+                continue
+            else:
+                return
+            position += 1
@@ -0,0 +1,67 @@
+import itertools
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import TypeVar
+
+_T = TypeVar('_T')
+_R = TypeVar('_R')
+
+
+def _apply(func: Callable[[_T], _R], chunk: list[_T]) -> list[_R]:
+    return [func(item) for item in chunk]
+
+
+def executor_map(
+    executor: Executor,
+    func: Callable[[_T], _R],
+    it: Iterable[_T],
+    chunksize: int = 1,
+    window: int = 1,
+    ordered: bool = True,
+) -> Iterator[_R]:
+    """Lazily apply func to items of the iterable in the executor
+
+    Items are sent to the executor in chunks, and at most `window` chunks are in flight,
+    so the iterable is read only as fast as the results are consumed.
+    Chunks that are not started yet are cancelled when the generator is closed.
+
+    :param executor: executor to run func in
+    :param func: function to apply, must be picklable for process executors
+    :param it: source iterable
+    :param chunksize: number of items sent to the executor at once
+    :param window: max number of chunks in flight
+    :param ordered: yield results in the order of the items,
+        otherwise yield results of chunks as soon as they are ready
+
+    :return: iterator of results
+
+    :raise ValueError: if chunksize or window is less than 1
+    """
+    if chunksize < 1:
+        raise ValueError('chunksize must be greater than 0')
+    if window < 1:
+        raise ValueError('window must be greater than 0')
+
+    source = iter(it)
+    chunks = iter(lambda: list(itertools.islice(source, chunksize)), [])
+    pending: deque[Future[list[_R]]] = deque(
+        executor.submit(_apply, func, chunk) for chunk in itertools.islice(chunks, window)
+    )
+    try:
+        while pending:
+            if ordered:
+                future = pending.popleft()
+                future.result()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+
+            for chunk in itertools.islice(chunks, 1):
+                pending.append(executor.submit(_apply, func, chunk))
+
+            yield from future.result()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,75 @@
+import functools
+from collections.abc import Callable
+from typing import Any
+
+STAGES = frozenset(('map', 'where', 'skip_where', 'take_while', 'skip', 'take', 'enumerate'))
+
+
+def _indent(lines: list[str], level: int = 1) -> list[str]:
+    return [' ' * 4 * level + line for line in lines]
+
+
+@functools.lru_cache(maxsize=256)
+def compile_stages(stages: tuple[tuple[str, bool], ...], is_async: bool = False) -> Callable[..., Any]:
+    """Compile chain of element-wise stages to a single generator function
+
+    The compiled function has signature `fused(started, source, *args)`,
+    where `started` is a single-item list that is set to True once the iteration starts,
+    `source` is the source iterator and `args` are arguments of the stages
+    (functions for map, where, skip_where, take_while and counts for skip, take, enumerate).
+
+    :param stages: tuple of (stage kind, is coroutine function)
+    :param is_async: compile async generator function
+    :return: generator function
+
+    :raise ValueError: if a stage kind is unknown
+    """
+    async_ = 'async ' if is_async else ''
+    args = ''.join(f', f{index}' for index in range(len(stages)))
+
+    init = ['started[0] = True']
+    body: list[str] = []
+    takes: list[str] = []
+
+    def drop() -> list[str]:
+        # an item is dropped, stop before reading the next one if a `take` is exhausted
+        if not takes:
+            return ['continue']
+        return [f'if {" or ".join(f"{take} <= 0" for take in takes)}:', '    return', 'continue']
+
+    for index, (kind, is_coroutine) in enumerate(stages):
+        value = f'{"await " if is_coroutine else ""}f{index}(item)'
+        if kind == 'map':
+            body.append(f'item = {value}')
+        elif kind == 'where':
+            body += [f'if not {value}:', *_indent(drop())]
+        elif kind == 'skip_where':
+            body += [f'if {value}:', *_indent(drop())]
+        elif kind == 'take_while':
+            body += [f'if not {value}:', '    return']
+        elif kind == 'skip':
+            init.append(f's{index} = f{index}')
+            body += [f'if s{index} > 0:', f'    s{index} -= 1', *_indent(drop())]
+        elif kind == 'take':
+            init += [f't{index} = f{index}', f'if t{index} <= 0:', '    return']
+            body.append(f't{index} -= 1')
+            takes.append(f't{index}')
+        elif kind == 'enumerate':
+            init.append(f'e{index} = f{index}')
+            body += [f'item = (e{index}, item)', f'e{index} += 1']
+        else:
+            raise ValueError(f'Unknown stage: {kind}')
+
+    body.append('yield item')
+    if takes:
+        body += [f'if {" or ".join(f"{take} <= 0" for take in takes)}:', '    return']
+
+    source = '\n'.join([
+        f'{async_}def fused(started, source{args}):',
+        *_indent(init),
+        f'    {async_}for item in source:',
+        *_indent(body, 2),
+    ])
+    namespace: dict[str, Any] = {}
+    exec(compile(source, '<iter_model.fusion>', 'exec'), namespace)
+    return namespace['fused']
@@ -0,0 +1,431 @@
+import bisect
+import hashlib
+import itertools
+import math
+import numbers
+import operator
+import random
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Sequence
+from typing import Any, TypeVar
+
+from .aggregators import Aggregator
+
+_T = TypeVar('_T')
+
+
+def _hash128(key: Any) -> int:
+    """Hash of the key, equal keys have equal hashes.
+
+    Strings and bytes are hashed by their content and numbers by their value,
+    so their hashes are stable across processes. Other keys are hashed by `hash()`,
+    which differs between processes for some types, e.g. tuples of strings.
+
+    :raise TypeError: if the key is not hashable
+    """
+    if isinstance(key, str):
+        data = b's' + key.encode()
+    elif isinstance(key, bytes):
+        data = b'b' + key
+    else:
+        if isinstance(key, int):
+            tag, value = b'n', key
+        elif isinstance(key, float) and key.is_integer():
+            tag, value = b'n', int(key)
+        elif isinstance(key, numbers.Number):
+            # numbers equal to an integer have the hash of that integer
+            tag, value = b'n', hash(key)
+        else:
+            tag, value = b'h', hash(key)
+        data = tag + value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=16).digest(), 'little')
+
+
+class BloomFilter:
+    """Set of keys in a fixed memory budget.
+    A key that was added is always found, a key that was not added is found
+    with probability `error_rate` once `capacity` keys are added (false positive).
+
+    Keys are hashed with blake2b, filters of string, bytes or number keys built in different processes
+    can be merged. Other keys are hashed by `hash()`, map them with `key=` to merge across processes.
+
+    :param capacity: expected number of keys
+    :param error_rate: false positive rate at capacity
+
+    :raise ValueError: if capacity is less than 1 or error_rate is not between 0 and 1
+    """
+
+    __slots__ = ('_capacity', '_error_rate', '_size', '_hashes', '_bits')
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if capacity < 1:
+            raise ValueError('capacity must be greater than 0')
+        if not 0 < error_rate < 1:
+            raise ValueError('error_rate must be between 0 and 1')
+
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _start(self, key: Any) -> tuple[int, int]:
+        # double hashing: halves of one 128-bit hash give the first index and the step between indexes
+        value = _hash128(key)
+        # an odd step is never 0, so the indexes of a key do not all hit one bit
+        return (value >> 64) % self._size, (value & 0xFFFFFFFFFFFFFFFF) % self._size | 1
+
+    def add(self, key: Any) -> bool:
+        """Add key to the filter
+
+        :param key: key to add
+        :return: True if the key was not in the filter
+        """
+        index, step = self._start(key)
+        size, bits = self._size, self._bits
+        new = False
+        for _ in range(self._hashes):
+            mask = 1 << (index & 7)
+            if not bits[index >> 3] & mask:
+                bits[index >> 3] |= mask
+                new = True
+            index = (index + step) % size
+        return new
+
+    def __contains__(self, key: Any) -> bool:
+        index, step = self._start(key)
+        size, bits = self._size, self._bits
+        for _ in range(self._hashes):
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+            index = (index + step) % size
+        return True
+
+    def merge(self, other: 'BloomFilter') -> None:
+        """Add keys of another filter to this filter
+
+        :param other: filter with the same capacity and error_rate
+
+        :raise ValueError: if the filters have different parameters
+        """
+        if (self._capacity, self._error_rate) != (other._capacity, other._error_rate):
+            raise ValueError('filters with different capacity or error_rate can not be merged')
+        bits = int.from_bytes(self._bits, 'little') | int.from_bytes(other._bits, 'little')
+        self._bits = bytearray(bits.to_bytes(len(self._bits), 'little'))
+
+
+class RecentSet:
+    """Set of recently seen keys, the least recently seen keys are forgotten
+    once there are more than `max_size` keys or they were not seen for `ttl` seconds.
+
+    :param max_size: max number of keys, None for no limit
+    :param ttl: time in seconds after which a key is forgotten, None for no limit
+    :param clock: function that returns current time in seconds
+
+    :raise ValueError: if both max_size and ttl are None, max_size is less than 1 or ttl is not positive
+    """
+
+    __slots__ = ('_max_size', '_ttl', '_clock', '_keys')
+
+    def __init__(
+        self,
+        max_size: int | None = None,
+        ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_size is None and ttl is None:
+            raise ValueError('max_size or ttl must be provided')
+        if max_size is not None and max_size < 1:
+            raise ValueError('max_size must be greater than 0')
+        if ttl is not None and ttl <= 0:
+            raise ValueError('ttl must be greater than 0')
+
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        # keys by the time they were last seen, the least recently seen key is the first
+        self._keys: OrderedDict[Hashable, float] = OrderedDict()
+
+    def add(self, key: Hashable) -> bool:
+        """Mark key as seen now
+
+        :param key: key to add
+        :return: True if the key was not seen recently
+        """
+        keys = self._keys
+        now = 0.
+        if self._ttl is not None:
+            now = self._clock()
+            expired = now - self._ttl
+            while keys and next(iter(keys.values())) <= expired:
+                keys.popitem(last=False)
+
+        new = key not in keys
+        if not new:
+            keys.move_to_end(key)
+        keys[key] = now
+        if self._max_size is not None and len(keys) > self._max_size:
+            keys.popitem(last=False)
+        return new
+
+
+class HyperLogLog(Aggregator[Any, int]):
+    """Estimate of the number of distinct items in `2 ** precision` bytes,
+    the relative error is about `1.04 / sqrt(2 ** precision)`, 0.8% for the default precision.
+
+    Items are hashed like `BloomFilter` keys: sketches of strings, bytes or numbers
+    built in different processes can be merged.
+
+    :param precision: number of bits of the hash that select a register, from 4 to 18
+
+    :raise ValueError: if precision is out of range
+    """
+
+    __slots__ = ('_precision', '_registers')
+
+    def __init__(self, precision: int = 14) -> None:
+        if not 4 <= precision <= 18:
+            raise ValueError('precision must be between 4 and 18')
+
+        self._precision = precision
+        self._registers = bytearray(1 << precision)
+
+    def add(self, item: Any) -> None:
+        value = _hash128(item) >> 64
+        bits = 64 - self._precision
+        index = value >> bits
+        # position of the first set bit of the rest of the hash
+        rank = bits - (value & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def result(self) -> int:
+        """Return estimated number of distinct items
+
+        :return: number of distinct items
+        """
+        registers = self._registers
+        size = len(registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(size, 0.7213 / (1 + 1.079 / size))
+        estimate = alpha * size * size / math.fsum(2. ** -register for register in registers)
+        zeros = registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # linear counting is more accurate for small cardinalities
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        """Add items of another sketch to this sketch
+
+        :param other: sketch with the same precision
+
+        :raise ValueError: if the sketches have different precision
+        """
+        if self._precision != other._precision:
+            raise ValueError('sketches with different precision can not be merged')
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+
+class QuantileSketch(Aggregator[_T, list[_T]]):
+    """KLL sketch of comparable items that estimates their quantiles in O(k) memory,
+    the rank error is about 1.7% for the default `k`.
+
+    Items are kept in levels, an item of level `h` stands for `2 ** h` items.
+    A full level is sorted and every other item is promoted to the next level.
+    The smallest and the largest items are tracked exactly, they are returned for quantiles 0 and 1.
+
+    :param qs: quantiles returned by `result()`, numbers from 0 to 1
+    :param k: size of the top level, larger k is more accurate
+    :param seed: seed of the random generator
+
+    :raise ValueError: if k is less than 2
+    """
+
+    __slots__ = ('_qs', '_k', '_levels', '_size', '_max_size', '_random', '_extremes')
+
+    def __init__(self, qs: Sequence[float] = (0.5,), k: int = 200, seed: int | None = None) -> None:
+        if k < 2:
+            raise ValueError('k must be greater than 1')
+
+        self._qs = qs
+        self._k = k
+        self._levels: list[list[_T]] = []
+        self._size = 0
+        self._max_size = 0
+        self._random = random.Random(seed)
+        # the smallest and the largest of the items dropped from the sketch
+        self._extremes: list[Any] = []
+        self._grow()
+
+    def _capacity(self, level: int) -> int:
+        # lower levels are smaller, so the total size is O(k)
+        return math.ceil(self._k * (2 / 3) ** (len(self._levels) - level - 1)) + 1
+
+    def _grow(self) -> None:
+        self._levels.append([])
+        self._max_size = sum(self._capacity(level) for level in range(len(self._levels)))
+
+    def _compress(self) -> None:
+        level = next(level for level, items in enumerate(self._levels) if len(items) >= self._capacity(level))
+        if level + 1 == len(self._levels):
+            self._grow()
+        items = self._levels[level]
+        items.sort()
+        if level == 0:
+            # items of the upper levels are already accounted, they were in the first level
+            self._track_extremes(items[0], items[-1])
+        odd = len(items) % 2
+        self._levels[level + 1].extend(items[odd + self._random.randrange(2)::2])
+        del items[odd:]
+        self._size = sum(map(len, self._levels))
+
+    def _track_extremes(self, low: Any, high: Any) -> None:
+        if self._extremes:
+            low = min(self._extremes[0], low)
+            high = max(self._extremes[1], high)
+        self._extremes = [low, high]
+
+    def add(self, item: _T) -> None:
+        self._levels[0].append(item)
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def quantiles(self, qs: Sequence[float]) -> list[_T]:
+        """Return estimated quantiles
+
+        :param qs: quantiles, numbers from 0 to 1, e.g. 0.5 for the median
+        :return: item for each quantile
+
+        :raise ValueError: if the sketch is empty or a quantile is out of range
+        """
+        if not all(0 <= q <= 1 for q in qs):
+            raise ValueError('quantiles must be between 0 and 1')
+        weighted = sorted(
+            ((item, 1 << level) for level, items in enumerate(self._levels) for item in items),
+            key=operator.itemgetter(0),
+        )
+        if not weighted:
+            raise ValueError('quantiles of empty sketch')
+
+        extremes: list[Any] = [weighted[0][0], weighted[-1][0], *self._extremes]
+        low, high = min(extremes), max(extremes)
+        ranks = list(itertools.accumulate(weight for _, weight in weighted))
+        return [
+            low if q == 0 else high if q == 1 else weighted[bisect.bisect_left(ranks, q * ranks[-1])][0]
+            for q in qs
+        ]
+
+    def result(self) -> list[_T]:
+        """Return estimated quantiles `qs`
+
+        :return: item for each quantile
+
+        :raise ValueError: if the sketch is empty or a quantile is out of range
+        """
+        return self.quantiles(self._qs)
+
+    def merge(self, other: 'QuantileSketch[_T]') -> None:
+        """Add items of another sketch to this sketch
+
+        :param other: sketch with the same k
+
+        :raise ValueError: if the sketches have different k
+        """
+        if self._k != other._k:
+            raise ValueError('sketches with different k can not be merged')
+        while len(self._levels) < len(other._levels):
+            self._grow()
+        for level, items in enumerate(other._levels):
+            self._levels[level].extend(items)
+        if other._extremes:
+            self._track_extremes(*other._extremes)
+        self._size = sum(map(len, self._levels))
+        while self._size >= self._max_size:
+            self._compress()
+
+
+class ReservoirSample(Aggregator[_T, list[_T]]):
+    """Uniform random sample of `k` items, each item is in the sample with the same probability.
+
+    Uses Algorithm L: once the sample is full, the number of items to skip before the next replacement
+    is drawn at once, so skipped items are only counted.
+
+    :param k: size of the sample
+    :param seed: seed of the random generator
+
+    :raise ValueError: if k is less than 1
+    """
+
+    __slots__ = ('_k', '_items', '_count', '_skip', '_threshold', '_random')
+
+    def __init__(self, k: int, seed: int | None = None) -> None:
+        if k < 1:
+            raise ValueError('k must be greater than 0')
+
+        self._k = k
+        self._items: list[_T] = []
+        self._count = 0
+        self._skip = 0
+        self._threshold = 1.
+        self._random = random.Random(seed)
+
+    def _start_skipping(self) -> None:
+        # the threshold is the k-th smallest of `count` uniform random keys, the sample holds the smallest keys
+        self._threshold = self._random.betavariate(self._k, self._count - self._k + 1)
+        self._next_skip()
+
+    def _next_skip(self) -> None:
+        self._skip = math.floor(math.log(self._random.random()) / math.log1p(-self._threshold))
+
+    def add(self, item: _T) -> None:
+        self._count += 1
+        if self._skip:
+            self._skip -= 1
+        elif len(self._items) < self._k:
+            self._items.append(item)
+            if len(self._items) == self._k:
+                self._start_skipping()
+        else:
+            self._items[self._random.randrange(self._k)] = item
+            self._threshold *= self._random.random() ** (1 / self._k)
+            self._next_skip()
+
+    def result(self) -> list[_T]:
+        """Return the sample, in random order once more than `k` items were added
+
+        :return: sampled items
+        """
+        return self._items.copy()
+
+    def merge(self, other: 'ReservoirSample[_T]') -> None:
+        """Sample the items of both samples, as if all their items were added to this sample
+
+        :param other: sample with the same k
+
+        :raise ValueError: if the samples have different k
+        """
+        if self._k != other._k:
+            raise ValueError('samples with different k can not be merged')
+
+        rng = self._random
+        mine, others = self._items.copy(), other._items.copy()
+        rng.shuffle(mine)
+        rng.shuffle(others)
+        # each item is taken from one of the samples in proportion to the number of items they have not taken yet
+        remaining, other_remaining = self._count, other._count
+        items: list[_T] = []
+        while len(items) < self._k and remaining + other_remaining:
+            if rng.random() * (remaining + other_remaining) < remaining:
+                items.append(mine.pop())
+                remaining -= 1
+            else:
+                items.append(others.pop())
+                other_remaining -= 1
+
+        self._items = items
+        self._count += other._count
+        self._skip = 0
+        if len(items) == self._k:
+            self._start_skipping()
@@ -0,0 +1,89 @@
+import os
+import pickle
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
+from typing import IO, Any, Generic, TypeVar, cast
+
+_T = TypeVar('_T')
+
+
+class SpillFile(Generic[_T]):
+    """Temporary file of pickled blocks of items, a block is read back by its index.
+
+    The file is created on the first write and deleted when it is closed or garbage collected.
+    Writes and reads are serialized with a lock, so they can be called from worker threads.
+    """
+
+    __slots__ = ('_file', '_offsets', '_lock')
+
+    def __init__(self) -> None:
+        self._file: IO[bytes] | None = None
+        self._offsets: list[int] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def write(self, items: list[_T]) -> int:
+        """Append block of items
+
+        :param items: items of the block
+        :return: index of the block
+        """
+        data = pickle.dumps(items, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if self._file is None:
+                self._file = tempfile.TemporaryFile()
+            self._file.seek(0, os.SEEK_END)
+            self._offsets.append(self._file.tell())
+            self._file.write(data)
+            return len(self._offsets) - 1
+
+    def read(self, index: int) -> list[_T]:
+        """Read block of items
+
+        :param index: index of the block
+        :return: items of the block
+        """
+        with self._lock:
+            file = cast(IO[bytes], self._file)
+            file.seek(self._offsets[index])
+            return cast(list[_T], pickle.load(file))
+
+    def close(self) -> None:
+        """Close and delete the file"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+
+
+def spill_sorted_run(
+    spill: SpillFile[_T],
+    items: list[_T],
+    key: Callable[[_T], Any] | None,
+    reverse: bool,
+    block_size: int,
+) -> list[int]:
+    """Sort items in place and write them to the spill file in blocks
+
+    :param spill: spill file
+    :param items: items of the run
+    :param key: sort key
+    :param reverse: sort in descending order
+    :param block_size: number of items in a block
+    :return: indexes of the blocks of the run
+    """
+    items.sort(key=key, reverse=reverse)
+    return [spill.write(items[start:start + block_size]) for start in range(0, len(items), block_size)]
+
+
+def read_run(spill: SpillFile[_T], blocks: list[int]) -> Iterator[_T]:
+    """Read items of the run block by block
+
+    :param spill: spill file
+    :param blocks: indexes of the blocks of the run
+    :return: iterator of items
+    """
+    for index in blocks:
+        yield from spill.read(index)
@@ -1,11 +1,22 @@
 import functools
+import heapq
 import itertools
 import operator
-from collections.abc import Callable, Iterable, Iterator
+import os
+from collections import defaultdict, deque
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping, Reversible, Sequence, Set
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from functools import wraps
-from typing import Generic, ParamSpec, TypeVar
+from typing import Any, Generic, ParamSpec, TypeVar, cast
 
+from .aggregators import Aggregator, Combine
+from .cache import SyncCache
 from .empty_iterator import EmptyIterator
+from .executor_utils import executor_map
+from .fusion import compile_stages
+from .sketches import BloomFilter, HyperLogLog, QuantileSketch, RecentSet, ReservoirSample
+from .spill import SpillFile, read_run, spill_sorted_run
+from .tee import SyncTee
 
 _T = TypeVar('_T')
 _R = TypeVar('_R')
@@ -40,10 +51,37 @@ def sync_iter(func: Callable[_P, Iterator[_T]]) -> Callable[_P, 'SyncIter[_T]']:
 
 class SyncIter(Generic[_T]):
 
-    __slots__ = ('_it', )
+    __slots__ = ('_it', '_source')
 
     def __init__(self, it: Iterable[_T] | Iterator[_T]):
         self._it: Iterator[_T] = iter(it)
+        # the collection is kept for fast paths of terminal methods, see `_untouched_source()`
+        self._source: Collection[Any] | None = it if isinstance(it, (Sequence, Set, Mapping)) else None
+
+    def _untouched_source(self) -> Collection[Any] | None:
+        """Return the source collection if no item was read from it yet.
+        Iterators of built-in collections report the exact number of remaining items,
+        so any read item, even through another reference to the iterator, is noticed.
+        """
+        source = self._source
+        if source is None:
+            return None
+        try:
+            if operator.length_hint(self._it, -1) == len(source):
+                return source
+        except OverflowError:
+            # ranges longer than sys.maxsize have no len()
+            pass
+        return None
+
+    def _advance(self, position: int) -> None:
+        """Move the iterator of the untouched source to the position, as if the items before it were read"""
+        setstate = getattr(self._it, '__setstate__', None)
+        if setstate is not None:
+            # iterators of sequences support setting position in O(1)
+            setstate(position)
+        else:
+            deque(itertools.islice(self._it, position), maxlen=0)
 
     def __iter__(self) -> Iterator[_T]:
         return self._it
@@ -59,6 +97,23 @@ class SyncIter(Generic[_T]):
         """
         return cls(EmptyIterator())
 
+    def fuse(self) -> 'SyncIter[_T]':
+        """Fuse the following element-wise methods
+        (`map`, `where`, `skip_where`, `skip`, `take`, `take_while`, `enumerate`)
+        into a single loop instead of a chain of nested iterators.
+
+        Only methods called before the iteration starts are fused,
+        intermediate iterators of a fused chain should not be consumed.
+
+        Usage:
+        ```python
+        SyncIter(items).fuse().map(parse).where(is_valid).map(transform).take(100).to_list()
+        ```
+
+        :return: iterable
+        """
+        return FusedSyncIter(self._it)
+
     def to_list(self) -> list[_T]:
         """Convert to list
 
@@ -104,6 +159,66 @@ class SyncIter(Generic[_T]):
          """
         return SyncIter(map(func, self))
 
+    @sync_iter
+    def parallel_map(
+        self,
+        func: Callable[[_T], _R],
+        workers: int | None = None,
+        chunksize: int = 1,
+        ordered: bool = True,
+    ) -> Iterator[_R]:
+        """Return an iterator that applies function to every item of iterable in a process pool,
+        yielding the results.
+
+        Items are sent to the workers in chunks and the iterable is read lazily,
+        at most 2 chunks per worker are in flight.
+
+        :param func: function to apply, must be picklable
+        :param workers: number of worker processes, by default the number of CPUs
+        :param chunksize: number of items sent to a worker at once
+        :param ordered: yield results in the order of the items,
+            otherwise yield results of chunks as soon as they are ready
+
+        :return: iterable
+
+        :raise ValueError: if workers or chunksize is less than 1
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        with ProcessPoolExecutor(workers) as executor:
+            yield from executor_map(executor, func, self, chunksize, workers * 2, ordered)
+
+    @sync_iter
+    def thread_map(
+        self,
+        func: Callable[[_T], _R],
+        workers: int | None = None,
+        window: int | None = None,
+        ordered: bool = True,
+    ) -> Iterator[_R]:
+        """Return an iterator that applies function to every item of iterable in a thread pool,
+        yielding the results.
+
+        Useful for blocking I/O or functions that release the GIL.
+        The iterable is read lazily, at most `window` items are in flight.
+
+        :param func: function to apply
+        :param workers: number of threads, by default min(32, number of CPUs + 4)
+        :param window: max number of items in flight, by default 2 items per thread
+        :param ordered: yield results in the order of the items,
+            otherwise yield results as soon as they are ready
+
+        :return: iterable
+
+        :raise ValueError: if workers or window is less than 1
+        """
+        if workers is None:
+            workers = min(32, (os.cpu_count() or 1) + 4)
+        if window is None:
+            window = workers * 2
+        with ThreadPoolExecutor(workers) as executor:
+            yield from executor_map(executor, func, self, window=window, ordered=ordered)
+
     @sync_iter
     def skip(self, count: int) -> 'SyncIter[_T]':
         """Skip 'count' items from iterator
@@ -133,6 +248,11 @@ class SyncIter(Generic[_T]):
 
         :return: count of items
         """
+        source = self._untouched_source()
+        if source is not None:
+            self._advance(len(source))
+            return len(source)
+
         count_ = 0
         for _ in self:
             count_ += 1
@@ -217,14 +337,16 @@ class SyncIter(Generic[_T]):
 
         :return: last item
         """
-        last_item = initial = object()
-        for item in self:
-            last_item = item
+        source = self._untouched_source()
+        if isinstance(source, Reversible) and source:
+            last_item = next(reversed(source))
+            self._advance(len(source))
+            return last_item
 
-        if last_item is initial:
+        items = deque(self._it, maxlen=1)
+        if not items:
             raise StopIteration('Iterable is empty')
-
-        return last_item
+        return items[0]
 
     def chain(self, *iterables: Iterable[_T]) -> 'SyncIter[_T]':
         """Chain with other iterables
@@ -233,6 +355,48 @@ class SyncIter(Generic[_T]):
         """
         return SyncIter(itertools.chain(self, *iterables))
 
+    def cache(self, max_in_memory: int | None = None, block_size: int = 1024) -> SyncCache[_T]:
+        """Record items as they are read, so they can be iterated again any number of times.
+        Each iteration of the cache starts from the first item, the source is read only once.
+
+        Usage:
+        ```python
+        rows = SyncIter(read_rows()).cache(max_in_memory=100_000)
+        total = SyncIter(rows).count()
+        has_errors = SyncIter(rows).contains(error_row)
+        ```
+
+        :param max_in_memory: number of items kept in memory, older items are spilled to a temporary file.
+            Items are spilled in whole blocks, so up to `max(max_in_memory, block_size)` items are kept in memory.
+            None to keep all items in memory.
+        :param block_size: number of items spilled to the file at once
+
+        :return: replayable iterable
+
+        :raise ValueError: if max_in_memory is negative or block_size is less than 1
+        """
+        return SyncCache(self._it, max_in_memory, block_size)
+
+    def tee(self, n: int = 2, buffer: int = 1024) -> tuple['SyncIter[_T]', ...]:
+        """Split into `n` iterators that read this iterator once
+
+        Unlike `itertools.tee`, memory is bounded: at most `buffer` items are kept for slower iterators,
+        and an iterator that is `buffer` items ahead of the slowest one blocks until the slowest one catches up.
+        An iterator that is not read anymore holds the others back, so it should be read to the end or closed.
+        So the iterators are meant to be consumed in different threads or in turns, e.g. with `zip()`.
+        Reading one of them to the end in the same thread as the others blocks forever
+        if the source is longer than buffer.
+
+        :param n: number of iterators
+        :param buffer: max number of items kept for slower iterators
+
+        :return: tuple of iterators
+
+        :raise ValueError: if n or buffer is less than 1
+        """
+        tee = SyncTee(self._it, n, buffer)
+        return tuple(SyncIter(tee.iterate(index)) for index in range(n))
+
     def all(self) -> bool:
         """Checks whether all elements of this iterable are true
 
@@ -356,6 +520,115 @@ class SyncIter(Generic[_T]):
         else:
             return min(self, key=key, default=default)
 
+    def approx_distinct(self, precision: int = 14) -> int:
+        """Estimate the number of distinct items with `HyperLogLog` in one pass and `2 ** precision` bytes,
+        the relative error is about `1.04 / sqrt(2 ** precision)`.
+
+        :param precision: number of bits of the hash that select a register, from 4 to 18
+
+        :return: estimated number of distinct items
+
+        :raise ValueError: if precision is out of range
+        """
+        sketch = HyperLogLog(precision)
+        deque(map(sketch.add, self._it), maxlen=0)
+        return sketch.result()
+
+    def approx_quantiles(self, qs: Sequence[float], k: int = 200) -> list[_T]:
+        """Estimate quantiles of comparable items with `QuantileSketch` in one pass and O(k) memory
+
+        :param qs: quantiles, numbers from 0 to 1, e.g. (0.5, 0.99) for the median and the 99th percentile
+        :param k: accuracy of the sketch, the rank error is about 1.7% for the default value
+
+        :return: item for each quantile
+
+        :raise ValueError: if the iterable is empty, a quantile is out of range or k is less than 2
+        """
+        sketch: QuantileSketch[_T] = QuantileSketch(qs, k)
+        deque(map(sketch.add, self._it), maxlen=0)
+        return sketch.result()
+
+    def reservoir_sample(self, k: int, seed: int | None = None) -> list[_T]:
+        """Return uniform random sample of `k` items with `ReservoirSample` in one pass and O(k) memory
+
+        :param k: size of the sample
+        :param seed: seed of the random generator
+
+        :return: sampled items, all items if there are at most `k` of them
+
+        :raise ValueError: if k is less than 1
+        """
+        sketch: ReservoirSample[_T] = ReservoirSample(k, seed)
+        deque(map(sketch.add, self._it), maxlen=0)
+        return sketch.result()
+
+    @sync_iter
+    def sort(
+        self,
+        key: Callable[[_T], Any] | None = None,
+        reverse: bool = False,
+        max_in_memory: int | None = None,
+        block_size: int = 1024,
+    ) -> Iterator[_T]:
+        """Sort items, the sort is stable.
+
+        If max_in_memory is provided, items are sorted in runs of `max_in_memory` items,
+        runs are spilled to a temporary file and merged lazily,
+        so streams that do not fit in memory can be sorted.
+
+        :param key: function to extract comparison key from an item
+        :param reverse: sort in descending order
+        :param max_in_memory: max number of items sorted in memory at once, None to sort all items in memory
+        :param block_size: number of items written to and read from the file at once
+
+        :return: iterator of sorted items
+
+        :raise ValueError: if max_in_memory or block_size is less than 1
+        """
+        if (max_in_memory is not None and max_in_memory < 1) or block_size < 1:
+            raise ValueError('max_in_memory and block_size must be greater than 0')
+
+        if max_in_memory is None:
+            yield from sorted(self._it, key=key, reverse=reverse)
+            return
+
+        it = self._it
+        spill: SpillFile[_T] = SpillFile()
+        runs = []
+        try:
+            while run := list(itertools.islice(it, max_in_memory)):
+                if not runs and len(run) < max_in_memory:
+                    run.sort(key=key, reverse=reverse)
+                    yield from run
+                    return
+                runs.append(spill_sorted_run(spill, run, key, reverse, block_size))
+            yield from heapq.merge(*(read_run(spill, blocks) for blocks in runs), key=key, reverse=reverse)
+        finally:
+            spill.close()
+
+    @sync_iter
+    def top_k(
+        self,
+        k: int,
+        key: Callable[[_T], Any] | None = None,
+        reverse: bool = False,
+    ) -> Iterator[_T]:
+        """Return `k` largest items in descending order, equivalent to `sort(key, reverse=True).take(k)`,
+        but keeps only `k` items in a heap: O(n log k) time and O(k) memory.
+
+        :param k: number of items
+        :param key: function to extract comparison key from an item
+        :param reverse: return `k` smallest items in ascending order instead
+
+        :return: iterator of items
+
+        :raise ValueError: if k is negative
+        """
+        if k < 0:
+            raise ValueError('k must be a non-negative integer')
+        select = heapq.nsmallest if reverse else heapq.nlargest
+        yield from select(k, self._it, key=key)
+
     def accumulate(self, func: _BinaryFunc = operator.add, initial: _T | None = None) -> 'SyncIter[_T]':
         """Return series of accumulated sums (by default).
 
@@ -434,6 +707,13 @@ class SyncIter(Generic[_T]):
 
         :return: item
         """
+        source = self._untouched_source()
+        if isinstance(source, Sequence) and index >= 0:
+            self._advance(min(index + 1, len(source)))
+            if index < len(source):
+                return cast(_T, source[index])
+            raise IndexError(f'item at {index} index is not found')
+
         for i, item in self.enumerate():
             if i == index:
                 return item
@@ -444,8 +724,18 @@ class SyncIter(Generic[_T]):
 
         :return: bool
         """
-        default = object()
-        return self.first_where(lambda x: x == item, default=default) is not default
+        source = self._untouched_source()
+        if isinstance(source, (Set, Mapping)):
+            try:
+                missing = item not in source
+            except TypeError:
+                # unhashable item, it is compared with each item below
+                missing = False
+            if missing:
+                self._advance(len(source))
+                return False
+        # the iterator is read up to the first equal item, unlike `in` an identical item is not enough
+        return any(map(operator.eq, self._it, itertools.repeat(item)))
 
     def is_empty(self) -> bool:
         """Return True if the iterable is empty
@@ -466,19 +756,346 @@ class SyncIter(Generic[_T]):
         return SyncIter(itertools.pairwise(self))
 
     @sync_iter
-    def batches(self, batch_size: int) -> Iterator[tuple[_T, ...]]:
+    def batches(
+        self,
+        batch_size: int,
+        max_weight: float | None = None,
+        weight: Callable[[_T], float] = len,
+    ) -> Iterator[tuple[_T, ...]]:
         """Create iterable of tuples whose length = batch_size
 
+        :param batch_size: max number of items in a batch
+        :param max_weight: if provided, a batch is also flushed before its total weight exceeds max_weight.
+            An item heavier than max_weight gets a batch of its own.
+        :param weight: weight of an item, e.g. size in bytes. By default len() is used.
+
         :return: iterable of tuples whose length = batch_size
+
+        :raise ValueError: if batch_size is less than 1
         """
-        while True:
-            try:
-                item = self.next()
-            except StopIteration:
-                break
-            it = self.append_left(item)
-            batch = it.take(batch_size).to_tuple()
-            yield batch
+        if batch_size < 1:
+            raise ValueError('batch_size must be greater than 0')
+
+        if max_weight is None:
+            it = self._it
+            while batch := tuple(itertools.islice(it, batch_size)):
+                yield batch
+            return
+
+        items: list[_T] = []
+        items_weight = 0.
+        for item in self:
+            item_weight = weight(item)
+            if items and items_weight + item_weight > max_weight:
+                yield tuple(items)
+                items, items_weight = [], 0.
+            items.append(item)
+            items_weight += item_weight
+            if len(items) == batch_size:
+                yield tuple(items)
+                items, items_weight = [], 0.
+        if items:
+            yield tuple(items)
+
+    @sync_iter
+    def tumbling_window(
+        self,
+        size: int,
+        agg: Callable[[], Aggregator[_T, Any]] | None = None,
+    ) -> Iterator[Any]:
+        """Split items into consecutive windows of `size` items, the last window may be smaller
+
+        :param size: number of items in a window
+        :param agg: aggregator factory, e.g. `Sum` or `lambda: Fold(operator.mul, 1)`.
+            If provided, aggregated value of each window is yielded instead of tuple of items.
+
+        :return: iterator of windows
+
+        :raise ValueError: if size is less than 1
+        """
+        if agg is None:
+            yield from self.batches(size)
+            return
+
+        if size < 1:
+            raise ValueError('size must be greater than 0')
+
+        aggregator = agg()
+        count = 0
+        for item in self:
+            aggregator.add(item)
+            count += 1
+            if count == size:
+                yield aggregator.result()
+                aggregator = agg()
+                count = 0
+        if count:
+            yield aggregator.result()
+
+    @sync_iter
+    def sliding_window(
+        self,
+        size: int,
+        step: int = 1,
+        agg: Callable[[], Aggregator[_T, Any]] | None = None,
+    ) -> Iterator[Any]:
+        """Create windows of `size` items, a new window starts every `step` items.
+        Only full windows are yielded.
+
+        If step is less than size, windows overlap and the aggregator must support removing items.
+        If step is greater than size, items between windows are skipped.
+
+        :param size: number of items in a window
+        :param step: number of items between starts of windows
+        :param agg: aggregator factory, e.g. `Sum` or `lambda: Fold(operator.mul, 1)`.
+            If provided, aggregated value of each window is yielded instead of tuple of items.
+
+        :return: iterator of windows
+
+        :raise ValueError: if size or step is less than 1
+        """
+        if size < 1 or step < 1:
+            raise ValueError('size and step must be greater than 0')
+
+        window: deque[_T] = deque()
+        aggregator = None if agg is None else agg()
+        skip = 0
+        for item in self:
+            if skip:
+                skip -= 1
+                continue
+            window.append(item)
+            if aggregator is not None:
+                aggregator.add(item)
+            if len(window) < size:
+                continue
+
+            yield tuple(window) if aggregator is None else aggregator.result()
+            if step >= size:
+                window.clear()
+                skip = step - size
+                if agg is not None:
+                    aggregator = agg()
+            else:
+                for _ in range(step):
+                    removed = window.popleft()
+                    if aggregator is not None:
+                        aggregator.remove(removed)
+
+    @sync_iter
+    def group_by(
+        self,
+        key: Callable[[_T], Any],
+        agg: Callable[[], Aggregator[_T, Any]] | Mapping[str, Callable[[], Aggregator[_T, Any]]] | None = None,
+        engine: str = 'hash',
+    ) -> Iterator[tuple[Any, Any]]:
+        """Group items by key, yield (key, group) pairs.
+
+        The 'hash' engine groups all items and yields groups in order of their first items
+        once the iterable is exhausted. With an aggregator only one aggregator per group is kept,
+        items of the groups are not stored.
+
+        The 'sorted' engine groups consecutive items with equal keys, like `itertools.groupby()`,
+        a group is yielded as soon as an item with another key is read.
+        The items must be sorted by the key, otherwise a key may have several groups.
+        With an aggregator it keeps O(1) memory.
+
+        :param key: function to extract group key from an item
+        :param agg: aggregator factory, e.g. `Sum` or `lambda: Fold(operator.mul, 1)`,
+            or a mapping of aggregator factories by name, e.g. `{'min': Min, 'max': Max}`.
+            If provided, aggregated value of each group is yielded instead of tuple of items,
+            for a mapping the value is a dict of aggregated values by the same names.
+        :param engine: 'hash' or 'sorted'
+
+        :return: iterator of (key, group) pairs
+
+        :raise ValueError: if engine is unknown
+        """
+        if engine not in ('hash', 'sorted'):
+            raise ValueError(f'unknown engine: {engine!r}')
+        if isinstance(agg, Mapping):
+            agg = functools.partial(Combine, agg)
+
+        if engine == 'sorted':
+            for group_key, group in itertools.groupby(self._it, key):
+                if agg is None:
+                    yield group_key, tuple(group)
+                    continue
+                aggregator = agg()
+                for item in group:
+                    aggregator.add(item)
+                yield group_key, aggregator.result()
+        elif agg is None:
+            groups: defaultdict[Any, list[_T]] = defaultdict(list)
+            for item in self._it:
+                groups[key(item)].append(item)
+            for group_key, items in groups.items():
+                yield group_key, tuple(items)
+        else:
+            aggregators: defaultdict[Any, Aggregator[_T, Any]] = defaultdict(agg)
+            for item in self._it:
+                aggregators[key(item)].add(item)
+            for group_key, aggregator in aggregators.items():
+                yield group_key, aggregator.result()
+
+    @sync_iter
+    def join(
+        self,
+        other: Iterable[_R],
+        left_key: Callable[[_T], Any],
+        right_key: Callable[[_R], Any] | None = None,
+        how: str = 'inner',
+        engine: str = 'hash',
+    ) -> Iterator[Any]:
+        """Join items with items of `other` that have equal keys.
+
+        Join types:
+
+        - 'inner': (item, other_item) pair for each pair of matching items
+        - 'left': same as 'inner', plus (item, None) for each item without a match
+        - 'semi': items that have a match, each item once
+        - 'anti': items that do not have a match
+
+        The 'hash' engine reads `other` into a dict and then streams the items,
+        so `other` should be the smaller side. For 'semi' and 'anti' only the keys of `other` are kept.
+
+        The 'merge' engine reads both iterables in step, they must be sorted by key in ascending order.
+        It keeps only the other items of the current key, for 'semi' and 'anti' it keeps none.
+
+        :param other: iterable to join with
+        :param left_key: function to extract the join key from an item
+        :param right_key: function to extract the join key from an item of `other`, by default `left_key`
+        :param how: 'inner', 'left', 'semi' or 'anti'
+        :param engine: 'hash' or 'merge'
+
+        :return: iterator of pairs for 'inner' and 'left', iterator of items for 'semi' and 'anti'
+
+        :raise ValueError: if how or engine is unknown
+        """
+        if how not in ('inner', 'left', 'semi', 'anti'):
+            raise ValueError(f'unknown join type: {how!r}')
+        if engine not in ('hash', 'merge'):
+            raise ValueError(f'unknown engine: {engine!r}')
+        if right_key is None:
+            right_key = left_key
+
+        if engine == 'hash':
+            if how in ('semi', 'anti'):
+                keys = {right_key(other_item) for other_item in other}
+                keep = how == 'semi'
+                for item in self._it:
+                    if (left_key(item) in keys) is keep:
+                        yield item
+                return
+
+            table: defaultdict[Any, list[_R]] = defaultdict(list)
+            for other_item in other:
+                table[right_key(other_item)].append(other_item)
+            for item in self._it:
+                matches = table.get(left_key(item))
+                if matches:
+                    for other_item in matches:
+                        yield item, other_item
+                elif how == 'left':
+                    yield item, None
+            return
+
+        collect = how in ('inner', 'left')
+        others = iter(other)
+        other_item: Any = next(others, _EMPTY)
+        if other_item is not _EMPTY:
+            other_key = right_key(other_item)
+        group_key: Any = _EMPTY
+        group: list[_R] = []
+        matched = False
+        for item in self._it:
+            item_key = left_key(item)
+            if group_key is _EMPTY or item_key != group_key:
+                group_key = item_key
+                group = []
+                matched = False
+                # skip other items with smaller keys, collect the ones with the same key
+                while other_item is not _EMPTY and not item_key < other_key:
+                    if other_key == item_key:
+                        matched = True
+                        if collect:
+                            group.append(other_item)
+                    other_item = next(others, _EMPTY)
+                    if other_item is not _EMPTY:
+                        other_key = right_key(other_item)
+
+            if how == 'semi':
+                if matched:
+                    yield item
+            elif how == 'anti':
+                if not matched:
+                    yield item
+            elif group:
+                for other_item_ in group:
+                    yield item, other_item_
+            elif how == 'left':
+                yield item, None
+
+    @sync_iter
+    def distinct(
+        self,
+        key: Callable[[_T], Any] | None = None,
+        mode: str = 'exact',
+        size: int | None = None,
+        ttl: float | None = None,
+        error_rate: float = 0.01,
+    ) -> Iterator[_T]:
+        """Yield items whose keys were not seen before, the first item of each key is kept.
+
+        Modes:
+
+        - 'exact': all keys are kept in a set, memory grows with the number of distinct keys.
+        - 'lru': only recently seen keys are kept, at most `size` keys and for `ttl` seconds since a key was
+          last seen. A duplicate is dropped only if its key is still remembered,
+          this suits event streams where duplicates arrive close together.
+        - 'bloom': keys are kept in a Bloom filter sized for `size` keys, memory is fixed.
+          A new key is dropped as a duplicate with probability about `error_rate`, a duplicate is always dropped.
+
+        :param key: function to extract the key from an item, by default the item is the key
+        :param mode: 'exact', 'lru' or 'bloom'
+        :param size: 'lru' mode: max number of remembered keys, 'bloom' mode: expected number of distinct keys
+        :param ttl: 'lru' mode: time in seconds to remember a key
+        :param error_rate: 'bloom' mode: false positive rate at `size` keys
+
+        :return: iterator of distinct items
+
+        :raise ValueError: if mode is unknown or its parameters are invalid
+        """
+        if mode not in ('exact', 'lru', 'bloom'):
+            raise ValueError(f'unknown mode: {mode!r}')
+
+        if mode == 'exact':
+            seen: set[Any] = set()
+            for item in self._it:
+                item_key = item if key is None else key(item)
+                if item_key not in seen:
+                    seen.add(item_key)
+                    yield item
+            return
+
+        # validated here rather than by the key stores, so errors name the parameters of this method
+        if size is not None and size < 1:
+            raise ValueError('size must be greater than 0')
+        keys: RecentSet | BloomFilter
+        if mode == 'lru':
+            if size is None and ttl is None:
+                raise ValueError('size or ttl must be provided in lru mode')
+            if ttl is not None and ttl <= 0:
+                raise ValueError('ttl must be greater than 0')
+            keys = RecentSet(size, ttl)
+        else:
+            if size is None:
+                raise ValueError('size must be provided in bloom mode')
+            keys = BloomFilter(size, error_rate)
+
+        for item in self._it:
+            if keys.add(item if key is None else key(item)):
+                yield item
 
     def flatten(self: 'SyncIter[Iterator[_T]]') -> 'SyncIter[_T]':
         """Return an iterator that flattens one level of nesting
@@ -490,7 +1107,72 @@ class SyncIter(Generic[_T]):
         return SyncIter(itertools.chain.from_iterable(self))
 
     def __len__(self) -> int:
+        source = self._untouched_source()
+        if source is not None:
+            # nothing is read, so `list(SyncIter(collection))` is not emptied by its length hint
+            return len(source)
         return self.count()
 
     def __contains__(self, item: _T) -> bool:
         return self.contains(item)
+
+
+class FusedSyncIter(SyncIter[_T]):
+    """SyncIter that fuses element-wise methods into a single loop
+
+    Created by `SyncIter.fuse()`.
+    """
+
+    __slots__ = ('_upstream', '_stages', '_started')
+
+    def __init__(self, upstream: Iterator[Any], stages: tuple[tuple[str, Any], ...] = ()):
+        self._upstream = upstream
+        self._stages = stages
+        self._started = [False]
+        fused = compile_stages(tuple((kind, False) for kind, _ in stages))
+        super().__init__(fused(self._started, upstream, *(arg for _, arg in stages)))
+
+    def _extend(self, kind: str, arg: Any) -> 'FusedSyncIter[Any]':
+        return FusedSyncIter(self._upstream, (*self._stages, (kind, arg)))
+
+    def fuse(self) -> 'SyncIter[_T]':
+        if self._started[0]:
+            return super().fuse()
+        return self
+
+    def enumerate(self, start: int = 0) -> 'SyncIter[tuple[int, _T]]':
+        if self._started[0]:
+            return super().enumerate(start)
+        return self._extend('enumerate', start)
+
+    def take(self, count: int) -> 'SyncIter[_T]':
+        if self._started[0]:
+            return super().take(count)
+        if count < 0:
+            raise ValueError('count must be a non-negative integer')
+        return self._extend('take', count)
+
+    def map(self, func: Callable[[_T], _R]) -> 'SyncIter[_R]':
+        if self._started[0]:
+            return super().map(func)
+        return self._extend('map', func)
+
+    def skip(self, count: int) -> 'SyncIter[_T]':
+        if self._started[0]:
+            return super().skip(count)
+        return self._extend('skip', count)
+
+    def skip_where(self, func: _ConditionFunc) -> 'SyncIter[_T]':
+        if self._started[0]:
+            return super().skip_where(func)
+        return self._extend('skip_where', func)
+
+    def where(self, func: _ConditionFunc) -> 'SyncIter[_T]':
+        if self._started[0]:
+            return super().where(func)
+        return self._extend('where', func)
+
+    def take_while(self, func: _ConditionFunc) -> 'SyncIter[_T]':
+        if self._started[0]:
+            return super().take_while(func)
+        return self._extend('take_while', func)
@@ -1,8 +1,12 @@
-from collections.abc import Callable, Iterable, Iterator
-from typing import Generic, ParamSpec, TypeVar
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping, Sequence
+from typing import Any, Generic, ParamSpec, TypeVar, overload
+
+from .aggregators import Aggregator
+from .cache import SyncCache
 
 _T = TypeVar('_T')
 _R = TypeVar('_R')
+_K = TypeVar('_K')
 _P = ParamSpec('_P')
 _DefaultT = TypeVar('_DefaultT')
 _KeyFunc = Callable[[_T], _R]
@@ -13,18 +17,34 @@ def sync_iter(func: Callable[_P, Iterable[_T]]) -> Callable[_P, SyncIter[_T]]: .
 
 class SyncIter(Generic[_T]):
     _it: Iterator[_T]
+    _source: Collection[Any] | None
 
     def __init__(self, it: Iterable[_T] | Iterator[_T]) -> None: ...
     def __iter__(self) -> Iterator[_T]: ...
     def __next__(self) -> _T: ...
     @classmethod
     def empty(cls) -> SyncIter[_T]: ...
+    def fuse(self) -> SyncIter[_T]: ...
     def to_list(self) -> list[_T]: ...
     def to_tuple(self) -> tuple[_T, ...]: ...
     def to_set(self) -> set[_T]: ...
     def enumerate(self, start: int = ...) -> SyncIter[tuple[int, _T]]: ...
     def take(self, count: int) -> SyncIter[_T]: ...
     def map(self, func: Callable[[_T], _R]) -> SyncIter[_R]: ...
+    def parallel_map(
+        self,
+        func: Callable[[_T], _R],
+        workers: int | None = ...,
+        chunksize: int = ...,
+        ordered: bool = ...,
+    ) -> SyncIter[_R]: ...
+    def thread_map(
+        self,
+        func: Callable[[_T], _R],
+        workers: int | None = ...,
+        window: int | None = ...,
+        ordered: bool = ...,
+    ) -> SyncIter[_R]: ...
     def skip(self, count: int) -> SyncIter[_T]: ...
     def skip_while(self, func: _ConditionFunc) -> SyncIter[_T]: ...
     def skip_where(self, func: _ConditionFunc) -> SyncIter[_T]: ...
@@ -36,6 +56,8 @@ class SyncIter(Generic[_T]):
     def next(self) -> _T: ...
     def last(self) -> _T: ...
     def chain(self, *iterables: Iterable[_T]) -> SyncIter[_T]: ...
+    def cache(self, max_in_memory: int | None = ..., block_size: int = ...) -> SyncCache[_T]: ...
+    def tee(self, n: int = ..., buffer: int = ...) -> tuple[SyncIter[_T], ...]: ...
     def all(self) -> bool: ...
     def any(self) -> bool: ...
     def mark_first(self) -> SyncIter[tuple[_T, bool]]: ...
@@ -44,6 +66,22 @@ class SyncIter(Generic[_T]):
     def reduce(self, func: _BinaryFunc, initial: _T = ...) -> _T | _DefaultT: ...
     def max(self, key: _KeyFunc | None = ..., default: _DefaultT = ...) -> _T | _DefaultT: ...
     def min(self, key: _KeyFunc | None = ..., default: _DefaultT = ...) -> _T | _DefaultT: ...
+    def approx_distinct(self, precision: int = ...) -> int: ...
+    def approx_quantiles(self, qs: Sequence[float], k: int = ...) -> list[_T]: ...
+    def reservoir_sample(self, k: int, seed: int | None = ...) -> list[_T]: ...
+    def sort(
+        self,
+        key: Callable[[_T], Any] | None = ...,
+        reverse: bool = ...,
+        max_in_memory: int | None = ...,
+        block_size: int = ...,
+    ) -> SyncIter[_T]: ...
+    def top_k(
+        self,
+        k: int,
+        key: Callable[[_T], Any] | None = ...,
+        reverse: bool = ...,
+    ) -> SyncIter[_T]: ...
     def accumulate(self, func: _BinaryFunc = ..., initial: _T | None = ...) -> SyncIter[_T]: ...
     def append_left(self, item: _T) -> SyncIter[_T]: ...
     def append_right(self, item: _T) -> SyncIter[_T]: ...
@@ -55,8 +93,68 @@ class SyncIter(Generic[_T]):
     def contains(self, item: _T) -> bool: ...
     def is_empty(self) -> bool: ...
     def pairwise(self) -> SyncIter[tuple[_T, _T]]: ...
-    def batches(self, batch_size: int) -> SyncIter[tuple[_T, ...]]: ...
+    def batches(
+        self,
+        batch_size: int,
+        max_weight: float | None = ...,
+        weight: Callable[[_T], float] = ...,
+    ) -> SyncIter[tuple[_T, ...]]: ...
+    @overload
+    def tumbling_window(self, size: int, agg: None = ...) -> SyncIter[tuple[_T, ...]]: ...
+    @overload
+    def tumbling_window(self, size: int, agg: Callable[[], Aggregator[_T, _R]]) -> SyncIter[_R]: ...
+    @overload
+    def sliding_window(self, size: int, step: int = ..., agg: None = ...) -> SyncIter[tuple[_T, ...]]: ...
+    @overload
+    def sliding_window(self, size: int, step: int, agg: Callable[[], Aggregator[_T, _R]]) -> SyncIter[_R]: ...
+    @overload
+    def sliding_window(self, size: int, *, agg: Callable[[], Aggregator[_T, _R]]) -> SyncIter[_R]: ...
+    @overload
+    def group_by(
+        self,
+        key: Callable[[_T], _K],
+        agg: None = ...,
+        engine: str = ...,
+    ) -> SyncIter[tuple[_K, tuple[_T, ...]]]: ...
+    @overload
+    def group_by(
+        self,
+        key: Callable[[_T], _K],
+        agg: Callable[[], Aggregator[_T, _R]],
+        engine: str = ...,
+    ) -> SyncIter[tuple[_K, _R]]: ...
+    @overload
+    def group_by(
+        self,
+        key: Callable[[_T], _K],
+        agg: Mapping[str, Callable[[], Aggregator[_T, Any]]],
+        engine: str = ...,
+    ) -> SyncIter[tuple[_K, dict[str, Any]]]: ...
+    def join(
+        self,
+        other: Iterable[_R],
+        left_key: Callable[[_T], Any],
+        right_key: Callable[[_R], Any] | None = ...,
+        how: str = ...,
+        engine: str = ...,
+    ) -> SyncIter[Any]: ...
+    def distinct(
+        self,
+        key: Callable[[_T], Any] | None = ...,
+        mode: str = ...,
+        size: int | None = ...,
+        ttl: float | None = ...,
+        error_rate: float = ...,
+    ) -> SyncIter[_T]: ...
     def flatten(self) -> SyncIter[_T]: ...
     def __len__(self) -> int: ...
 
     def __contains__(self, item: _T) -> bool: ...
+
+class FusedSyncIter(SyncIter[_T]):
+    _upstream: Iterator[Any]
+    _stages: tuple[tuple[str, Any], ...]
+    _started: list[bool]
+
+    def __init__(self, upstream: Iterator[Any], stages: tuple[tuple[str, Any], ...] = ...) -> None: ...
+    def _extend(self, kind: str, arg: Any) -> FusedSyncIter[Any]: ...
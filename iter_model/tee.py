@@ -0,0 +1,222 @@
+import asyncio
+import threading
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator, Generator, Iterator
+from typing import Generic, TypeVar
+
+_T = TypeVar('_T')
+
+
+class _TeeBuffer(Generic[_T]):
+    """Items read from the source, but not yet read by all consumers.
+
+    Each consumer has a position in the stream, an item is dropped once all consumers have passed it.
+    The source is not read ahead while the buffer is full and its oldest item is still needed.
+    """
+
+    __slots__ = ('_size', '_items', '_offset', '_positions', '_exhausted', '_error')
+
+    def __init__(self, n: int, buffer: int):
+        if n < 1:
+            raise ValueError('n must be greater than 0')
+        if buffer < 1:
+            raise ValueError('buffer must be greater than 0')
+
+        self._size = buffer
+        self._items: deque[_T] = deque()
+        self._offset = 0
+        self._positions = dict.fromkeys(range(n), 0)
+        self._exhausted = False
+        self._error: Exception | None = None
+
+    def _buffered(self, index: int) -> bool:
+        return self._positions[index] < self._offset + len(self._items)
+
+    def _full(self) -> bool:
+        return len(self._items) >= self._size and min(self._positions.values()) == self._offset
+
+    def _pop(self, index: int) -> tuple[_T, bool]:
+        position = self._positions[index]
+        item = self._items[position - self._offset]
+        self._positions[index] = position + 1
+        return item, position == self._offset and self._trim()
+
+    def _trim(self) -> bool:
+        """Drop items that all consumers have passed
+
+        :return: True if any item was dropped
+        """
+        end = self._offset + len(self._items)
+        lowest = min(self._positions.values(), default=end)
+        for _ in range(lowest - self._offset):
+            self._items.popleft()
+        trimmed = lowest != self._offset
+        self._offset = lowest
+        return trimmed
+
+    def _check_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _detach(self, index: int) -> None:
+        del self._positions[index]
+        self._trim()
+
+
+class SyncTee(_TeeBuffer[_T]):
+    """Share one iterator between `n` consumers that may run in different threads.
+
+    A consumer that is `buffer` items ahead of the slowest one blocks until the slowest one catches up.
+
+    :param it: source iterator
+    :param n: number of consumers
+    :param buffer: max number of items kept for slower consumers
+
+    :raise ValueError: if n or buffer is less than 1
+    """
+
+    __slots__ = ('_it', '_changed', '_reading')
+
+    def __init__(self, it: Iterator[_T], n: int, buffer: int):
+        super().__init__(n, buffer)
+        self._it = it
+        self._changed = threading.Condition()
+        self._reading = False
+
+    def _read(self) -> _T:
+        """Read the next item of the source, the lock is released meanwhile,
+        so other consumers can take buffered items while the source is slow
+        """
+        self._reading = True
+        self._changed.release()
+        try:
+            return next(self._it)
+        finally:
+            self._changed.acquire()
+            self._reading = False
+            self._changed.notify_all()
+
+    def next(self, index: int) -> _T:
+        """Return the next item for the consumer
+
+        :param index: index of the consumer
+        :return: next item
+
+        :raise StopIteration: if the source is exhausted
+        """
+        with self._changed:
+            while not self._buffered(index):
+                if self._exhausted:
+                    self._check_error()
+                    raise StopIteration
+                if self._reading or self._full():
+                    self._changed.wait()
+                    continue
+                try:
+                    self._items.append(self._read())
+                except StopIteration:
+                    self._exhausted = True
+                except Exception as error:
+                    self._exhausted = True
+                    self._error = error
+                    raise
+            item, trimmed = self._pop(index)
+            if trimmed:
+                self._changed.notify_all()
+            return item
+
+    def iterate(self, index: int) -> Generator[_T, None, None]:
+        """Iterate items for the consumer, the consumer is detached when the generator is closed
+
+        :param index: index of the consumer
+        :return: iterator of items
+        """
+        try:
+            while True:
+                try:
+                    item = self.next(index)
+                except StopIteration:
+                    return
+                yield item
+        finally:
+            with self._changed:
+                self._detach(index)
+                self._changed.notify_all()
+
+
+class AsyncTee(_TeeBuffer[_T]):
+    """Share one async iterator between `n` consumers.
+
+    A consumer that is `buffer` items ahead of the slowest one waits until the slowest one catches up.
+
+    :param it: source iterator
+    :param n: number of consumers
+    :param buffer: max number of items kept for slower consumers
+
+    :raise ValueError: if n or buffer is less than 1
+    """
+
+    __slots__ = ('_it', '_changed', '_reading')
+
+    def __init__(self, it: AsyncIterator[_T], n: int, buffer: int):
+        super().__init__(n, buffer)
+        self._it = it
+        self._changed = asyncio.Event()
+        self._reading: asyncio.Task[None] | None = None
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _read(self) -> None:
+        try:
+            self._items.append(await anext(self._it))
+        except StopAsyncIteration:
+            self._exhausted = True
+        except Exception as error:
+            self._exhausted = True
+            self._error = error
+        finally:
+            self._reading = None
+            self._notify()
+
+    async def next(self, index: int) -> _T:
+        """Return the next item for the consumer
+
+        :param index: index of the consumer
+        :return: next item
+
+        :raise StopAsyncIteration: if the source is exhausted
+        """
+        while not self._buffered(index):
+            if self._exhausted:
+                self._check_error()
+                raise StopAsyncIteration
+            if self._reading is None and not self._full():
+                # the source is read in its own task, so a cancelled consumer stops waiting for the item,
+                # but does not cancel reading it for the other consumers
+                self._reading = asyncio.ensure_future(self._read())
+            await self._changed.wait()
+        item, trimmed = self._pop(index)
+        if trimmed:
+            self._notify()
+        return item
+
+    async def iterate(self, index: int) -> AsyncGenerator[_T, None]:
+        """Iterate items for the consumer, the consumer is detached when the generator is closed
+
+        :param index: index of the consumer
+        :return: async iterator of items
+        """
+        try:
+            while True:
+                try:
+                    item = await self.next(index)
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            self._detach(index)
+            self._notify()
+            if not self._positions and self._reading is not None:
+                self._reading.cancel()
@@ -0,0 +1,80 @@
+import operator
+
+import pytest
+
+from iter_model.aggregators import Aggregator, Combine, Count, Fold, Max, Mean, Min, Sum
+
+
+class TestAggregators:
+
+    @pytest.mark.parametrize(['agg', 'expected'], (
+        (Count(), (1, 2, 3, 2, 1)),
+        (Sum(), (3, 4, 9, 6, 5)),
+        (Sum(1.5), (4.5, 5.5, 10.5, 7.5, 6.5)),
+        (Mean(), (3, 2, 3, 3, 5)),
+        (Min(), (3, 1, 1, 1, 5)),
+        (Max(), (3, 3, 5, 5, 5)),
+        (Fold(operator.add, 0, operator.sub), (3, 4, 9, 6, 5)),
+        (Combine({'count': Count, 'max': Max}), (
+            {'count': 1, 'max': 3},
+            {'count': 2, 'max': 3},
+            {'count': 3, 'max': 5},
+            {'count': 2, 'max': 5},
+            {'count': 1, 'max': 5},
+        )),
+    ))
+    def test_add_remove(self, agg: Aggregator, expected: tuple):
+        results = []
+        for item in (3, 1, 5):
+            agg.add(item)
+            results.append(agg.result())
+        for item in (3, 1):
+            agg.remove(item)
+            results.append(agg.result())
+        assert tuple(results) == expected
+
+    @pytest.mark.parametrize('agg', (Min(), Max()))
+    def test_extremum_empty(self, agg: Aggregator):
+        with pytest.raises(ValueError):
+            agg.result()
+        agg.add(1)
+        agg.remove(1)
+        with pytest.raises(ValueError):
+            agg.result()
+
+    def test_mean_empty(self):
+        with pytest.raises(ZeroDivisionError):
+            Mean().result()
+
+    @pytest.mark.parametrize(['agg', 'expected'], (
+        (Min(key=len), ('bb', 'bb', 'c', 'c')),
+        (Max(key=len), ('bb', 'aaa', 'aaa', 'aaa')),
+        (Min(key=str.lower), ('bb', 'aaa', 'aaa', 'aaa')),
+    ))
+    def test_extremum_key(self, agg: Aggregator, expected: tuple):
+        results = []
+        for item in ('bb', 'aaa', 'c', 'd'):
+            agg.add(item)
+            results.append(agg.result())
+        assert tuple(results) == expected
+
+    @pytest.mark.parametrize(['agg', 'expected'], (
+        (Min(key=len), ('a', 'b', 'c')),
+        (Max(key=len), ('a', 'b', 'c')),
+    ))
+    def test_extremum_ties(self, agg: Aggregator, expected: tuple):
+        for item in ('a', 'b', 'c'):
+            agg.add(item)
+        results = []
+        for item in ('a', 'b', 'c'):
+            results.append(agg.result())
+            agg.remove(item)
+        assert tuple(results) == expected
+
+    def test_fold_without_inverse(self):
+        agg = Fold(operator.mul, 1)
+        agg.add(2)
+        agg.add(3)
+        assert agg.result() == 6
+        with pytest.raises(TypeError):
+            agg.remove(2)
@@ -1,13 +1,20 @@
+import asyncio
 import functools
 import itertools
 import operator
-from collections.abc import AsyncIterable, Callable, Iterable, Sequence
+import threading
+import time
+from collections.abc import AsyncIterable, Callable, Generator, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import aclosing
 from typing import Any
 
 import pytest
 
 from iter_model import AsyncIter, async_iter
-from iter_model.async_utils import asyncify
+from iter_model.aggregators import Count, Fold, Max, Sum
+from iter_model.async_iter import ChunkedAsyncIter, FusedAsyncIter
+from iter_model.async_utils import asyncify, background_loop
 from tests.utils import to_async_iter
 
 
@@ -16,8 +23,342 @@ async def asyncify_iterable(iterable: Iterable) -> AsyncIterable:
         yield item
 
 
+class _Point:
+    """Items that are not equal, but have the same repr"""
+
+    def __init__(self, value: int):
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Point) and self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __repr__(self) -> str:
+        return 'P'
+
+
 class TestAsyncIter:
 
+    async def test_with_executor(self):
+        loop_thread = threading.get_ident()
+        threads = set()
+
+        def func(x: int) -> int:
+            threads.add(threading.get_ident())
+            return x * 2
+
+        with ThreadPoolExecutor(2) as executor:
+            it = AsyncIter.from_sync(range(10)).with_executor(executor)
+            result = await it.map(func).where(func).skip_where(lambda x: x > 15).to_list()
+        assert result == [x * 2 for x in range(1, 8)]
+        assert threads and loop_thread not in threads
+
+    async def test_with_executor_inline(self):
+        loop_thread = threading.get_ident()
+        threads = set()
+
+        def func(x: int) -> int:
+            threads.add(threading.get_ident())
+            return x
+
+        with ThreadPoolExecutor(2) as executor:
+            it = AsyncIter(AsyncIter.from_sync(range(10)).with_executor(executor))
+            assert await it.max(key=asyncify(func)) == 9
+        assert threads == {loop_thread}
+
+    async def test_with_executor_reset(self):
+        with ThreadPoolExecutor(2) as executor:
+            it = AsyncIter.from_sync(range(10)).with_executor(executor).map(lambda x: -x).with_executor(None)
+            assert it._executor is None
+            assert await it.min(key=abs) == 0
+
+    async def test_with_process_executor(self):
+        with ProcessPoolExecutor(2) as executor:
+            it = AsyncIter.from_sync(range(-5, 5)).with_executor(executor)
+            assert await it.map(abs).reduce(operator.add) == sum(map(abs, range(-5, 5)))
+
+    @pytest.mark.parametrize('chunk_size', (1, 3, 100))
+    async def test_from_sync_chunked(self, chunk_size: int):
+        r = range(20)
+        it = AsyncIter.from_sync(r, chunk_size=chunk_size)
+        assert isinstance(it, ChunkedAsyncIter)
+        assert await it.to_list() == list(r)
+
+    @pytest.mark.parametrize('prefetch', (1, 3))
+    @pytest.mark.parametrize(['size', 'chunk_size'], ((0, None), (100, None), (20, 1), (20, 7), (21, 7)))
+    async def test_from_sync_thread(self, size: int, chunk_size: int | None, prefetch: int):
+        threads = set()
+        closed_in = []
+
+        def source():
+            try:
+                for item in range(size):
+                    threads.add(threading.get_ident())
+                    yield item
+            finally:
+                closed_in.append(threading.get_ident())
+
+        it = AsyncIter.from_sync(source(), chunk_size, thread=True, prefetch=prefetch)
+        assert isinstance(it, ChunkedAsyncIter) is (chunk_size is not None)
+        assert await it.map(lambda x: x * 2).to_list() == [x * 2 for x in range(size)]
+        assert threading.get_ident() not in threads
+        assert len(closed_in) == 1
+        assert set(closed_in) >= threads
+
+    async def test_from_sync_thread_not_closable(self):
+        assert await AsyncIter.from_sync(range(100), thread=True).to_list() == list(range(100))
+
+    async def test_from_sync_thread_not_blocking(self):
+        def source():
+            for item in range(3):
+                time.sleep(0.05)
+                yield item
+
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        assert await AsyncIter.from_sync(source(), thread=True).to_list() == [0, 1, 2]
+        ticker.cancel()
+        assert ticks > 5
+
+    async def test_from_sync_thread_close(self):
+        closed_in = []
+
+        def source():
+            try:
+                yield from range(1000)
+            finally:
+                closed_in.append(threading.get_ident())
+
+        it = AsyncIter.from_sync(source(), 10, thread=True, prefetch=2)
+        async with aclosing(aiter(it)) as items:
+            assert await anext(items) == 0
+        assert closed_in and closed_in[0] != threading.get_ident()
+
+    async def test_from_sync_thread_error(self):
+        def source():
+            yield 1
+            raise ValueError('failed')
+
+        with pytest.raises(ValueError, match='failed'):
+            await AsyncIter.from_sync(source(), thread=True).to_list()
+
+    @pytest.mark.parametrize(['chunk_size', 'prefetch'], ((0, 1), (1, 0)))
+    async def test_from_sync_thread_invalid(self, chunk_size: int, prefetch: int):
+        with pytest.raises(ValueError):
+            await AsyncIter.from_sync(range(3), chunk_size, thread=True, prefetch=prefetch).to_list()
+
+    @pytest.mark.parametrize('chunk_size', (1, 3, 100))
+    @pytest.mark.parametrize('wrap', (lambda f: f, asyncify))
+    async def test_chunked_mode(self, chunk_size: int, wrap: Callable):
+        r = range(30)
+        it = AsyncIter(to_async_iter(r)).chunked_mode(chunk_size).chunked_mode()
+        result = await (
+            it.map(wrap(lambda x: x + 1))
+            .where(wrap(lambda x: x % 3))
+            .skip_where(wrap(lambda x: x % 5 == 0))
+            .enumerate(10)
+            .take_while(wrap(lambda x: x[1] < 25))
+            .to_list()
+        )
+        expected = [x + 1 for x in r]
+        expected = [x for x in expected if x % 3 and x % 5 != 0]
+        assert result == list(itertools.takewhile(lambda x: x[1] < 25, enumerate(expected, 10)))
+
+    @pytest.mark.parametrize('wrap', (lambda f: f, asyncify))
+    async def test_chunked_mode_exhausted(self, wrap: Callable):
+        it = AsyncIter(to_async_iter(range(9))).chunked_mode(3)
+        result = await it.map(wrap(lambda x: x * 2)).where(wrap(lambda x: x != 4)).enumerate().to_list()
+        assert result == list(enumerate(x * 2 for x in range(9) if x != 2))
+
+    @pytest.mark.parametrize('wrap', (lambda f: f, asyncify))
+    async def test_chunked_mode_take_while(self, wrap: Callable):
+        it = AsyncIter.from_sync(range(10), chunk_size=5)
+        assert await it.take_while(wrap(lambda x: x < 5)).to_list() == [0, 1, 2, 3, 4]
+        it = AsyncIter.from_sync(range(10), chunk_size=5)
+        assert await it.take_while(wrap(lambda x: x < 7)).to_list() == list(range(7))
+        it = AsyncIter.from_sync(range(10), chunk_size=5)
+        assert await it.take_while(wrap(lambda x: x < 100)).to_list() == list(range(10))
+
+    @pytest.mark.parametrize(['method', 'args', 'expected'], (
+        ('map', (lambda x: x * 2,), [2, 4, 6, 8]),
+        ('where', (lambda x: x % 2,), [1, 3]),
+        ('skip_where', (lambda x: x % 2,), [2, 4]),
+        ('enumerate', (), [(0, 1), (1, 2), (2, 3), (3, 4)]),
+        ('take_while', (lambda x: x < 3,), [1, 2]),
+        ('chunked_mode', (), [1, 2, 3, 4]),
+    ))
+    async def test_chunked_mode_started(self, method: str, args: tuple, expected: list):
+        it = AsyncIter.from_sync(range(5), chunk_size=3)
+        assert await it.next() == 0
+        result = getattr(it, method)(*args)
+        assert result is not it
+        assert await result.to_list() == expected
+
+    async def test_chunked_mode_concurrency(self):
+        it = AsyncIter.from_sync(range(10), chunk_size=4)
+        it = it.map(asyncify(lambda x: x * 2), concurrency=3)
+        it = it.where(asyncify(lambda x: x % 4 == 0), concurrency=3)
+        it = it.skip_where(asyncify(lambda x: x == 8), concurrency=3)
+        assert await it.to_list() == [0, 4, 12, 16]
+
+    async def test_chunked_mode_with_executor(self):
+        loop_thread = threading.get_ident()
+        threads = set()
+
+        def func(x: int) -> int:
+            threads.add(threading.get_ident())
+            return x
+
+        with ThreadPoolExecutor(2) as executor:
+            it = AsyncIter(to_async_iter(range(10))).with_executor(executor).chunked_mode(3)
+            assert await it.map(func).to_list() == list(range(10))
+        assert threads and loop_thread not in threads
+
+    async def test_chunked_mode_invalid(self):
+        with pytest.raises(ValueError):
+            await AsyncIter.from_sync(range(10), chunk_size=0).to_list()
+        with pytest.raises(ValueError):
+            await AsyncIter(to_async_iter(range(10))).chunked_mode(0).to_list()
+
+    @pytest.mark.parametrize('chain', (
+        (),
+        (('map', lambda x: x * 2),),
+        (('map', asyncify(lambda x: x + 1)), ('where', lambda x: x % 3), ('map', str)),
+        (('skip', 3), ('skip_where', asyncify(lambda x: x % 2)), ('enumerate', 5)),
+        (('take', 7), ('where', asyncify(lambda x: x % 2)), ('skip', 1)),
+        (('where', lambda x: x % 2), ('take', 3), ('map', lambda x: -x), ('take', 2)),
+        (('take_while', asyncify(lambda x: x < 12)), ('skip', -1), ('take', -1)),
+        (('enumerate', 0), ('skip_where', lambda x: x[0] == 3), ('take', 5), ('where', lambda x: x[1] > 1)),
+        (('take', 30), ('take_while', lambda x: x < 100), ('skip', 100)),
+    ))
+    async def test_fuse(self, chain: tuple[tuple[str, Any], ...]):
+        expected_source = aiter(to_async_iter(range(20)))
+        expected: AsyncIter = AsyncIter(expected_source)
+        actual_source = aiter(to_async_iter(range(20)))
+        actual: AsyncIter = AsyncIter(actual_source).fuse().fuse()
+        for method, arg in chain:
+            expected = getattr(expected, method)(arg)
+            actual = getattr(actual, method)(arg)
+        assert isinstance(actual, FusedAsyncIter)
+        assert await actual.to_list() == await expected.to_list()
+        assert [item async for item in actual_source] == [item async for item in expected_source]
+
+    @pytest.mark.parametrize(['method', 'arg', 'expected'], (
+        ('map', lambda x: x * 2, [2, 4, 6, 8]),
+        ('where', lambda x: x % 2, [1, 3]),
+        ('skip_where', lambda x: x % 2, [2, 4]),
+        ('skip', 2, [3, 4]),
+        ('take', 2, [1, 2]),
+        ('enumerate', 1, [(1, 1), (2, 2), (3, 3), (4, 4)]),
+        ('take_while', lambda x: x < 3, [1, 2]),
+    ))
+    async def test_fuse_started(self, method: str, arg: Any, expected: list):
+        it = AsyncIter.from_sync(range(5)).fuse().map(lambda x: x)
+        assert await it.next() == 0
+        result = getattr(it, method)(arg)
+        assert not isinstance(result, FusedAsyncIter)
+        assert isinstance(it.fuse(), FusedAsyncIter)
+        assert await result.to_list() == expected
+
+    async def test_fuse_concurrency(self):
+        it = AsyncIter.from_sync(range(10)).fuse()
+        it = it.map(asyncify(lambda x: x * 2), concurrency=3)
+        it = it.where(asyncify(lambda x: x % 4 == 0), concurrency=3)
+        it = it.skip_where(asyncify(lambda x: x == 8), concurrency=3)
+        assert await it.to_list() == [0, 4, 12, 16]
+
+    async def test_fuse_with_executor(self):
+        loop_thread = threading.get_ident()
+        threads = set()
+
+        def func(x: int) -> int:
+            threads.add(threading.get_ident())
+            return x
+
+        with ThreadPoolExecutor(2) as executor:
+            it = AsyncIter.from_sync(range(10)).with_executor(executor).fuse()
+            assert await it.map(func).where(asyncify(lambda x: x % 2)).to_list() == [1, 3, 5, 7, 9]
+        assert threads and loop_thread not in threads
+
+    @pytest.mark.parametrize('prefetch', (1, 256))
+    def test_to_sync(self, prefetch: int):
+        loops = set()
+
+        async def source():
+            loops.add(asyncio.get_running_loop())
+            for item in range(1000):
+                if item % 100 == 0:
+                    await asyncio.sleep(0)
+                yield item
+
+        assert AsyncIter(source()).to_sync(prefetch).to_list() == list(range(1000))
+        assert AsyncIter(source()).map(lambda x: x * 2).to_sync(prefetch).max() == 999 * 2
+        assert loops == {background_loop()}
+
+    def test_to_sync_close(self):
+        closed = threading.Event()
+
+        async def source():
+            try:
+                for item in range(1000):
+                    await asyncio.sleep(0)
+                    yield item
+            finally:
+                closed.set()
+
+        it = iter(AsyncIter(source()).to_sync(prefetch=10))
+        assert isinstance(it, Generator)
+        assert next(it) == 0
+        it.close()
+        assert closed.is_set()
+
+    def test_to_sync_close_on_loop(self):
+        closed = threading.Event()
+        done = threading.Event()
+
+        async def source():
+            try:
+                for item in range(1000):
+                    await asyncio.sleep(0)
+                    yield item
+            finally:
+                closed.set()
+
+        it = iter(AsyncIter(source()).to_sync(prefetch=10))
+        assert isinstance(it, Generator)
+        assert next(it) == 0
+
+        def close() -> None:
+            it.close()
+            done.set()
+
+        background_loop().call_soon_threadsafe(close)
+        assert done.wait(5)
+        assert closed.wait(5)
+
+    def test_to_sync_error(self):
+        async def source():
+            yield 1
+            raise ValueError('failed')
+
+        it = AsyncIter(source()).to_sync()
+        assert it.next() == 1
+        with pytest.raises(ValueError, match='failed'):
+            it.next()
+
+    def test_to_sync_invalid(self):
+        with pytest.raises(ValueError):
+            AsyncIter.from_sync(range(3)).to_sync(0).to_list()
+
     async def test_to_list(self):
         r = range(5)
         actual_list = await AsyncIter(to_async_iter(r)).to_list()
@@ -60,6 +401,77 @@ class TestAsyncIter:
         r = range(10)
         assert await AsyncIter(to_async_iter(r)).map(func).to_list() == [x ** 2 for x in range(10)]
 
+    @pytest.mark.parametrize('ordered', (True, False))
+    @pytest.mark.parametrize('concurrency', (2, 3, 100))
+    async def test_map_concurrency(self, concurrency: int, ordered: bool):
+        in_flight = max_in_flight = 0
+
+        async def func(x: int) -> int:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(in_flight, max_in_flight)
+            await asyncio.sleep(0.001 * (x % 3))
+            in_flight -= 1
+            return x ** 2
+
+        r = range(10)
+        result = await AsyncIter.from_sync(r).map(func, concurrency=concurrency, ordered=ordered).to_list()
+        if ordered:
+            assert result == [x ** 2 for x in r]
+        else:
+            assert sorted(result) == [x ** 2 for x in r]
+        assert max_in_flight == min(concurrency, len(r))
+
+    async def test_map_concurrency_unordered(self):
+        async def func(x: int) -> int:
+            await asyncio.sleep(0.01 * x)
+            return x
+
+        it = AsyncIter.from_sync((3, 2, 1))
+        assert await it.map(func, concurrency=3, ordered=False).to_list() == [1, 2, 3]
+
+    async def test_map_concurrency_backpressure(self):
+        read = []
+
+        async def source():
+            for item in range(100):
+                read.append(item)
+                yield item
+
+        it = AsyncIter(source()).map(asyncify(lambda x: x), concurrency=5)
+        assert await it.take(3).to_list() == [0, 1, 2]
+        assert len(read) <= 3 + 5
+
+    async def test_map_concurrency_cancel(self):
+        cancelled = 0
+
+        async def func(x: int) -> int:
+            nonlocal cancelled
+            try:
+                await asyncio.sleep(x)
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+            return x
+
+        it = AsyncIter.from_sync((0, 10, 10, 10)).map(func, concurrency=4)
+        async with aclosing(aiter(it)) as results:
+            assert await anext(results) == 0
+        assert cancelled == 3
+
+    async def test_map_concurrency_error(self):
+        async def func(x: int) -> int:
+            if x == 3:
+                raise RuntimeError
+            return x
+
+        with pytest.raises(RuntimeError):
+            await AsyncIter.from_sync(range(10)).map(func, concurrency=3).to_list()
+
+    async def test_map_concurrency_invalid(self):
+        with pytest.raises(ValueError):
+            await AsyncIter.from_sync(range(10)).map(lambda x: x, concurrency=0).to_list()
+
     @pytest.mark.parametrize('count', (0, 5, 100))
     async def test_skip(self, count: int):
         r = range(10)
@@ -160,12 +572,63 @@ class TestAsyncIter:
     async def test_where(self, items: list[int], condition: Callable, result: list[int]):
         assert await AsyncIter(to_async_iter(items)).where(condition).to_list() == result
 
+    @pytest.mark.parametrize('concurrency', (2, 5, 100))
+    async def test_where_concurrency(self, concurrency: int):
+        async def condition(x: int) -> bool:
+            await asyncio.sleep(0.001 * (x % 3))
+            return x % 2 == 0
+
+        r = range(20)
+        it = AsyncIter.from_sync(r)
+        assert await it.where(condition, concurrency=concurrency).to_list() == [x for x in r if x % 2 == 0]
+
+    @pytest.mark.parametrize('concurrency', (2, 5, 100))
+    async def test_skip_where_concurrency(self, concurrency: int):
+        async def condition(x: int) -> bool:
+            await asyncio.sleep(0.001 * (x % 3))
+            return x % 2 == 0
+
+        r = range(20)
+        it = AsyncIter.from_sync(r)
+        assert await it.skip_where(condition, concurrency=concurrency).to_list() == [x for x in r if x % 2 != 0]
+
+    async def test_first_where_concurrency(self):
+        checked = []
+        cancelled = 0
+
+        async def condition(x: int) -> bool:
+            nonlocal cancelled
+            checked.append(x)
+            try:
+                await asyncio.sleep(0.01 if x == 3 else 10)
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+            return True
+
+        it = AsyncIter.from_sync(range(3, 100))
+        assert await it.first_where(condition, concurrency=4) == 3
+        assert checked == [3, 4, 5, 6]
+        assert cancelled == 3
+
+    async def test_first_where_concurrency_not_found(self):
+        it = AsyncIter.from_sync(range(10))
+        assert await it.first_where(asyncify(lambda x: x > 100), default=None, concurrency=4) is None
+
+    async def test_last_where_concurrency(self):
+        async def condition(x: int) -> bool:
+            await asyncio.sleep(0.001 * (x % 3))
+            return x % 4 == 0
+
+        assert await AsyncIter.from_sync(range(10)).last_where(condition, concurrency=3) == 8
+
     @pytest.mark.parametrize(
         ['items', 'condition', 'result'],
         (
             (list(range(10)), lambda x: x < 5, [x for x in range(10) if x < 5]),
             (list(range(10)), lambda x: x <= 10, [x for x in range(10) if x <= 10]),
             (list(range(10)), asyncify(lambda x: x < 5), [x for x in range(10) if x < 5]),
+            (list(range(10)), asyncify(lambda x: x <= 10), [x for x in range(10) if x <= 10]),
             (list(range(10)), lambda x: x > 5, []),
         ),
     )
@@ -185,6 +648,368 @@ class TestAsyncIter:
         l2 = [1, 2, 3]
         assert await AsyncIter.from_sync(l1).chain(AsyncIter.from_sync(l2)).to_list() == l1 + l2
 
+    @staticmethod
+    async def slow_source(items: Iterable[int], delay: float, closed: list[int] | None = None):
+        try:
+            for item in items:
+                await asyncio.sleep(delay)
+                yield item
+        finally:
+            if closed is not None:
+                closed.append(1)
+
+    @pytest.mark.parametrize('buffer', (1, 16))
+    async def test_merge(self, buffer: int):
+        merged = await AsyncIter(self.slow_source(range(5), 0.001)).merge(
+            self.slow_source(range(10, 13), 0.002),
+            asyncify_iterable(range(20, 24)),
+            buffer=buffer,
+        ).to_list()
+        assert sorted(merged) == [*range(5), *range(10, 13), *range(20, 24)]
+        for start in (0, 10, 20):
+            part = [item for item in merged if start <= item < start + 10]
+            assert part == sorted(part)
+
+    async def test_merge_concurrently(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        merged = await AsyncIter.merge(
+            AsyncIter(self.slow_source(range(3), 0.05)),
+            self.slow_source(range(3, 6), 0.05),
+        ).to_list()
+        assert sorted(merged) == list(range(6))
+        assert loop.time() - start < 0.25
+
+    async def test_merge_not_closable(self):
+        class NotClosable:
+            def __init__(self, it: Iterable[int]):
+                self._it = iter(it)
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                try:
+                    return next(self._it)
+                except StopIteration:
+                    raise StopAsyncIteration from None
+
+        merged = await AsyncIter(NotClosable(range(3))).merge(NotClosable(range(3, 5))).to_list()
+        assert sorted(merged) == list(range(5))
+
+    async def test_merge_close(self):
+        closed: list[int] = []
+        merged = AsyncIter(self.slow_source(range(100), 0.001, closed)).merge(
+            self.slow_source(range(100), 0.01, closed),
+            buffer=1,
+        )
+        async with aclosing(aiter(merged)) as items:
+            assert await anext(items) in (0, 1)
+        assert closed == [1, 1]
+
+    async def test_merge_error(self):
+        closed: list[int] = []
+
+        async def failing():
+            yield 1
+            raise ValueError('failed')
+
+        merged = AsyncIter(failing()).merge(self.slow_source(range(100), 0.01, closed))
+        with pytest.raises(ValueError, match='failed'):
+            await merged.to_list()
+        assert closed == [1]
+
+    async def test_merge_invalid_buffer(self):
+        with pytest.raises(ValueError):
+            await AsyncIter.from_sync(range(3)).merge(buffer=0).to_list()
+
+    @pytest.mark.parametrize('buffer', (1, 16))
+    async def test_merge_sorted(self, buffer: int):
+        merged = AsyncIter(self.slow_source((1, 4, 7), 0.002)).merge_sorted(
+            self.slow_source((2, 5, 8, 9), 0.001),
+            asyncify_iterable((0, 3, 6)),
+            AsyncIter.empty(),
+            buffer=buffer,
+        )
+        assert await merged.to_list() == list(range(10))
+
+    @pytest.mark.parametrize('key', (len, asyncify(len)))
+    async def test_merge_sorted_key(self, key: Callable):
+        merged = AsyncIter.from_sync(('a', 'bb', 'ccc')).merge_sorted(asyncify_iterable(('d', 'ee', 'fff')), key=key)
+        assert await merged.to_list() == ['a', 'd', 'bb', 'ee', 'ccc', 'fff']
+
+    async def test_merge_sorted_concurrently(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        merged = await AsyncIter.merge_sorted(
+            AsyncIter(self.slow_source(range(0, 6, 2), 0.05)),
+            self.slow_source(range(1, 6, 2), 0.05),
+        ).to_list()
+        assert merged == list(range(6))
+        # sources are read ahead concurrently, sequentially it takes 0.3
+        assert loop.time() - start < 0.25
+
+    async def test_merge_sorted_close(self):
+        closed: list[int] = []
+        merged = AsyncIter(self.slow_source(range(100), 0.001, closed)).merge_sorted(
+            self.slow_source(range(100), 0.001, closed),
+            buffer=1,
+        )
+        async with aclosing(aiter(merged)) as items:
+            assert await anext(items) == 0
+        assert closed == [1, 1]
+
+    async def test_merge_sorted_error(self):
+        closed: list[int] = []
+
+        async def failing():
+            yield 1
+            raise ValueError('failed')
+
+        merged = AsyncIter(failing()).merge_sorted(self.slow_source(range(100), 0.01, closed))
+        with pytest.raises(ValueError, match='failed'):
+            await merged.to_list()
+        assert closed == [1]
+
+    async def test_merge_sorted_error_after_chunk(self):
+        async def failing():
+            yield 1
+            yield 2
+            raise ValueError('failed')
+
+        items = []
+        with pytest.raises(ValueError, match='failed'):
+            async for item in AsyncIter(failing()).merge_sorted():
+                items.append(item)
+        assert items == [1, 2]
+
+    async def test_merge_sorted_invalid_buffer(self):
+        with pytest.raises(ValueError):
+            await AsyncIter.from_sync(range(3)).merge_sorted(buffer=0).to_list()
+
+    async def test_prefetch(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        async for _ in AsyncIter(self.slow_source(range(5), 0.03)).prefetch(2):
+            await asyncio.sleep(0.03)
+        # reading and processing overlap, sequentially it takes 0.3
+        assert loop.time() - start < 0.25
+
+        assert await AsyncIter.from_sync(range(10)).prefetch().to_list() == list(range(10))
+
+    async def test_prefetch_close(self):
+        closed: list[int] = []
+        prefetched = AsyncIter(self.slow_source(range(100), 0.001, closed)).prefetch(3)
+        async with aclosing(aiter(prefetched)) as items:
+            assert await anext(items) == 0
+        assert closed == [1]
+
+    async def test_prefetch_error(self):
+        async def failing():
+            yield 1
+            raise ValueError('failed')
+
+        prefetched = AsyncIter(failing()).prefetch()
+        assert await prefetched.next() == 1
+        with pytest.raises(ValueError, match='failed'):
+            await prefetched.next()
+
+    async def test_prefetch_invalid(self):
+        with pytest.raises(ValueError):
+            await AsyncIter.from_sync(range(3)).prefetch(0).to_list()
+
+    @pytest.mark.parametrize(['max_in_memory', 'block_size'], ((None, 1024), (0, 1), (5, 3), (2, 10), (100, 7)))
+    async def test_cache(self, max_in_memory: int | None, block_size: int):
+        reads = 0
+
+        async def source():
+            nonlocal reads
+            for item in range(50):
+                reads += 1
+                yield item
+
+        cached = AsyncIter(source()).cache(max_in_memory, block_size)
+        first = AsyncIter(cached)
+        assert await first.take(10).to_list() == list(range(10))
+        assert await AsyncIter(cached).to_list() == list(range(50))
+        assert await first.to_list() == list(range(10, 50))
+        assert await AsyncIter(cached).where(lambda x: x % 2).to_list() == list(range(1, 50, 2))
+        assert reads == 50
+        if max_in_memory is not None:
+            assert len(cached._memory) <= max(max_in_memory, block_size)
+        cached.close()
+
+    @pytest.mark.parametrize('max_in_memory', (None, 4))
+    async def test_cache_concurrent_readers(self, max_in_memory: int | None):
+        reads = 0
+
+        async def source():
+            nonlocal reads
+            for item in range(30):
+                reads += 1
+                await asyncio.sleep(0)
+                yield item
+
+        cached = AsyncIter(source()).cache(max_in_memory, block_size=2)
+        results = await asyncio.gather(*(AsyncIter(cached).to_list() for _ in range(3)))
+        assert results == [list(range(30))] * 3
+        assert reads == 30
+
+    async def test_cache_reader_cancelled(self):
+        read = asyncio.Event()
+
+        async def source():
+            for item in range(5):
+                await asyncio.sleep(0.001)
+                yield item
+                read.set()
+
+        cached = AsyncIter(source()).cache()
+        reader = asyncio.ensure_future(AsyncIter(cached).to_list())
+        await read.wait()
+        reader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await reader
+        assert await AsyncIter(cached).to_list() == list(range(5))
+
+    async def test_cache_close_pending(self):
+        async def source():
+            yield 1
+            await asyncio.sleep(10)
+            yield 2
+
+        cached = AsyncIter(source()).cache()
+        reader = asyncio.ensure_future(AsyncIter(cached).to_list())
+        await asyncio.sleep(0.01)
+        reader.cancel()
+        await asyncio.gather(reader, return_exceptions=True)
+        pending = cached._reading
+        assert pending is not None
+        cached.close()
+        await asyncio.gather(pending, return_exceptions=True)
+        assert pending.cancelled()
+
+    async def test_cache_error(self):
+        async def source():
+            yield 1
+            raise ValueError('failed')
+
+        cached = AsyncIter(source()).cache()
+        with pytest.raises(ValueError, match='failed'):
+            await AsyncIter(cached).to_list()
+        reader = AsyncIter(cached)
+        assert await reader.next() == 1
+        with pytest.raises(ValueError, match='failed'):
+            await reader.next()
+
+    @pytest.mark.parametrize(['max_in_memory', 'block_size'], ((-1, 1), (None, 0)))
+    async def test_cache_invalid(self, max_in_memory: int | None, block_size: int):
+        with pytest.raises(ValueError):
+            AsyncIter.from_sync(range(3)).cache(max_in_memory, block_size)
+
+    @pytest.mark.parametrize('buffer', (1, 3, 100))
+    async def test_tee(self, buffer: int):
+        first, second, third = AsyncIter.from_sync(range(10)).tee(3, buffer)
+        assert await first.zip(second, third).to_list() == [[i, i, i] for i in range(10)]
+
+    async def test_tee_tasks(self):
+        read = 0
+        max_ahead = 0
+        slow_items: list[int] = []
+
+        async def source():
+            nonlocal read, max_ahead
+            for item in range(50):
+                read += 1
+                max_ahead = max(max_ahead, read - len(slow_items))
+                yield item
+
+        async def consume_slow(it: AsyncIter[int]) -> list[int]:
+            async for item in it:
+                await asyncio.sleep(0.001)
+                slow_items.append(item)
+            return slow_items
+
+        fast, slow = AsyncIter(source()).tee(2, buffer=4)
+        fast_items, _ = await asyncio.gather(fast.to_list(), consume_slow(slow))
+        assert fast_items == slow_items == list(range(50))
+        assert max_ahead <= 4 + 1
+
+    async def test_tee_concurrent_readers(self):
+        async def source():
+            for item in range(5):
+                await asyncio.sleep(0.001)
+                yield item
+
+        its = AsyncIter(source()).tee(3, buffer=2)
+        results = await asyncio.gather(*(it.to_list() for it in its))
+        assert results == [list(range(5))] * 3
+
+    async def test_tee_closed(self):
+        first, second = AsyncIter.from_sync(range(10)).tee(2, buffer=2)
+        async with aclosing(aiter(second)) as items:
+            assert await anext(items) == 0
+        assert await first.to_list() == list(range(10))
+
+    async def test_tee_consumer_cancelled(self):
+        read = asyncio.Event()
+
+        async def source():
+            for item in range(5):
+                await asyncio.sleep(0.001)
+                yield item
+                read.set()
+
+        first, second = AsyncIter(source()).tee(2)
+        consumer = asyncio.ensure_future(first.to_list())
+        await read.wait()
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+        assert await second.to_list() == list(range(5))
+
+    async def test_tee_closed_while_reading(self):
+        closed = False
+
+        async def source():
+            nonlocal closed
+            try:
+                yield 1
+                await asyncio.sleep(10)
+                yield 2
+            finally:
+                closed = True
+
+        (only,) = AsyncIter(source()).tee(1)
+        consumer = asyncio.ensure_future(only.to_list())
+        await asyncio.sleep(0.01)
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert closed
+
+    async def test_tee_error(self):
+        async def source():
+            yield 1
+            raise ValueError('failed')
+
+        first, second = AsyncIter(source()).tee()
+        with pytest.raises(ValueError, match='failed'):
+            await first.to_list()
+        assert await second.next() == 1
+        with pytest.raises(ValueError, match='failed'):
+            await second.next()
+
+    async def test_tee_executor(self):
+        with ThreadPoolExecutor(1) as executor:
+            its = AsyncIter.from_sync(range(3)).with_executor(executor).tee()
+            assert all(it._executor is executor for it in its)
+
+    @pytest.mark.parametrize(['n', 'buffer'], ((0, 1), (2, 0)))
+    async def test_tee_invalid(self, n: int, buffer: int):
+        with pytest.raises(ValueError):
+            AsyncIter.from_sync(range(3)).tee(n, buffer)
+
     @pytest.mark.parametrize('items', (
         [1, 1, 1],
         [1, 0, 1],
@@ -249,11 +1074,14 @@ class TestAsyncIter:
         (
             (range(5), None),
             (range(5), int.bit_count),
+            (range(5), asyncify(int.bit_count)),
             ((-10, 10), None),
+            ((10, -10), None),
         ),
     )
     async def test_max(self, it: Iterable, key: Callable):
-        assert await AsyncIter.from_sync(it).max(key=key) == max(it, key=key)
+        sync_key = key.__wrapped__ if hasattr(key, '__wrapped__') else key
+        assert await AsyncIter.from_sync(it).max(key=key) == max(it, key=sync_key)
 
     async def test_max_default(self):
         default = 'default'
@@ -268,12 +1096,16 @@ class TestAsyncIter:
         (
             (range(5), None),
             (range(5), int.bit_count),
+            (range(5), asyncify(int.bit_count)),
+            (range(5, 0, -1), int.bit_count),
+            (range(5, 0, -1), asyncify(int.bit_count)),
             ((-10, 10), None),
             ((10, -10), None),
         ),
     )
     async def test_min(self, it: Iterable, key: Callable):
-        assert await AsyncIter.from_sync(it).min(key=key) == min(it, key=key)
+        sync_key = key.__wrapped__ if hasattr(key, '__wrapped__') else key
+        assert await AsyncIter.from_sync(it).min(key=key) == min(it, key=sync_key)
 
     async def test_min_default(self):
         default = 'default'
@@ -297,10 +1129,83 @@ class TestAsyncIter:
             initial=initial,
         ) == functools.reduce(func, it, initial)
 
+    async def test_reduce_async(self):
+        assert await AsyncIter.from_sync(range(5)).reduce(asyncify(operator.add)) == sum(range(5))
+
     async def test_reduce_empty(self):
         with pytest.raises(ValueError):
             await AsyncIter.from_sync(()).reduce(func=operator.add)
 
+    @pytest.mark.parametrize('max_in_memory', (None, 1, 7, 50, 100, 1000))
+    @pytest.mark.parametrize('reverse', (False, True))
+    @pytest.mark.parametrize('key', (None, lambda item: item[0], asyncify(lambda item: item[0])))
+    async def test_sort(self, max_in_memory: int | None, reverse: bool, key: Callable | None):
+        items = [((i * 37) % 11, i) for i in range(100)]
+        result = await AsyncIter.from_sync(items).sort(key, reverse, max_in_memory, block_size=3).to_list()
+        # sorting by the first element only checks that the sort is stable
+        expected = sorted(items, key=None if key is None else operator.itemgetter(0), reverse=reverse)
+        assert result == expected
+
+    @pytest.mark.parametrize('max_in_memory', (None, 10))
+    async def test_sort_key_once(self, max_in_memory: int | None):
+        calls = 0
+
+        def key(item: int) -> int:
+            nonlocal calls
+            calls += 1
+            return -item
+
+        assert await AsyncIter.from_sync(range(30)).sort(key, max_in_memory=max_in_memory).to_list() == list(
+            range(29, -1, -1),
+        )
+        assert calls == 30
+
+    @pytest.mark.parametrize('k', (0, 1, 5, 100, 200))
+    @pytest.mark.parametrize('reverse', (False, True))
+    @pytest.mark.parametrize(['key', 'concurrency'], (
+        (None, 1),
+        (operator.itemgetter(0), 1),
+        (asyncify(operator.itemgetter(0)), 1),
+        (operator.itemgetter(0), 4),
+        (asyncify(operator.itemgetter(0)), 4),
+    ))
+    async def test_top_k(self, k: int, reverse: bool, key: Callable | None, concurrency: int):
+        items = [((i * 37) % 11, i) for i in range(100)]
+        expected = sorted(items, key=None if key is None else operator.itemgetter(0), reverse=not reverse)[:k]
+        assert await AsyncIter.from_sync(items).top_k(k, key, reverse, concurrency).to_list() == expected
+
+    @pytest.mark.parametrize('concurrency', (1, 4))
+    async def test_top_k_key_once(self, concurrency: int):
+        calls = 0
+
+        async def key(item: int) -> int:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            return item % 7
+
+        result = await AsyncIter.from_sync(range(30)).top_k(3, key, concurrency=concurrency).to_list()
+        assert result == [6, 13, 20]
+        assert calls == 30
+
+    async def test_top_k_zero(self):
+        it = AsyncIter.from_sync(range(3))
+        assert await it.top_k(0).to_list() == []
+        assert await it.to_list() == [0, 1, 2]
+
+    @pytest.mark.parametrize(['k', 'concurrency'], ((-1, 1), (1, 0)))
+    async def test_top_k_invalid(self, k: int, concurrency: int):
+        with pytest.raises(ValueError):
+            await AsyncIter.from_sync(range(3)).top_k(k, concurrency=concurrency).to_list()
+
+    async def test_sort_empty(self):
+        assert await AsyncIter.from_sync(()).sort(max_in_memory=10).to_list() == []
+
+    @pytest.mark.parametrize(['max_in_memory', 'block_size'], ((0, 1), (1, 0), (None, 0)))
+    async def test_sort_invalid(self, max_in_memory: int | None, block_size: int):
+        with pytest.raises(ValueError):
+            await AsyncIter.from_sync(range(3)).sort(max_in_memory=max_in_memory, block_size=block_size).to_list()
+
     @pytest.mark.parametrize(
         ('it', 'func', 'initial'),
         (
@@ -315,6 +1220,10 @@ class TestAsyncIter:
             func=func,
             initial=initial
         ).to_list() == list(itertools.accumulate(it, func, initial=initial))
+        assert await AsyncIter.from_sync(it).accumulate(
+            func=asyncify(func),
+            initial=initial
+        ).to_list() == list(itertools.accumulate(it, func, initial=initial))
 
     @pytest.mark.parametrize(
         ('iterables',),
@@ -447,6 +1356,301 @@ class TestAsyncIter:
         batches = sync_it.batches(batch_size)
         assert await batches.map(tuple).to_tuple() == expected  # type: ignore
 
+    @pytest.mark.parametrize('max_wait', (None, 10))
+    @pytest.mark.parametrize(['it', 'batch_size', 'max_weight', 'expected'], (
+        (['ab', 'cd', 'e', 'fgh'], 10, 4, (('ab', 'cd'), ('e', 'fgh'))),
+        (['ab', 'cd', 'e', 'fgh'], 1, 4, (('ab',), ('cd',), ('e',), ('fgh',))),
+        (['abcdef', 'a', 'b'], 10, 3, (('abcdef',), ('a', 'b'))),
+        (['a', 'b', 'c'], 2, 10, (('a', 'b'), ('c',))),
+        (['a', 'b', 'c'], 2, None, (('a', 'b'), ('c',))),
+        ([], 2, 10, ()),
+    ))
+    async def test_batches_max_weight(
+        self,
+        it: Sequence[str],
+        batch_size: int,
+        max_weight: int | None,
+        max_wait: float | None,
+        expected: tuple,
+    ):
+        batches = AsyncIter.from_sync(it).batches(batch_size, max_wait, max_weight)
+        assert await batches.to_tuple() == expected
+
+    async def test_batches_weight(self):
+        batches = AsyncIter.from_sync(range(6)).batches(10, max_weight=5, weight=lambda x: x)
+        assert await batches.to_tuple() == ((0, 1, 2), (3,), (4,), (5,))
+
+    async def test_batches_max_wait(self):
+        async def source():
+            yield 1
+            yield 2
+            await asyncio.sleep(0.2)
+            yield 3
+            await asyncio.sleep(0.2)
+
+        loop = asyncio.get_running_loop()
+        flushed_at = []
+        async for batch in AsyncIter(source()).batches(10, max_wait=0.05):
+            flushed_at.append((batch, loop.time()))
+        assert [batch for batch, _ in flushed_at] == [(1, 2), (3,)]
+        # the first batch is flushed by timeout, before the source yields the next item
+        assert flushed_at[1][1] - flushed_at[0][1] > 0.1
+
+    async def test_batches_max_wait_close(self):
+        cancelled = asyncio.Event()
+
+        async def source():
+            yield 1
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            yield 2  # pragma: no cover
+
+        async with aclosing(aiter(AsyncIter(source()).batches(10, max_wait=0.01))) as batches:
+            assert await anext(batches) == (1,)
+        assert cancelled.is_set()
+
+    async def test_batches_invalid_size(self):
+        with pytest.raises(ValueError):
+            await AsyncIter.from_sync(range(3)).batches(0).to_list()
+
+    @pytest.mark.parametrize(['it', 'size', 'agg', 'expected'], (
+        (range(7), 3, None, ((0, 1, 2), (3, 4, 5), (6,))),
+        (range(7), 3, Sum, (3, 12, 6)),
+        (range(6), 3, Count, (3, 3)),
+        (range(6), 2, lambda: Fold(operator.mul, 1), (0, 6, 20)),
+        ((), 3, Sum, ()),
+    ))
+    async def test_tumbling_window(self, it: Iterable[int], size: int, agg: Callable | None, expected: tuple):
+        assert await AsyncIter.from_sync(it).tumbling_window(size, agg).to_tuple() == expected
+
+    @pytest.mark.parametrize(['it', 'size', 'step', 'agg', 'expected'], (
+        (range(5), 3, 1, None, ((0, 1, 2), (1, 2, 3), (2, 3, 4))),
+        (range(5), 3, 1, Sum, (3, 6, 9)),
+        (range(7), 3, 2, Max, (2, 4, 6)),
+        (range(7), 2, 2, None, ((0, 1), (2, 3), (4, 5))),
+        (range(10), 2, 4, Sum, (1, 9, 17)),
+        (range(10), 2, 4, None, ((0, 1), (4, 5), (8, 9))),
+        (range(2), 3, 1, None, ()),
+    ))
+    async def test_sliding_window(
+        self,
+        it: Iterable[int],
+        size: int,
+        step: int,
+        agg: Callable | None,
+        expected: tuple,
+    ):
+        assert await AsyncIter.from_sync(it).sliding_window(size, step, agg).to_tuple() == expected
+
+    async def test_sliding_window_not_removable(self):
+        windows = AsyncIter.from_sync(range(6)).sliding_window(2, 2, lambda: Fold(operator.mul, 1))
+        assert await windows.to_tuple() == (0, 6, 20)
+        with pytest.raises(TypeError):
+            await AsyncIter.from_sync(range(6)).sliding_window(2, 1, lambda: Fold(operator.mul, 1)).to_list()
+
+    @staticmethod
+    async def timed_source(*schedule: tuple[float, int], tail: float = 0):
+        """Yield items at given offsets in seconds from the start"""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for offset, item in schedule:
+            await asyncio.sleep(start + offset - loop.time())
+            yield item
+        await asyncio.sleep(start + tail - loop.time())
+
+    @pytest.mark.parametrize(['agg', 'expected'], (
+        (None, [(1, 2), (3,), (4,)]),
+        (Sum, [3, 3, 4]),
+    ))
+    async def test_time_window_tumbling(self, agg: Callable | None, expected: list):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        source = self.timed_source((0, 1), (0, 2), (0.15, 3), (0.45, 4))
+        windows = []
+        async for window in AsyncIter(source).time_window(0.1, agg=agg):
+            windows.append((window, loop.time() - start))
+        assert [window for window, _ in windows] == expected
+        # the window is yielded at its end, while the source is waiting for the next item
+        assert windows[1][1] < 0.3
+
+    async def test_time_window_sliding(self):
+        source = self.timed_source((0, 1), (0.15, 2), tail=0.25)
+        assert await AsyncIter(source).time_window(0.2, 0.1).to_list() == [(1,), (1, 2), (2,)]
+
+        source = self.timed_source((0, 1), (0.15, 2), tail=0.25)
+        assert await AsyncIter(source).time_window(0.2, 0.1, Sum).to_list() == [1, 3, 2]
+
+    async def test_time_window_gaps(self):
+        source = self.timed_source((0, 1), (0.15, 2), (0.25, 3), tail=0.32)
+        assert await AsyncIter(source).time_window(0.1, 0.2).to_list() == [(2,)]
+
+    async def test_time_window_exhausted(self):
+        assert await AsyncIter.from_sync(range(3)).time_window(10, agg=Count).to_list() == [3]
+        assert await AsyncIter.from_sync(range(3)).time_window(10, 5).to_list() == [(0, 1, 2), (0, 1, 2)]
+        assert await AsyncIter.from_sync(()).time_window(10).to_list() == []
+
+    async def test_session_window(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        source = self.timed_source((0, 1), (0.02, 2), (0.2, 3), tail=0.4)
+        sessions = []
+        async for session in AsyncIter(source).session_window(0.1):
+            sessions.append((session, loop.time() - start))
+        assert [session for session, _ in sessions] == [(1, 2), (3,)]
+        # the session is yielded after the gap, while the source is still running
+        assert sessions[1][1] < 0.4
+
+    async def test_session_window_exhausted(self):
+        assert await AsyncIter.from_sync(range(3)).session_window(10, Count).to_list() == [3]
+        assert await AsyncIter.from_sync(()).session_window(10).to_list() == []
+
+    @pytest.mark.parametrize('window', (
+        lambda it: it.tumbling_window(0),
+        lambda it: it.tumbling_window(0, Sum),
+        lambda it: it.sliding_window(0),
+        lambda it: it.sliding_window(2, 0),
+        lambda it: it.time_window(0),
+        lambda it: it.time_window(1, 0),
+        lambda it: it.session_window(0),
+    ))
+    async def test_window_invalid_size(self, window: Callable):
+        with pytest.raises(ValueError):
+            await window(AsyncIter.from_sync(range(3))).to_list()
+
+    @pytest.mark.parametrize(['engine', 'agg', 'expected'], (
+        ('hash', None, ((0, (1, 2, 3)), (1, (11, 12, 13)), (2, (21,)))),
+        ('hash', Sum, ((0, 6), (1, 36), (2, 21))),
+        ('hash', {'count': Count, 'max': Max}, (
+            (0, {'count': 3, 'max': 3}),
+            (1, {'count': 3, 'max': 13}),
+            (2, {'count': 1, 'max': 21}),
+        )),
+        ('sorted', None, ((0, (1, 2)), (1, (11, 12, 13)), (2, (21,)), (0, (3,)))),
+        ('sorted', Sum, ((0, 3), (1, 36), (2, 21), (0, 3))),
+        ('sorted', {'count': Count}, ((0, {'count': 2}), (1, {'count': 3}), (2, {'count': 1}), (0, {'count': 1}))),
+    ))
+    @pytest.mark.parametrize('key', (lambda x: x // 10, asyncify(lambda x: x // 10)))
+    async def test_group_by(self, engine: str, agg: Any, expected: tuple, key: Callable):
+        it = AsyncIter.from_sync((1, 2, 11, 12, 13, 21, 3))
+        assert await it.group_by(key, agg, engine).to_tuple() == expected
+
+    @pytest.mark.parametrize('engine', ('hash', 'sorted'))
+    async def test_group_by_empty(self, engine: str):
+        assert await AsyncIter.empty().group_by(lambda x: x, Count, engine).to_tuple() == ()
+
+    async def test_group_by_sorted_streaming(self):
+        groups = AsyncIter.from_sync(itertools.count()).group_by(lambda x: x // 3, engine='sorted')
+        assert await groups.take(2).to_tuple() == ((0, (0, 1, 2)), (1, (3, 4, 5)))
+
+    async def test_group_by_invalid_engine(self):
+        with pytest.raises(ValueError):
+            await AsyncIter.from_sync(range(3)).group_by(lambda x: x, engine='tree').to_list()
+
+    @pytest.mark.parametrize('engine', ('hash', 'merge'))
+    @pytest.mark.parametrize(['how', 'expected'], (
+        ('inner', ((1, (1, 'a')), (2, (2, 'b')), (2, (2, 'c')), (2, (2, 'b')), (2, (2, 'c')), (5, (5, 'e')))),
+        ('left', (
+            (1, (1, 'a')), (2, (2, 'b')), (2, (2, 'c')), (2, (2, 'b')), (2, (2, 'c')), (3, None), (5, (5, 'e')),
+        )),
+        ('semi', (1, 2, 2, 5)),
+        ('anti', (3,)),
+    ))
+    @pytest.mark.parametrize('key', (lambda x: x, asyncify(lambda x: x)))
+    @pytest.mark.parametrize('async_other', (False, True))
+    async def test_join(self, engine: str, how: str, expected: tuple, key: Callable, async_other: bool):
+        right: Any = ((0, 'z'), (1, 'a'), (2, 'b'), (2, 'c'), (4, 'd'), (5, 'e'), (7, 'f'))
+        if async_other:
+            right = AsyncIter.from_sync(right)
+        joined = AsyncIter.from_sync((1, 2, 2, 3, 5)).join(right, key, asyncify(operator.itemgetter(0)), how, engine)
+        assert await joined.to_tuple() == expected
+
+    @pytest.mark.parametrize('engine', ('hash', 'merge'))
+    @pytest.mark.parametrize(['how', 'expected'], (
+        ('inner', ()),
+        ('left', ((1, None), (2, None))),
+        ('semi', ()),
+        ('anti', (1, 2)),
+    ))
+    async def test_join_empty_other(self, engine: str, how: str, expected: tuple):
+        joined = AsyncIter.from_sync((1, 2)).join((), lambda x: x, how=how, engine=engine)
+        assert await joined.to_tuple() == expected
+
+    async def test_join_merge_other_exhausted(self):
+        joined = AsyncIter.from_sync((1, 3)).join((0, 1), lambda x: x, how='left', engine='merge')
+        assert await joined.to_tuple() == ((1, 1), (3, None))
+
+    async def test_join_hash_unsorted(self):
+        joined = AsyncIter.from_sync((3, 1, 3)).join(('a', 'bbb', 'ccc'), lambda x: x, len)
+        assert await joined.to_tuple() == ((3, 'bbb'), (3, 'ccc'), (1, 'a'), (3, 'bbb'), (3, 'ccc'))
+
+    @pytest.mark.parametrize(['how', 'engine'], (('outer', 'hash'), ('inner', 'loop')))
+    async def test_join_invalid(self, how: str, engine: str):
+        with pytest.raises(ValueError):
+            await AsyncIter.from_sync(range(3)).join(range(3), lambda x: x, how=how, engine=engine).to_list()
+
+    @pytest.mark.parametrize(['key', 'mode', 'size', 'expected'], (
+        (None, 'exact', None, (3, 1, 2, 4)),
+        (lambda x: x % 2, 'exact', None, (3, 2)),
+        (None, 'lru', 2, (3, 1, 2, 1, 3, 4, 1)),
+        (None, 'bloom', 100, (3, 1, 2, 4)),
+        (lambda x: x % 2, 'bloom', 100, (3, 2)),
+        (asyncify(lambda x: x % 2), 'exact', None, (3, 2)),
+        (asyncify(lambda x: x % 2), 'lru', 1, (3, 2, 1, 4, 1)),
+    ))
+    async def test_distinct(self, key: Callable | None, mode: str, size: int | None, expected: tuple):
+        assert await AsyncIter.from_sync((3, 1, 3, 2, 1, 3, 4, 1)).distinct(key, mode, size).to_tuple() == expected
+
+    async def test_distinct_same_repr(self):
+        points = [_Point(i % 5) for i in range(12)] + [1, 1.0, True]
+        exact = await AsyncIter.from_sync(points).distinct().to_list()
+        assert await AsyncIter.from_sync(points).distinct(mode='bloom', size=100).to_list() == exact
+        assert len(exact) == 6
+        assert await AsyncIter.from_sync(points).approx_distinct() == 6
+
+    async def test_distinct_ttl(self):
+        items = AsyncIter.from_sync((3, 1, 3, 2, 1, 3, 4, 1))
+        assert await items.distinct(mode='lru', ttl=60).to_tuple() == (3, 1, 2, 4)
+
+    @pytest.mark.parametrize(['mode', 'size', 'ttl', 'message'], (
+        ('lru', None, None, 'size or ttl must be provided in lru mode'),
+        ('lru', 0, None, 'size must be greater than 0'),
+        ('lru', None, 0, 'ttl must be greater than 0'),
+        ('bloom', None, None, 'size must be provided in bloom mode'),
+        ('bloom', 0, None, 'size must be greater than 0'),
+        ('set', None, None, 'unknown mode'),
+        ('exakt', 0, None, 'unknown mode'),
+    ))
+    async def test_distinct_invalid(self, mode: str, size: int | None, ttl: float | None, message: str):
+        with pytest.raises(ValueError, match=message):
+            await AsyncIter.from_sync(range(3)).distinct(mode=mode, size=size, ttl=ttl).to_list()
+
+    async def test_approx_distinct(self):
+        items = AsyncIter.from_sync(range(10_000)).map(lambda x: x % 3000)
+        assert await items.approx_distinct() == pytest.approx(3000, rel=0.03)
+
+    async def test_approx_quantiles(self):
+        quantiles = await AsyncIter.from_sync(range(1001)).approx_quantiles((0, 0.5, 1))
+        assert quantiles == [0, pytest.approx(500, abs=20), 1000]
+
+    async def test_reservoir_sample(self):
+        sample = await AsyncIter.from_sync(range(1000)).reservoir_sample(10, seed=1)
+        assert len(set(sample)) == 10
+        assert set(sample) <= set(range(1000))
+        assert await AsyncIter.from_sync(range(3)).reservoir_sample(10) == [0, 1, 2]
+
+    @pytest.mark.parametrize('operation', (
+        lambda it: it.approx_distinct(2),
+        lambda it: it.approx_quantiles((0.5,), k=1),
+        lambda it: it.skip(10).approx_quantiles((0.5,)),
+        lambda it: it.reservoir_sample(0),
+    ))
+    async def test_sketch_invalid(self, operation: Callable):
+        with pytest.raises(ValueError):
+            await operation(AsyncIter.from_sync(range(3)))
+
     @pytest.mark.parametrize(['it', 'expected'], (
         ((range(3), range(3, 7)), (0, 1, 2, 3, 4, 5, 6)),
         ((asyncify_iterable(range(3)), asyncify_iterable(range(3, 7))), (0, 1, 2, 3, 4, 5, 6)),
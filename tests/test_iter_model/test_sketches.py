@@ -0,0 +1,217 @@
+import collections
+import random
+from fractions import Fraction
+
+import pytest
+
+from iter_model.sketches import BloomFilter, HyperLogLog, QuantileSketch, RecentSet, ReservoirSample
+
+
+class TestBloomFilter:
+
+    def test_add(self):
+        bloom = BloomFilter(100)
+        assert bloom.add('a')
+        assert bloom.add(b'b')
+        assert bloom.add(3)
+        assert not bloom.add('a')
+        assert not bloom.add(3)
+        assert 'a' in bloom
+        assert b'b' in bloom
+        assert 4 not in bloom
+
+    def test_equal_keys(self):
+        bloom = BloomFilter(100)
+        bloom.add(1)
+        bloom.add((1, 'a'))
+        assert 1.0 in bloom
+        assert True in bloom
+        assert (1.0, 'a') in bloom
+        assert Fraction(1) in bloom
+        assert 1.5 not in bloom
+        assert b'1' not in bloom
+        assert '1' not in bloom
+
+    def test_step(self):
+        bloom = BloomFilter(1, 0.5)
+        assert all(bloom._start(i)[1] % bloom._size for i in range(100))
+
+    def test_error_rate(self):
+        bloom = BloomFilter(10_000, 0.01)
+        for i in range(10_000):
+            bloom.add(i)
+        false_positives = sum(i in bloom for i in range(10_000, 20_000))
+        assert false_positives < 200
+
+    def test_merge(self):
+        first, second = BloomFilter(100), BloomFilter(100)
+        first.add('a')
+        second.add('b')
+        first.merge(second)
+        assert 'a' in first
+        assert 'b' in first
+        assert 'b' in second
+        assert 'a' not in second
+
+    @pytest.mark.parametrize('other', (BloomFilter(10), BloomFilter(100, 0.1)))
+    def test_merge_different(self, other: BloomFilter):
+        with pytest.raises(ValueError):
+            BloomFilter(100).merge(other)
+
+    @pytest.mark.parametrize(['capacity', 'error_rate'], ((0, 0.01), (10, 0), (10, 1)))
+    def test_invalid(self, capacity: int, error_rate: float):
+        with pytest.raises(ValueError):
+            BloomFilter(capacity, error_rate)
+
+
+class TestRecentSet:
+
+    def test_max_size(self):
+        keys = RecentSet(2)
+        assert [keys.add(key) for key in (1, 2, 1, 3, 1, 2)] == [True, True, False, True, False, True]
+
+    def test_ttl(self):
+        now = [0.]
+        keys = RecentSet(ttl=10, clock=lambda: now[0])
+        results = []
+        for time, key in ((0, 1), (5, 2), (9, 1), (15, 2), (18, 1), (30, 1)):
+            now[0] = time
+            results.append(keys.add(key))
+        assert results == [True, True, False, True, False, True]
+
+    @pytest.mark.parametrize(['max_size', 'ttl'], ((None, None), (0, None), (None, 0)))
+    def test_invalid(self, max_size: int | None, ttl: float | None):
+        with pytest.raises(ValueError):
+            RecentSet(max_size, ttl)
+
+
+class TestHyperLogLog:
+
+    @pytest.mark.parametrize('count', (0, 10, 1000, 100_000))
+    def test_result(self, count: int):
+        sketch = HyperLogLog()
+        for i in range(count):
+            sketch.add(i)
+            sketch.add(f'key {i}')
+        assert sketch.result() == pytest.approx(count * 2, rel=0.03)
+
+    def test_merge(self):
+        first, second = HyperLogLog(10), HyperLogLog(10)
+        for i in range(10_000):
+            first.add(i)
+            second.add(i + 5000)
+        first.merge(second)
+        assert first.result() == pytest.approx(15_000, rel=0.1)
+
+    def test_merge_different(self):
+        with pytest.raises(ValueError):
+            HyperLogLog(10).merge(HyperLogLog(12))
+
+    @pytest.mark.parametrize('precision', (3, 19))
+    def test_invalid(self, precision: int):
+        with pytest.raises(ValueError):
+            HyperLogLog(precision)
+
+
+class TestQuantileSketch:
+
+    def test_result(self):
+        items = list(range(100_000))
+        random.Random(0).shuffle(items)
+        sketch: QuantileSketch[int] = QuantileSketch((0, 0.01, 0.5, 0.99, 1), seed=0)
+        for item in items:
+            sketch.add(item)
+        low, p1, median, p99, high = sketch.result()
+        assert (low, high) == (0, 99_999)
+        assert p1 == pytest.approx(1000, abs=2000)
+        assert median == pytest.approx(50_000, abs=2000)
+        assert p99 == pytest.approx(99_000, abs=2000)
+
+    def test_small(self):
+        sketch: QuantileSketch[int] = QuantileSketch()
+        for item in (3, 1, 2):
+            sketch.add(item)
+        assert sketch.quantiles((0, 0.5, 1)) == [1, 2, 3]
+        other: QuantileSketch[int] = QuantileSketch()
+        other.add(0)
+        sketch.merge(other)
+        assert sketch.quantiles((0, 0.5, 1)) == [0, 1, 3]
+
+    def test_merge(self):
+        first: QuantileSketch[int] = QuantileSketch(seed=0)
+        second: QuantileSketch[int] = QuantileSketch(seed=1)
+        for i in range(10_000):
+            first.add(i)
+        for i in range(10_000, 50_000):
+            second.add(i)
+        second.merge(first)
+        first.merge(second)
+        assert second.quantiles((0.2, 0.5)) == [pytest.approx(10_000, abs=1000), pytest.approx(25_000, abs=1000)]
+        assert first.result() == [pytest.approx(20_000, abs=1000)]
+        assert first.quantiles((0, 1)) == [0, 49_999]
+
+    def test_merge_different(self):
+        with pytest.raises(ValueError):
+            QuantileSketch(k=100).merge(QuantileSketch(k=200))
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            QuantileSketch(k=1)
+        with pytest.raises(ValueError):
+            QuantileSketch().result()
+        sketch: QuantileSketch[int] = QuantileSketch()
+        sketch.add(1)
+        with pytest.raises(ValueError):
+            sketch.quantiles((1.5,))
+
+
+class TestReservoirSample:
+
+    def test_small(self):
+        sample: ReservoirSample[int] = ReservoirSample(5)
+        for item in range(3):
+            sample.add(item)
+        assert sample.result() == [0, 1, 2]
+
+    @pytest.mark.parametrize('count', (10, 1000))
+    def test_uniform(self, count: int):
+        frequency: collections.Counter[int] = collections.Counter()
+        for seed in range(2000):
+            sample: ReservoirSample[int] = ReservoirSample(2, seed)
+            for item in range(count):
+                sample.add(item)
+            assert len(set(sample.result())) == 2
+            frequency.update(item * 10 // count for item in sample.result())
+        assert all(300 < frequency[bucket] < 500 for bucket in range(10))
+
+    def test_merge(self):
+        frequency: collections.Counter[int] = collections.Counter()
+        for seed in range(2000):
+            first: ReservoirSample[int] = ReservoirSample(2, seed)
+            second: ReservoirSample[int] = ReservoirSample(2, seed)
+            for item in range(2):
+                first.add(item)
+            for item in range(2, 8):
+                second.add(item)
+            first.merge(second)
+            for item in range(8, 10):
+                first.add(item)
+            assert len(set(first.result())) == 2
+            frequency.update(first.result())
+        assert all(300 < frequency[item] < 500 for item in range(10))
+
+    def test_merge_not_full(self):
+        first: ReservoirSample[int] = ReservoirSample(5)
+        second: ReservoirSample[int] = ReservoirSample(5)
+        first.add(1)
+        second.add(2)
+        first.merge(second)
+        assert sorted(first.result()) == [1, 2]
+
+    def test_merge_different(self):
+        with pytest.raises(ValueError):
+            ReservoirSample(1).merge(ReservoirSample(2))
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            ReservoirSample(0)
@@ -1,16 +1,85 @@
 import functools
 import itertools
 import operator
-from collections.abc import Callable, Iterable, Sequence
+import threading
+import time
+from collections.abc import Callable, Generator, Iterable, Sequence
 from typing import Any
 
 import pytest
 
 from iter_model import SyncIter, sync_iter
+from iter_model.aggregators import Count, Fold, Max, Sum
+from iter_model.fusion import compile_stages
+from iter_model.sync_iter import FusedSyncIter
+
+
+class _Point:
+    """Items that are not equal, but have the same repr"""
+
+    def __init__(self, value: int):
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Point) and self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __repr__(self) -> str:
+        return 'P'
 
 
 class TestSyncIter:
 
+    @pytest.mark.parametrize('chain', (
+        (),
+        (('map', lambda x: x * 2),),
+        (('map', lambda x: x + 1), ('where', lambda x: x % 3), ('map', str)),
+        (('skip', 3), ('skip_where', lambda x: x % 2), ('enumerate', 5)),
+        (('take', 7), ('where', lambda x: x % 2), ('skip', 1)),
+        (('where', lambda x: x % 2), ('take', 3), ('map', lambda x: -x), ('take', 2)),
+        (('take_while', lambda x: x < 12), ('skip', -1), ('take', 0)),
+        (('enumerate', 0), ('skip_where', lambda x: x[0] == 3), ('take', 5), ('where', lambda x: x[1] > 1)),
+        (('take', 30), ('skip', 100)),
+    ))
+    def test_fuse(self, chain: tuple[tuple[str, Any], ...]):
+        expected_source = iter(range(20))
+        expected: SyncIter = SyncIter(expected_source)
+        actual_source = iter(range(20))
+        actual: SyncIter = SyncIter(actual_source).fuse().fuse()
+        for method, arg in chain:
+            expected = getattr(expected, method)(arg)
+            actual = getattr(actual, method)(arg)
+        assert isinstance(actual, FusedSyncIter)
+        assert actual.to_list() == expected.to_list()
+        assert list(actual_source) == list(expected_source)
+
+    @pytest.mark.parametrize(['method', 'arg', 'expected'], (
+        ('map', lambda x: x * 2, [2, 4, 6, 8]),
+        ('where', lambda x: x % 2, [1, 3]),
+        ('skip_where', lambda x: x % 2, [2, 4]),
+        ('skip', 2, [3, 4]),
+        ('take', 2, [1, 2]),
+        ('enumerate', 1, [(1, 1), (2, 2), (3, 3), (4, 4)]),
+        ('take_while', lambda x: x < 3, [1, 2]),
+    ))
+    def test_fuse_started(self, method: str, arg: Any, expected: list):
+        it = SyncIter(range(5)).fuse().map(lambda x: x)
+        assert it.next() == 0
+        result = getattr(it, method)(arg)
+        assert not isinstance(result, FusedSyncIter)
+        assert isinstance(it.fuse(), FusedSyncIter)
+        assert result.to_list() == expected
+
+    def test_fuse_take_negative(self):
+        with pytest.raises(ValueError):
+            SyncIter(range(5)).fuse().take(-1)
+
+    def test_fuse_unknown_stage(self):
+        with pytest.raises(ValueError):
+            compile_stages((('unknown', False),))
+
     def test_to_list(self):
         r = range(5)
         it = SyncIter(r)
@@ -53,6 +122,76 @@ class TestSyncIter:
         r = range(10)
         assert SyncIter(r).map(lambda x: x ** 2).to_list() == [x ** 2 for x in range(10)]
 
+    @pytest.mark.parametrize('chunksize', (1, 3, 100))
+    @pytest.mark.parametrize('workers', (None, 1, 2))
+    def test_parallel_map(self, workers: int | None, chunksize: int):
+        r = range(-10, 10)
+        assert SyncIter(r).parallel_map(abs, workers=workers, chunksize=chunksize).to_list() == list(map(abs, r))
+
+    def test_parallel_map_unordered(self):
+        r = range(-10, 10)
+        result = SyncIter(r).parallel_map(abs, workers=2, chunksize=3, ordered=False).to_list()
+        assert sorted(result) == sorted(map(abs, r))
+
+    def test_parallel_map_lazy(self):
+        read = []
+
+        def source():
+            for item in range(1000):
+                read.append(item)
+                yield item
+
+        assert SyncIter(source()).parallel_map(abs, workers=2, chunksize=5).take(3).to_list() == [0, 1, 2]
+        assert len(read) <= 2 * 2 * 5 + 5
+
+    def test_parallel_map_error(self):
+        with pytest.raises(ValueError):
+            SyncIter(['1', 'x', '3']).parallel_map(int, workers=2).to_list()
+
+    @pytest.mark.parametrize(['workers', 'chunksize'], ((0, 1), (1, 0)))
+    def test_parallel_map_invalid(self, workers: int, chunksize: int):
+        with pytest.raises(ValueError):
+            SyncIter(range(10)).parallel_map(abs, workers=workers, chunksize=chunksize).to_list()
+
+    @pytest.mark.parametrize('window', (None, 1, 3, 100))
+    @pytest.mark.parametrize('workers', (None, 1, 4))
+    def test_thread_map(self, workers: int | None, window: int | None):
+        r = range(-10, 10)
+        assert SyncIter(r).thread_map(abs, workers=workers, window=window).to_list() == list(map(abs, r))
+
+    def test_thread_map_unordered(self):
+        def func(x: float) -> float:
+            time.sleep(x)
+            return x
+
+        assert SyncIter((0.03, 0.02, 0.01)).thread_map(func, workers=3, ordered=False).to_list() == [0.01, 0.02, 0.03]
+
+    def test_thread_map_window(self):
+        in_flight = max_in_flight = 0
+        lock = threading.Lock()
+
+        def func(x: int) -> int:
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.001)
+            with lock:
+                in_flight -= 1
+            return x
+
+        assert SyncIter(range(50)).thread_map(func, workers=8, window=3).to_list() == list(range(50))
+        assert max_in_flight <= 3
+
+    def test_thread_map_error(self):
+        with pytest.raises(ValueError):
+            SyncIter(['1', 'x', '3']).thread_map(int).to_list()
+
+    @pytest.mark.parametrize(['workers', 'window'], ((0, 1), (1, 0)))
+    def test_thread_map_invalid(self, workers: int, window: int):
+        with pytest.raises(ValueError):
+            SyncIter(range(10)).thread_map(abs, workers=workers, window=window).to_list()
+
     @pytest.mark.parametrize('count', (0, 5, 100))
     def test_skip(self, count: int):
         r = range(10)
@@ -80,9 +219,39 @@ class TestSyncIter:
         assert SyncIter(items).skip_where(condition).to_list() == result
 
     @pytest.mark.parametrize('count', (0, 1, 100))
-    def test_count(self, count: int):
+    @pytest.mark.parametrize('source', (tuple, list, set, dict.fromkeys, iter))
+    def test_count(self, count: int, source: Callable):
         r = range(count)
-        assert SyncIter(r).count() == len(r)
+        it = SyncIter(source(r))
+        assert it.count() == len(r)
+        assert it.to_list() == []
+
+    def test_count_after_read(self):
+        it = SyncIter([1, 2, 3])
+        assert it.next() == 1
+        assert it.count() == 2
+
+    def test_count_shared_iterator(self):
+        it = SyncIter([1, 2, 3])
+        mapped = it.map(str)
+        assert it.count() == 3
+        assert mapped.to_list() == []
+
+    def test_huge_range(self):
+        huge = range(10 ** 20)
+        assert SyncIter(huge).contains(5)
+        assert SyncIter(huge).item_at(5) == 5
+        assert SyncIter(huge).take(3).to_list() == [0, 1, 2]
+        assert SyncIter(range(3, 10 ** 20, 10 ** 19)).last() == 9 * 10 ** 19 + 3
+        assert SyncIter(range(3, 10 ** 20, 10 ** 19)).count() == 10
+
+    def test_len(self):
+        assert list(SyncIter([1, 2, 3])) == [1, 2, 3]
+        assert len(SyncIter(iter([1, 2, 3]))) == 3
+        it = SyncIter((1, 2, 3))
+        it.next()
+        assert len(it) == 2
+        assert it.to_list() == []
 
     @pytest.mark.parametrize(
         ['items', 'condition', 'result'],
@@ -156,19 +325,148 @@ class TestSyncIter:
     def test_take_while(self, items: list[int], condition: Callable, result: list[int]):
         assert SyncIter(items).take_while(condition).to_list() == result
 
-    def test_last(self):
-        items = [4, 2, 3]
-        assert SyncIter(items).last() == items[-1]
+    @pytest.mark.parametrize('source', (list, tuple, dict.fromkeys, iter))
+    def test_last(self, source: Callable):
+        it = SyncIter(source([4, 2, 3]))
+        assert it.last() == 3
+        assert it.to_list() == []
 
-    def test_last_err(self):
+    def test_last_set(self):
+        assert SyncIter({3}).last() == 3
+
+    @pytest.mark.parametrize('it', (SyncIter.empty(), SyncIter([]), SyncIter(set())))
+    def test_last_err(self, it: SyncIter):
         with pytest.raises(StopIteration):
-            assert SyncIter.empty().last()
+            assert it.last()
 
     def test_chain(self):
         l1 = [3, 5, 7]
         l2 = [1, 2, 3]
         assert SyncIter(l1).chain(l2).to_list() == l1 + l2
 
+    @pytest.mark.parametrize(['max_in_memory', 'block_size'], ((None, 1024), (0, 1), (5, 3), (2, 10), (100, 7)))
+    def test_cache(self, max_in_memory: int | None, block_size: int):
+        reads = 0
+
+        def source():
+            nonlocal reads
+            for item in range(50):
+                reads += 1
+                yield item
+
+        cached = SyncIter(source()).cache(max_in_memory, block_size)
+        first = iter(cached)
+        assert [next(first) for _ in range(10)] == list(range(10))
+        assert SyncIter(cached).to_list() == list(range(50))
+        assert SyncIter(first).to_list() == list(range(10, 50))
+        assert SyncIter(cached).where(lambda x: x % 2).to_list() == list(range(1, 50, 2))
+        assert reads == 50
+        if max_in_memory is not None:
+            assert len(cached._memory) <= max(max_in_memory, block_size)
+            assert bool(len(cached._spill)) is (max_in_memory < 50)
+        cached.close()
+
+    def test_cache_interleaved(self):
+        cached = SyncIter(range(30)).cache(max_in_memory=4, block_size=2)
+        assert SyncIter(cached).zip(cached, cached).to_list() == [(i, i, i) for i in range(30)]
+
+    def test_cache_error(self):
+        def source():
+            yield 1
+            raise ValueError('failed')
+
+        cached = SyncIter(source()).cache()
+        with pytest.raises(ValueError, match='failed'):
+            SyncIter(cached).to_list()
+        reader = SyncIter(cached)
+        assert reader.next() == 1
+        with pytest.raises(ValueError, match='failed'):
+            reader.next()
+
+    @pytest.mark.parametrize(['max_in_memory', 'block_size'], ((-1, 1), (None, 0)))
+    def test_cache_invalid(self, max_in_memory: int | None, block_size: int):
+        with pytest.raises(ValueError):
+            SyncIter(range(3)).cache(max_in_memory, block_size)
+
+    @pytest.mark.parametrize('buffer', (1, 3, 100))
+    def test_tee(self, buffer: int):
+        first, second, third = SyncIter(range(10)).tee(3, buffer)
+        assert first.zip(second, third).to_list() == [(i, i, i) for i in range(10)]
+
+    def test_tee_threads(self):
+        read = 0
+        max_ahead = 0
+        slow_items: list[int] = []
+
+        def source():
+            nonlocal read, max_ahead
+            for item in range(50):
+                read += 1
+                max_ahead = max(max_ahead, read - len(slow_items))
+                yield item
+
+        fast, slow = SyncIter(source()).tee(2, buffer=4)
+        fast_items: list[int] = []
+        fast_thread = threading.Thread(target=lambda: fast_items.extend(fast.to_list()))
+        fast_thread.start()
+        for item in slow:
+            time.sleep(0.001)
+            slow_items.append(item)
+        fast_thread.join()
+
+        assert fast_items == slow_items == list(range(50))
+        assert max_ahead <= 4 + 1
+
+    def test_tee_slow_source(self):
+        reached = threading.Event()
+        gate = threading.Event()
+        released = False
+
+        def source():
+            nonlocal released
+            yield from range(3)
+            reached.set()
+            released = gate.wait(5)
+            yield from range(3, 5)
+
+        first, second = SyncIter(source()).tee(2)
+        first_items: list[int] = []
+        first_thread = threading.Thread(target=lambda: first_items.extend(first.to_list()))
+        first_thread.start()
+        assert reached.wait(5)
+        assert [next(second) for _ in range(3)] == [0, 1, 2]
+        threading.Timer(0.01, gate.set).start()
+        assert second.to_list() == [3, 4]
+        first_thread.join()
+
+        assert released
+        assert first_items == list(range(5))
+
+    def test_tee_closed(self):
+        first, second = SyncIter(range(10)).tee(2, buffer=2)
+        assert next(second) == 0
+        it = iter(second)
+        assert isinstance(it, Generator)
+        it.close()
+        assert first.to_list() == list(range(10))
+
+    def test_tee_error(self):
+        def source():
+            yield 1
+            raise ValueError('failed')
+
+        first, second = SyncIter(source()).tee()
+        with pytest.raises(ValueError, match='failed'):
+            first.to_list()
+        assert next(second) == 1
+        with pytest.raises(ValueError, match='failed'):
+            next(second)
+
+    @pytest.mark.parametrize(['n', 'buffer'], ((0, 1), (2, 0)))
+    def test_tee_invalid(self, n: int, buffer: int):
+        with pytest.raises(ValueError):
+            SyncIter(range(3)).tee(n, buffer)
+
     @pytest.mark.parametrize('items', (
         [1, 1, 1],
         [1, 0, 1],
@@ -281,6 +579,35 @@ class TestSyncIter:
         with pytest.raises(ValueError):
             SyncIter(()).reduce(func=operator.add)
 
+    @pytest.mark.parametrize('max_in_memory', (None, 1, 7, 50, 100, 1000))
+    @pytest.mark.parametrize('reverse', (False, True))
+    @pytest.mark.parametrize('key', (None, lambda item: item[0]))
+    def test_sort(self, max_in_memory: int | None, reverse: bool, key: Callable | None):
+        items = [((i * 37) % 11, i) for i in range(100)]
+        result = SyncIter(items).sort(key, reverse, max_in_memory, block_size=3).to_list()
+        # sorting by the first element only checks that the sort is stable
+        assert result == sorted(items, key=key, reverse=reverse)
+
+    @pytest.mark.parametrize('k', (0, 1, 5, 100, 200))
+    @pytest.mark.parametrize('reverse', (False, True))
+    @pytest.mark.parametrize('key', (None, lambda item: item[0]))
+    def test_top_k(self, k: int, reverse: bool, key: Callable | None):
+        items = [((i * 37) % 11, i) for i in range(100)]
+        expected = sorted(items, key=key, reverse=not reverse)[:k]
+        assert SyncIter(items).top_k(k, key, reverse).to_list() == expected
+
+    def test_top_k_invalid(self):
+        with pytest.raises(ValueError):
+            SyncIter(range(3)).top_k(-1).to_list()
+
+    def test_sort_empty(self):
+        assert SyncIter(()).sort(max_in_memory=10).to_list() == []
+
+    @pytest.mark.parametrize(['max_in_memory', 'block_size'], ((0, 1), (1, 0), (None, 0)))
+    def test_sort_invalid(self, max_in_memory: int | None, block_size: int):
+        with pytest.raises(ValueError):
+            SyncIter(range(3)).sort(max_in_memory=max_in_memory, block_size=block_size).to_list()
+
     @pytest.mark.parametrize(
         ('it', 'func', 'initial'),
         (
@@ -371,15 +698,19 @@ class TestSyncIter:
         list_.insert(position, item)
         assert SyncIter(r).append_at(position, item).to_list() == list_
 
-    def test_item_at(self):
-        items = ['wrong', 'here', 'wrong']
-        index = items.index('here')
-        assert SyncIter(items).item_at(index) == items[index]
+    @pytest.mark.parametrize('source', (list, tuple, iter))
+    def test_item_at(self, source: Callable):
+        it = SyncIter(source(['wrong', 'here', 'next']))
+        assert it.item_at(1) == 'here'
+        assert it.to_list() == ['next']
 
-    def test_item_at_exception(self):
-        items = ['wrong', 'wrong', 'wrong']
+    @pytest.mark.parametrize('source', (list, iter))
+    @pytest.mark.parametrize('index', (3, -1))
+    def test_item_at_exception(self, source: Callable, index: int):
+        it = SyncIter(source(['wrong', 'wrong', 'wrong']))
         with pytest.raises(IndexError):
-            SyncIter(items).item_at(len(items))
+            it.item_at(index)
+        assert it.to_list() == []
 
     @pytest.mark.parametrize(
         ['items', 'item', 'result'],
@@ -391,8 +722,26 @@ class TestSyncIter:
             ((1, 'a', 3), None, False),
         ),
     )
-    def test_contains(self, items: Sequence[int], item: int, result: bool):
-        assert SyncIter(items).contains(item) is result
+    @pytest.mark.parametrize('source', (tuple, iter, set, dict.fromkeys))
+    def test_contains(self, items: Sequence[int], item: int, result: bool, source: Callable):
+        assert SyncIter(source(items)).contains(item) is result
+
+    @pytest.mark.parametrize('source', (list, iter, dict.fromkeys))
+    def test_contains_rest(self, source: Callable):
+        it = SyncIter(source([1, 2, 3]))
+        assert it.contains(2)
+        assert it.to_list() == [3]
+        it = SyncIter(source([1, 2, 3]))
+        assert not it.contains(4)
+        assert it.to_list() == []
+
+    @pytest.mark.parametrize('source', (list, iter, set))
+    def test_contains_nan(self, source: Callable):
+        nan = float('nan')
+        assert not SyncIter(source([nan])).contains(nan)
+
+    def test_contains_unhashable(self):
+        assert not SyncIter({1, 2}).contains([1])
 
     @pytest.mark.parametrize(
         ['items', 'item', 'result'],
@@ -440,6 +789,194 @@ class TestSyncIter:
         batches = sync_it.batches(batch_size)
         assert batches.map(tuple).to_tuple() == expected  # type: ignore
 
+    @pytest.mark.parametrize(['it', 'batch_size', 'max_weight', 'expected'], (
+        (['ab', 'cd', 'e', 'fgh'], 10, 4, (('ab', 'cd'), ('e', 'fgh'))),
+        (['ab', 'cd', 'e', 'fgh'], 1, 4, (('ab',), ('cd',), ('e',), ('fgh',))),
+        (['abcdef', 'a', 'b'], 10, 3, (('abcdef',), ('a', 'b'))),
+        (['a', 'b', 'c'], 2, 10, (('a', 'b'), ('c',))),
+        ([], 2, 10, ()),
+    ))
+    def test_batches_max_weight(
+        self,
+        it: Sequence[str],
+        batch_size: int,
+        max_weight: int,
+        expected: tuple,
+    ):
+        assert SyncIter(it).batches(batch_size, max_weight).to_tuple() == expected
+
+    def test_batches_weight(self):
+        batches = SyncIter(range(6)).batches(10, max_weight=5, weight=lambda x: x)
+        assert batches.to_tuple() == ((0, 1, 2), (3,), (4,), (5,))
+
+    def test_batches_invalid_size(self):
+        with pytest.raises(ValueError):
+            SyncIter(range(3)).batches(0).to_list()
+
+    @pytest.mark.parametrize(['it', 'size', 'agg', 'expected'], (
+        (range(7), 3, None, ((0, 1, 2), (3, 4, 5), (6,))),
+        (range(7), 3, Sum, (3, 12, 6)),
+        (range(6), 3, Count, (3, 3)),
+        (range(6), 2, lambda: Fold(operator.mul, 1), (0, 6, 20)),
+        ((), 3, Sum, ()),
+    ))
+    def test_tumbling_window(self, it: Iterable[int], size: int, agg: Callable | None, expected: tuple):
+        assert SyncIter(it).tumbling_window(size, agg).to_tuple() == expected
+
+    @pytest.mark.parametrize(['it', 'size', 'step', 'agg', 'expected'], (
+        (range(5), 3, 1, None, ((0, 1, 2), (1, 2, 3), (2, 3, 4))),
+        (range(5), 3, 1, Sum, (3, 6, 9)),
+        (range(7), 3, 2, Max, (2, 4, 6)),
+        (range(7), 2, 2, None, ((0, 1), (2, 3), (4, 5))),
+        (range(10), 2, 4, Sum, (1, 9, 17)),
+        (range(10), 2, 4, None, ((0, 1), (4, 5), (8, 9))),
+        (range(2), 3, 1, None, ()),
+    ))
+    def test_sliding_window(
+        self,
+        it: Iterable[int],
+        size: int,
+        step: int,
+        agg: Callable | None,
+        expected: tuple,
+    ):
+        assert SyncIter(it).sliding_window(size, step, agg).to_tuple() == expected
+
+    def test_sliding_window_not_removable(self):
+        assert SyncIter(range(6)).sliding_window(2, 2, lambda: Fold(operator.mul, 1)).to_tuple() == (0, 6, 20)
+        with pytest.raises(TypeError):
+            SyncIter(range(6)).sliding_window(2, 1, lambda: Fold(operator.mul, 1)).to_list()
+
+    @pytest.mark.parametrize('window', (
+        lambda it: it.tumbling_window(0),
+        lambda it: it.tumbling_window(0, Sum),
+        lambda it: it.sliding_window(0),
+        lambda it: it.sliding_window(2, 0),
+    ))
+    def test_window_invalid_size(self, window: Callable):
+        with pytest.raises(ValueError):
+            window(SyncIter(range(3))).to_list()
+
+    @pytest.mark.parametrize(['engine', 'agg', 'expected'], (
+        ('hash', None, ((0, (1, 2, 3)), (1, (11, 12, 13)), (2, (21,)))),
+        ('hash', Sum, ((0, 6), (1, 36), (2, 21))),
+        ('hash', {'count': Count, 'max': Max}, (
+            (0, {'count': 3, 'max': 3}),
+            (1, {'count': 3, 'max': 13}),
+            (2, {'count': 1, 'max': 21}),
+        )),
+        ('sorted', None, ((0, (1, 2)), (1, (11, 12, 13)), (2, (21,)), (0, (3,)))),
+        ('sorted', Sum, ((0, 3), (1, 36), (2, 21), (0, 3))),
+        ('sorted', {'count': Count}, ((0, {'count': 2}), (1, {'count': 3}), (2, {'count': 1}), (0, {'count': 1}))),
+    ))
+    def test_group_by(self, engine: str, agg: Any, expected: tuple):
+        it = SyncIter((1, 2, 11, 12, 13, 21, 3))
+        assert it.group_by(lambda x: x // 10, agg, engine).to_tuple() == expected
+
+    @pytest.mark.parametrize('engine', ('hash', 'sorted'))
+    def test_group_by_empty(self, engine: str):
+        assert SyncIter.empty().group_by(lambda x: x, Count, engine).to_tuple() == ()
+
+    def test_group_by_sorted_streaming(self):
+        groups = SyncIter(itertools.count()).group_by(lambda x: x // 3, engine='sorted')
+        assert groups.take(2).to_tuple() == ((0, (0, 1, 2)), (1, (3, 4, 5)))
+
+    def test_group_by_invalid_engine(self):
+        with pytest.raises(ValueError):
+            SyncIter(range(3)).group_by(lambda x: x, engine='tree').to_list()
+
+    @pytest.mark.parametrize('engine', ('hash', 'merge'))
+    @pytest.mark.parametrize(['how', 'expected'], (
+        ('inner', ((1, (1, 'a')), (2, (2, 'b')), (2, (2, 'c')), (2, (2, 'b')), (2, (2, 'c')), (5, (5, 'e')))),
+        ('left', (
+            (1, (1, 'a')), (2, (2, 'b')), (2, (2, 'c')), (2, (2, 'b')), (2, (2, 'c')), (3, None), (5, (5, 'e')),
+        )),
+        ('semi', (1, 2, 2, 5)),
+        ('anti', (3,)),
+    ))
+    def test_join(self, engine: str, how: str, expected: tuple):
+        right = ((0, 'z'), (1, 'a'), (2, 'b'), (2, 'c'), (4, 'd'), (5, 'e'), (7, 'f'))
+        joined = SyncIter((1, 2, 2, 3, 5)).join(right, lambda x: x, operator.itemgetter(0), how, engine)
+        assert joined.to_tuple() == expected
+
+    @pytest.mark.parametrize('engine', ('hash', 'merge'))
+    @pytest.mark.parametrize(['how', 'expected'], (
+        ('inner', ()),
+        ('left', ((1, None), (2, None))),
+        ('semi', ()),
+        ('anti', (1, 2)),
+    ))
+    def test_join_empty_other(self, engine: str, how: str, expected: tuple):
+        assert SyncIter((1, 2)).join((), lambda x: x, how=how, engine=engine).to_tuple() == expected
+
+    def test_join_merge_other_exhausted(self):
+        joined = SyncIter((1, 3)).join((0, 1), lambda x: x, how='left', engine='merge')
+        assert joined.to_tuple() == ((1, 1), (3, None))
+
+    def test_join_hash_unsorted(self):
+        joined = SyncIter((3, 1, 3)).join(('a', 'bbb', 'ccc'), lambda x: x, len)
+        assert joined.to_tuple() == ((3, 'bbb'), (3, 'ccc'), (1, 'a'), (3, 'bbb'), (3, 'ccc'))
+
+    @pytest.mark.parametrize(['how', 'engine'], (('outer', 'hash'), ('inner', 'loop')))
+    def test_join_invalid(self, how: str, engine: str):
+        with pytest.raises(ValueError):
+            SyncIter(range(3)).join(range(3), lambda x: x, how=how, engine=engine).to_list()
+
+    @pytest.mark.parametrize(['key', 'mode', 'size', 'expected'], (
+        (None, 'exact', None, (3, 1, 2, 4)),
+        (lambda x: x % 2, 'exact', None, (3, 2)),
+        (None, 'lru', 2, (3, 1, 2, 1, 3, 4, 1)),
+        (None, 'bloom', 100, (3, 1, 2, 4)),
+        (lambda x: x % 2, 'bloom', 100, (3, 2)),
+    ))
+    def test_distinct(self, key: Callable | None, mode: str, size: int | None, expected: tuple):
+        assert SyncIter((3, 1, 3, 2, 1, 3, 4, 1)).distinct(key, mode, size).to_tuple() == expected
+
+    def test_distinct_same_repr(self):
+        points = [_Point(i % 5) for i in range(12)] + [1, 1.0, True]
+        exact = SyncIter(points).distinct().to_list()
+        assert SyncIter(points).distinct(mode='bloom', size=100).to_list() == exact
+        assert len(exact) == 6
+        assert SyncIter(points).approx_distinct() == 6
+
+    def test_distinct_ttl(self):
+        assert SyncIter((3, 1, 3, 2, 1, 3, 4, 1)).distinct(mode='lru', ttl=60).to_tuple() == (3, 1, 2, 4)
+
+    @pytest.mark.parametrize(['mode', 'size', 'ttl', 'message'], (
+        ('lru', None, None, 'size or ttl must be provided in lru mode'),
+        ('lru', 0, None, 'size must be greater than 0'),
+        ('lru', None, 0, 'ttl must be greater than 0'),
+        ('bloom', None, None, 'size must be provided in bloom mode'),
+        ('bloom', 0, None, 'size must be greater than 0'),
+        ('set', None, None, 'unknown mode'),
+        ('exakt', 0, None, 'unknown mode'),
+    ))
+    def test_distinct_invalid(self, mode: str, size: int | None, ttl: float | None, message: str):
+        with pytest.raises(ValueError, match=message):
+            SyncIter(range(3)).distinct(mode=mode, size=size, ttl=ttl).to_list()
+
+    def test_approx_distinct(self):
+        assert SyncIter(range(10_000)).map(lambda x: x % 3000).approx_distinct() == pytest.approx(3000, rel=0.03)
+
+    def test_approx_quantiles(self):
+        assert SyncIter(range(1001)).approx_quantiles((0, 0.5, 1)) == [0, pytest.approx(500, abs=20), 1000]
+
+    def test_reservoir_sample(self):
+        sample = SyncIter(range(1000)).reservoir_sample(10, seed=1)
+        assert len(set(sample)) == 10
+        assert set(sample) <= set(range(1000))
+        assert SyncIter(range(3)).reservoir_sample(10) == [0, 1, 2]
+
+    @pytest.mark.parametrize('operation', (
+        lambda it: it.approx_distinct(2),
+        lambda it: it.approx_quantiles((0.5,), k=1),
+        lambda it: it.skip(10).approx_quantiles((0.5,)),
+        lambda it: it.reservoir_sample(0),
+    ))
+    def test_sketch_invalid(self, operation: Callable):
+        with pytest.raises(ValueError):
+            operation(SyncIter(range(3)))
+
     @pytest.mark.parametrize(['it', 'expected'], (
         ((range(3), range(3, 7)), (0, 1, 2, 3, 4, 5, 6)),
     ))